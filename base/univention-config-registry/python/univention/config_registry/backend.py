@@ -36,9 +36,13 @@ from __future__ import print_function
 import sys
 import os
 import fcntl
+import mmap
 import re
 import errno
+import struct
+import threading
 import time
+import zlib
 from enum import IntEnum
 from stat import S_ISREG
 try:
@@ -53,9 +57,10 @@ from univention.config_registry.handler import run_filter
 if six.PY2:
 	from io import open
 try:
-	from typing import overload, Any, Dict, IO, Iterator, List, ItemsView, NoReturn, Optional, Set, Tuple, Type, TypeVar, Union  # noqa F401
+	from typing import overload, Any, Callable, Dict, IO, Iterator, List, ItemsView, NoReturn, Optional, Set, Tuple, Type, TypeVar, Union  # noqa F401
 	from types import TracebackType  # noqa F401
 	from typing_extension import Literal  # noqa F401
+	from univention.config_registry.watcher import Watcher  # noqa F401
 	_T = TypeVar('_T', bound='ReadOnlyConfigRegistry')
 	_VT = TypeVar('_VT')
 except ImportError:  # pragma: no cover
@@ -90,6 +95,7 @@ class Load(IntEnum):
 	MANUAL = 0
 	ONCE = 1
 	ALWAYS = 2
+	NOTIFY = 3
 
 
 if MYPY:  # pragma: no cover
@@ -195,6 +201,7 @@ class ReadOnlyConfigRegistry(_M, BooleanConfigRegistry):
 	DEFAULTS, NORMAL, LDAP, SCHEDULE, FORCED, CUSTOM = range(6)
 	LAYER_PRIORITIES = (CUSTOM, FORCED, SCHEDULE, LDAP, NORMAL, DEFAULTS)
 	PREFIX = '/etc/univention'
+	SNAPSHOT = 'base.snapshot'
 	BASES = {
 		NORMAL: 'base.conf',
 		LDAP: 'base-ldap.conf',
@@ -209,12 +216,78 @@ class ReadOnlyConfigRegistry(_M, BooleanConfigRegistry):
 		custom = os.getenv('UNIVENTION_BASECONF') or filename
 		self.autoload = Load.MANUAL
 
-		self._registry = {}  # type: Dict[int, _ConfigRegistry]
+		self._layers = {}  # type: Dict[int, _ConfigRegistry]
 		for reg in self.LAYER_PRIORITIES:
 			if reg == self.CUSTOM:
-				self._registry[reg] = _ConfigRegistry(custom if custom else os.devnull)
+				self._layers[reg] = _ConfigRegistry(custom if custom else os.devnull)
 			else:
-				self._registry[reg] = _ConfigRegistry(os.devnull if custom else os.path.join(self.PREFIX, self.BASES[reg]))
+				self._layers[reg] = _ConfigRegistry(os.devnull if custom else os.path.join(self.PREFIX, self.BASES[reg]))
+
+		self._snapshot_file = None if custom else os.path.join(self.PREFIX, self.SNAPSHOT)
+		self._snapshot = None  # type: Optional[_Snapshot]
+		self._materialized = False
+		self._watcher = None  # type: Optional[Watcher]
+		self._lock = threading.Lock()
+		self._callbacks = []  # type: List[Callable[[ReadOnlyConfigRegistry, Dict[str, Tuple[Optional[str], Optional[str]]]], None]]
+
+	@property
+	def _registry(self):
+		# type: () -> Dict[int, _ConfigRegistry]
+		"""
+		Return the layers loaded from the text files.
+
+		Direct access to the layers disables the use of the snapshot.
+		"""
+		self._materialize()
+		return self._layers
+
+	def _materialize(self):
+		# type: () -> None
+		"""Stop using the snapshot and load the layers from the text files."""
+		if self._snapshot is not None:
+			self._snapshot.close()
+			self._snapshot = None
+			for reg in self._layers.values():
+				reg.load()
+		self._materialized = True
+
+	def _snapshot_files(self):
+		# type: () -> List[Tuple[int, str]]
+		"""
+		Return layer files covered by the snapshot.
+
+		:returns: List of 2-tuples (layer-number, file-name) ordered by priority.
+		"""
+		return [(reg, self._layers[reg].file) for reg in self.LAYER_PRIORITIES if reg != self.CUSTOM]
+
+	def _load_snapshot(self):
+		# type: () -> bool
+		"""
+		Use snapshot instead of parsing the text files.
+
+		:returns: `True` if a current snapshot is used, `False` otherwise.
+		"""
+		if not self._snapshot_file or self._materialized:
+			return False
+
+		files = [filename for _reg, filename in self._snapshot_files()]
+		if self._snapshot is not None:
+			if self._snapshot.valid(files):
+				return True
+			self._snapshot.close()
+		self._snapshot = _Snapshot.open(self._snapshot_file, files)
+		return self._snapshot is not None
+
+	def _autoload(self):
+		# type: () -> Optional[_Snapshot]
+		"""
+		Reload changed files if requested.
+
+		:returns: The snapshot if it is used instead of the layers.
+		"""
+		if self.autoload in (Load.ONCE, Load.ALWAYS):
+			self.load(Load.MANUAL if self.autoload == Load.ONCE else self.autoload)
+		return self._snapshot
 
 	def _walk(self):
 		# type: () -> Iterator[Tuple[int, _ConfigRegistry]]
@@ -223,8 +296,7 @@ class ReadOnlyConfigRegistry(_M, BooleanConfigRegistry):
 
 		:returns: Iterator of 2-tuple (layers-mumber, layer)
 		"""
-		if self.autoload:
-			self.load(Load.MANUAL if self.autoload == Load.ONCE else self.autoload)
+		self._autoload()
 
 		for reg in self.LAYER_PRIORITIES:
 			registry = self._registry[reg]
@@ -236,19 +308,89 @@ class ReadOnlyConfigRegistry(_M, BooleanConfigRegistry):
 		Load registry from file.
 
 		:param autoload: Automatically reload changed files.
+			:py:attr:`Load.NOTIFY` watches the files in a background thread, see :py:meth:`add_callback`.
 		"""
-		for reg in self._registry.values():
-			reg.load()
+		if autoload == Load.NOTIFY:
+			with self._lock:
+				self._materialize()
+		if not self._load_snapshot():
+			with self._lock:
+				for reg in self._layers.values():
+					reg.load()
 
 		self.autoload = Load.MANUAL  # prevent recursion!
 		strict = six.PY2 and self.is_true('ucr/encoding/strict')
 		self.autoload = autoload
 
-		for reg in self._registry.values():
+		for reg in self._layers.values():
 			reg.strict_encoding = strict
 
+		if autoload == Load.NOTIFY:
+			if self._watcher is None:
+				from univention.config_registry.watcher import Watcher
+				self._watcher = Watcher(dict((reg, layer.file) for reg, layer in self._layers.items()), self._reload)
+				self._watcher.start()
+		elif self._watcher is not None:
+			self._watcher.stop()
+			self._watcher = None
+
 		return self
 
+	def _reload(self, regs):
+		# type: (Set[int]) -> None
+		"""
+		Reload changed layers and notify callbacks.
+
+		The layers are loaded into new objects replacing the current ones at once,
+		so other threads never see a partially loaded layer.
+
+		:param regs: Set of changed layer numbers.
+		"""
+		with self._lock:
+			before = self._merge()
+			layers = dict(self._layers)
+			for reg in regs:
+				layer = layers[reg] = _ConfigRegistry(self._layers[reg].file)
+				layer.update(self._layers[reg])
+				layer.strict_encoding = self._layers[reg].strict_encoding
+				layer.load()
+			self._layers = layers
+			after = self._merge()
+
+		changed = dict(
+			(key, (before.get(key), after.get(key)))
+			for key in set(before) | set(after)
+			if before.get(key) != after.get(key)
+		)
+		if changed:
+			for callback in list(self._callbacks):
+				callback(self, changed)
+
+	def add_callback(self, callback):
+		# type: (Callable[[ReadOnlyConfigRegistry, Dict[str, Tuple[Optional[str], Optional[str]]]], None]) -> None
+		"""
+		Register function to be called when variables are changed by other processes.
+
+		Requires loading with :py:attr:`Load.NOTIFY`. The function is called from the
+		watcher thread with the registry and a mapping from UCR variable name to a
+		2-tuple (old-value, new-value).
+
+		:param callback: Function to call.
+
+		> ucr = ConfigRegistry().load(autoload=Load.NOTIFY)
+		> ucr.add_callback(lambda ucr, changed: print(sorted(changed)))
+		"""
+		self._callbacks.append(callback)
+
+	def remove_callback(self, callback):
+		# type: (Callable[[ReadOnlyConfigRegistry, Dict[str, Tuple[Optional[str], Optional[str]]]], None]) -> None
+		"""
+		Unregister function.
+
+		:param callback: Function registered by :py:meth:`add_callback`.
+		"""
+		self._callbacks.remove(callback)
+
 	def __enter__(self):
 		# type: () -> ViewConfigRegistry
 		"""
@@ -289,7 +431,12 @@ class ReadOnlyConfigRegistry(_M, BooleanConfigRegistry):
 		:param key: UCR variable name.
 		:returns: `True` is set, `False` otherwise.
 		"""
-		return any(key in registry for _reg, registry in self._walk())
+		snapshot = self._autoload()
+		if snapshot is not None:
+			return key in snapshot
+
+		layers = self._layers
+		return any(key in layers[reg] for reg in self.LAYER_PRIORITIES)
 
 	def __iter__(self):
 		# type: () -> Iterator[str]
@@ -332,9 +479,20 @@ class ReadOnlyConfigRegistry(_M, BooleanConfigRegistry):
 		:param getscope: `True` makes the method return the scope level in addition to the value itself.
 		:returns: the value or a 2-tuple (level, value) or the default.
 		"""
-		for reg, registry in self._walk():
+		snapshot = self._autoload()
+		if snapshot is not None:
+			try:
+				reg, value = snapshot[key]
+			except KeyError:
+				return default
+			if reg == self.DEFAULTS:
+				value = self._eval_default(value)
+			return (reg, value) if getscope else value
+
+		layers = self._layers
+		for reg in self.LAYER_PRIORITIES:
 			try:
-				value = registry[key]  # type: str
+				value = layers[reg][key]  # type: str
 			except KeyError:
 				continue
 			if reg == self.DEFAULTS:
@@ -360,13 +518,19 @@ class ReadOnlyConfigRegistry(_M, BooleanConfigRegistry):
 		:param getscope: `True` makes the method return the scope level in addition to the value itself.
 		:returns: A mapping from varibal ename to eiter the value (if `getscope` is False) or a 2-tuple (level, value).
 		"""
+		snapshot = self._autoload()
+		if snapshot is not None:
+			items = snapshot.items()  # type: Iterator[Tuple[str, Tuple[int, str]]]
+		else:
+			layers = self._layers
+			items = ((key, (reg, value)) for reg in self.LAYER_PRIORITIES for key, value in layers[reg].items())
+
 		merge = {}  # type: Dict[str, Union[str, Tuple[int, str]]]
-		for reg, registry in self._walk():
-			for key, value in registry.items():
-				if key not in merge:
-					if reg == self.DEFAULTS:
-						value = self._eval_default(value)
-					merge[key] = (reg, value) if getscope else value
+		for key, (reg, value) in items:
+			if key not in merge:
+				if reg == self.DEFAULTS:
+					value = self._eval_default(value)
+				merge[key] = (reg, value) if getscope else value
 
 		return merge  # type: ignore
 
@@ -430,7 +594,7 @@ class ConfigRegistry(ReadOnlyConfigRegistry, _MM):
 		custom = os.getenv('UNIVENTION_BASECONF') or filename
 		self.scope = self.CUSTOM if custom else write_registry
 		for reg in self.LAYER_PRIORITIES:
-			registry = self._registry[reg]
+			registry = self._layers[reg]
 			registry._create_base_conf()
 
 	@property
@@ -443,8 +607,13 @@ class ConfigRegistry(ReadOnlyConfigRegistry, _MM):
 
 	def save(self):
 		# type: () -> None
-		"""Save registry to file."""
+		"""Save registry to file and regenerate the snapshot."""
 		self._layer.save()
+		if self._snapshot_file:
+			try:
+				_Snapshot.write(self._snapshot_file, self._snapshot_files())
+			except EnvironmentError:
+				pass  # the outdated snapshot is detected and ignored by readers
 
 	def lock(self):
 		# type: () -> None
@@ -738,4 +907,201 @@ class _ConfigRegistry(dict):
 		return data
 
 
+def _file_key(filename):
+	# type: (str) -> Tuple[int, int, int]
+	"""
+	Return key identifying the file content.
+
+	:param filename: File name.
+	:returns: 3-tuple (inode, size, modification-time-in-microseconds) or all zero if the file does not exist.
+	"""
+	try:
+		stat = os.stat(filename)
+	except EnvironmentError:
+		return (0, 0, 0)
+	return (stat.st_ino, stat.st_size, int(stat.st_mtime * 1000000))
+
+
+class _Snapshot(object):
+	"""
+	Memory mapped binary snapshot of the merged layers.
+
+	The file consists of a header, the keys of the layer files it was generated
+	from, an open addressing hash table of entry offsets and the entries.
+
+	:param data: Memory mapped snapshot file.
+	"""
+	MAGIC = b'UCRS'
+	VERSION = 1
+	HEADER = struct.Struct('<4sIIIIII')  # magic, version, number-of-files, number-of-entries, number-of-buckets, start-of-entries, end-of-entries
+	FILE = struct.Struct('<QQq')  # inode, size, modification-time
+	BUCKET = struct.Struct('<I')  # offset of entry or 0
+	ENTRY = struct.Struct('<BII')  # layer, length-of-key, length-of-value
+
+	def __init__(self, data):
+		# type: (mmap.mmap) -> None
+		self._data = data
+		magic, version, files, self._count, self._buckets, self._start, self._end = self.HEADER.unpack_from(data)
+		if magic != self.MAGIC or version != self.VERSION or self._end > len(data):
+			raise ValueError('Invalid snapshot')
+		self._files = [self.FILE.unpack_from(data, self.HEADER.size + i * self.FILE.size) for i in range(files)]
+		self._table = self.HEADER.size + files * self.FILE.size
+
+	@classmethod
+	def open(cls, filename, files):
+		# type: (str, List[str]) -> Optional[_Snapshot]
+		"""
+		Open snapshot.
+
+		:param filename: File name of the snapshot.
+		:param files: File names of the layers.
+		:returns: The snapshot or `None` if it does not exist, is invalid or is outdated.
+		"""
+		try:
+			with open(filename, 'rb') as fd:
+				snapshot = cls(mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ))
+		except (EnvironmentError, ValueError, struct.error):
+			return None
+		if not snapshot.valid(files):
+			snapshot.close()
+			return None
+		return snapshot
+
+	def valid(self, files):
+		# type: (List[str]) -> bool
+		"""
+		Check if the snapshot is still current.
+
+		:param files: File names of the layers.
+		:returns: `True` if none of the layer files changed since the snapshot was generated.
+		"""
+		return self._files == [_file_key(filename) for filename in files]
+
+	def close(self):
+		# type: () -> None
+		"""Unmap snapshot."""
+		self._data.close()
+
+	@staticmethod
+	def _encode(text):
+		# type: (Union[str, bytes]) -> bytes
+		return text if isinstance(text, bytes) else text.encode('UTF-8')
+
+	def _entry(self, offset):
+		# type: (int) -> Tuple[bytes, int, str, int]
+		"""
+		Decode entry.
+
+		:param offset: Offset of entry.
+		:returns: 4-tuple (encoded-key, layer-number, value, offset-of-next-entry).
+		"""
+		reg, key_len, value_len = self.ENTRY.unpack_from(self._data, offset)
+		start = offset + self.ENTRY.size
+		end = start + key_len + value_len
+		return self._data[start:start + key_len], reg, self._data[start + key_len:end].decode('UTF-8'), end
+
+	def __getitem__(self, key):
+		# type: (str) -> Tuple[int, str]
+		"""
+		Lookup variable.
+
+		:param key: UCR variable name.
+		:returns: 2-tuple (layer-number, value).
+		:raises KeyError: if the variable is not set.
+		"""
+		data = self._encode(key)
+		mask = self._buckets - 1
+		index = zlib.crc32(data) & mask
+		while True:
+			offset, = self.BUCKET.unpack_from(self._data, self._table + index * self.BUCKET.size)
+			if not offset:
+				raise KeyError(key)
+			name, reg, value, _next = self._entry(offset)
+			if name == data:
+				return (reg, value)
+			index = (index + 1) & mask
+
+	def __contains__(self, key):
+		# type: (str) -> bool
+		try:
+			self[key]
+		except KeyError:
+			return False
+		return True
+
+	def __len__(self):
+		# type: () -> int
+		return self._count
+
+	def items(self):
+		# type: () -> Iterator[Tuple[str, Tuple[int, str]]]
+		"""
+		Iterate over all entries.
+
+		:returns: Iterator of 2-tuples (key, (layer-number, value)).
+		"""
+		offset = self._start
+		while offset < self._end:
+			name, reg, value, offset = self._entry(offset)
+			yield (name.decode('UTF-8'), (reg, value))
+
+	@classmethod
+	def write(cls, filename, files):
+		# type: (str, List[Tuple[int, str]]) -> None
+		"""
+		Atomically generate snapshot from the layer files.
+
+		Nothing is written if a layer file is modified concurrently.
+
+		:param filename: File name of the snapshot.
+		:param files: List of 2-tuples (layer-number, file-name) ordered by priority.
+		:raises EnvironmentError: if the snapshot cannot be written.
+		"""
+		keys = []  # type: List[Tuple[int, int, int]]
+		merge = {}  # type: Dict[bytes, Tuple[int, bytes]]
+		mode = 0o644
+		for reg, layer_file in files:
+			key = _file_key(layer_file)
+			layer = _ConfigRegistry(layer_file)
+			layer.load()
+			if _file_key(layer_file) != key:
+				return
+			if key[0]:
+				mode &= os.stat(layer_file).st_mode
+			keys.append(key)
+			for name, value in layer.items():
+				merge.setdefault(cls._encode(name), (reg, cls._encode(value)))
+
+		buckets = 8
+		while buckets < 2 * len(merge):
+			buckets *= 2
+		table = [0] * buckets
+		start = cls.HEADER.size + len(keys) * cls.FILE.size + buckets * cls.BUCKET.size
+		entries = []  # type: List[bytes]
+		offset = start
+		for name, (reg, value) in sorted(merge.items()):
+			index = zlib.crc32(name) & (buckets - 1)
+			while table[index]:
+				index = (index + 1) & (buckets - 1)
+			table[index] = offset
+			entry = cls.ENTRY.pack(reg, len(name), len(value)) + name + value
+			entries.append(entry)
+			offset += len(entry)
+
+		tmp_filename = '%s.%d' % (filename, os.getpid())
+		try:
+			with open(tmp_filename, 'wb') as fd:
+				os.chmod(tmp_filename, mode & 0o666)
+				fd.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(keys), len(merge), buckets, start, offset))
+				for key in keys:
+					fd.write(cls.FILE.pack(*key))
+				fd.write(struct.pack('<%dI' % buckets, *table))
+				fd.write(b''.join(entries))
+			os.rename(tmp_filename, filename)
+		except EnvironmentError:
+			if os.path.exists(tmp_filename):
+				os.unlink(tmp_filename)
+			raise
+
+
 # vim:set sw=4 ts=4 noet:
@@ -309,6 +309,10 @@ def handler_commit(args, opts=dict()):
 	handlers.load()
 	handlers.commit(ucr, args)
 
+	if opts.get('timing'):
+		for name, duration in sorted(handlers.timings, key=lambda timing: timing[1], reverse=True):
+			print('%8.3fs %s' % (duration, name))
+
 
 def handler_register(args, opts=dict()):
 	# type: (List[str], Dict[str, Any]) -> None
@@ -609,9 +613,10 @@ Actions:
     `version/version: 1.0` => `version_version="1.0"`
     (deprecated: use --shell dump instead)
 
-  commit [file1 ...]:
+  commit [--timing] [file1 ...]:
     rebuild configuration file from univention template; if
     no file is specified ALL configuration files are rebuilt
+    --timing: print the duration of each handler
 
   filter [file]:
     evaluate a template file, expects python inline code in UTF-8 or US-ASCII
@@ -711,6 +716,9 @@ OPT_COMMANDS = {
 		'non-empty': [BOOL, False],
 		'verbose': [BOOL, False],
 	},
+	'commit': {
+		'timing': [BOOL, False],
+	},
 	'filter': {
 		'encode-utf8': [BOOL, False],
 		'disallow-execution': [BOOL, False],
@@ -44,6 +44,13 @@ import re
 import subprocess
 import pickle
 import errno
+import hashlib
+import struct
+import threading
+import atexit
+import time
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 
 import six
 
@@ -55,7 +62,7 @@ from univention.debhelper import parseRfc822  # pylint: disable-msg=W0403
 if six.PY2:
 	from io import open
 try:
-	from typing import Any, Dict, IO, Iterable, List, Mapping, Optional, Set, Tuple, Union  # noqa F401
+	from typing import Any, Callable, Dict, IO, Iterable, List, Mapping, Optional, Set, Tuple, Union  # noqa F401
 	_OPT = Mapping[str, Any]
 	_UCR = Mapping[str, str]
 	_CHANGES = Mapping[str, Tuple[Optional[str], Optional[str]]]
@@ -89,11 +96,11 @@ assert asciify(WARNING_TEXT) == WARNING_TEXT, "Only ASCII allowed in WARNING_TEX
 
 
 def run_filter(template, directory, srcfiles=set(), opts=dict()):
-	# type: (str, _UCR, Iterable[str], _OPT) -> bytes
+	# type: (Union[str, Tuple[str, ...]], _UCR, Iterable[str], _OPT) -> bytes
 	"""
 	Process a template file: substitute variables.
 
-	:param template: Text string of template.
+	:param template: Text string of template or template compiled by :py:func:`compile_template`.
 	:param directory: UCR instance.
 	:param srcfiles: File names of source template.
 	:param opts: Command line options.
@@ -114,37 +121,225 @@ def run_filter(template, directory, srcfiles=set(), opts=dict()):
 	return tmpl
 
 
+def compile_template(template):
+	# type: (str) -> Tuple[str, ...]
+	"""
+	Split template text at the `@%@` delimiters.
+
+	:param template: Text string of template.
+	:returns: Tuple with the literal text at even and the variable names at odd positions.
+	"""
+	tokens = VARIABLE_TOKEN.split(template)
+	if not len(tokens) % 2:
+		# unmatched last delimiter is kept as text
+		tokens[-2:] = ['@%@'.join(tokens[-2:])]
+	return tuple(tokens)
+
+
 def _replace_variables(template, directory, srcfiles):
-	# type: (str, _UCR, Iterable[str]) -> str
-	while True:
-		i = VARIABLE_TOKEN.finditer(template)
+	# type: (Union[str, Tuple[str, ...]], _UCR, Iterable[str]) -> str
+	tokens = list(template if isinstance(template, tuple) else compile_template(template))
+	for i in range(1, len(tokens), 2):
+		name = tokens[i]
+		if name in directory:
+			value = directory[name]
+			if not isinstance(value, str):
+				# Python 2 with unicode value
+				value = value.encode('UTF-8')  # important! template must not be of type unicode ever (in py2), otherwise some characters are lost in the below subprocess stdinput
+		else:
+			match = WARNING_PATTERN.match(name)
+			if match:
+				mode, prefix = match.groups()
+				value = warning_string(prefix, srcfiles=srcfiles)
+				if mode == "UCRWARNING_ASCII":
+					value = asciify(value)
+			else:
+				value = ''
+
+		if isinstance(value, (list, tuple)):
+			value = value[0]
+		tokens[i] = value
+
+	return ''.join(tokens)
+
+
+class _PickleCache(object):
+	"""
+	Base class for caches persisted in the :py:attr:`ConfigHandlers.CACHE_FILE`-directory.
+
+	The cache is loaded lazily and only written back by :py:meth:`save` when modified.
+	"""
+	NAME = ''
+	VERSION = 1
+
+	def __init__(self):
+		# type: () -> None
+		self._lock = threading.Lock()
+		self._data = None  # type: Optional[Dict[str, Any]]
+		self._dirty = False
+
+	@property
+	def filename(self):
+		# type: () -> str
+		return os.path.join(os.path.dirname(ConfigHandlers.CACHE_FILE), self.NAME)
+
+	def _load(self):
+		# type: () -> Dict[str, Any]
+		if self._data is None:
+			try:
+				with open(self.filename, 'rb') as cache_file:
+					version, data = pickle.load(cache_file)
+				if version != self.VERSION:
+					raise TypeError("Invalid cache file version.")
+			except (Exception, pickle.UnpicklingError):
+				data = {}
+			self._data = data
+		return self._data
+
+	def _store(self, key, value):
+		# type: (str, Any) -> None
+		with self._lock:
+			self._load()[key] = value
+			self._dirty = True
+
+	def save(self):
+		# type: () -> None
+		"""Write cache file if anything changed."""
+		with self._lock:
+			if not self._dirty:
+				return
+			self._dirty = False
+			data = dict(self._data or {})
+		tmp_filename = '%s.%d' % (self.filename, os.getpid())
 		try:
-			start = next(i)
-			end = next(i)
-			name = template[start.end():end.start()]
+			with open(tmp_filename, 'wb') as cache_file:
+				pickle.dump((self.VERSION, data), cache_file, pickle.HIGHEST_PROTOCOL)
+			os.rename(tmp_filename, self.filename)
+		except EnvironmentError as ex:
+			if os.path.exists(tmp_filename):
+				os.unlink(tmp_filename)
+			if ex.errno not in (errno.EACCES, errno.ENOENT):
+				raise
 
-			if name in directory:
-				value = directory[name]
-				if not isinstance(value, str):
-					# Python 2 with unicode value
-					value = value.encode('UTF-8')  # important! template must not be of type unicode ever (in py2), otherwise some characters are lost in the below subprocess stdinput
-			else:
-				match = WARNING_PATTERN.match(name)
-				if match:
-					mode, prefix = match.groups()
-					value = warning_string(prefix, srcfiles=srcfiles)
-					if mode == "UCRWARNING_ASCII":
-						value = asciify(value)
-				else:
-					value = ''
 
-			if isinstance(value, (list, tuple)):
-				value = value[0]
-			template = template[:start.start()] + value + template[end.end():]
-		except StopIteration:
-			break
+class _TemplateCache(_PickleCache):
+	"""
+	Compiled template files.
+
+	Templates are validated by their modification time and size and are persisted
+	in :py:attr:`ConfigHandlers.CACHE_FILE`-directory as `templates`.
+	"""
+	NAME = 'templates'
+
+	def get(self, filename):
+		# type: (str) -> Tuple[Tuple[str, ...], Set[str]]
+		"""
+		Return compiled template file.
+
+		:param filename: Template file name.
+		:returns: 2-tuple (compiled-template, set-of-variable-names).
+		:raises EnvironmentError: if the file cannot be read.
+		"""
+		stat = os.stat(filename)
+		with self._lock:
+			try:
+				mtime, size, tokens, variables = self._load()[filename]
+				if (mtime, size) == (stat.st_mtime, stat.st_size):
+					return tokens, variables
+			except KeyError:
+				pass
+
+		with open(filename, 'r', encoding='utf-8') as fd:
+			tokens = compile_template(fd.read())
+		variables = set(name for name in tokens[1::2] if not WARNING_PATTERN.match(name))
+
+		self._store(filename, (stat.st_mtime, stat.st_size, tokens, variables))
+		return tokens, variables
+
+
+_templates = _TemplateCache()
+
+
+def _file_digest(filename):
+	# type: (str) -> Optional[str]
+	"""
+	Return digest of file content.
+
+	:param filename: File name.
+	:returns: Hex digest or `None` if the file cannot be read.
+	"""
+	try:
+		with open(filename, 'rb') as fd:
+			return hashlib.sha256(fd.read()).hexdigest()
+	except EnvironmentError:
+		return None
+
+
+class _DigestCache(_PickleCache):
+	"""
+	Digests of generated files.
+
+	For each target file the digest of the rendering inputs and of the written
+	content is remembered, so unchanged files are neither rendered nor rewritten.
+	"""
+	NAME = 'digests'
+
+	@staticmethod
+	def inputs(ucr, templates, srcfiles):
+		# type: (_UCR, Iterable[Tuple[str, Tuple[str, ...]]], Iterable[str]) -> Optional[str]
+		"""
+		Return digest of all rendering inputs.
+
+		:param ucr: UCR instance.
+		:param templates: List of 2-tuples (file-name, compiled-template).
+		:param srcfiles: File names of source templates.
+		:returns: Hex digest or `None` if a template contains `@!@` sections, whose output cannot be predicted.
+		"""
+		data = [sorted(srcfiles)]  # type: List[Any]
+		for from_file, tokens in templates:
+			if any('@!@' in text for text in tokens[::2]):
+				return None
+			data.append((from_file, tokens, [ucr.get(name) for name in tokens[1::2]]))
+		return hashlib.sha256(repr(data).encode('utf-8')).hexdigest()
+
+	def unchanged(self, to_file, inputs):
+		# type: (str, Optional[str]) -> bool
+		"""
+		Check if target file was generated from the same inputs and was not modified since.
+
+		:param to_file: Destination file name.
+		:param inputs: Digest of the rendering inputs as returned by :py:meth:`inputs`.
+		:returns: `True` if rendering can be skipped.
+		"""
+		if inputs is None:
+			return False
+		with self._lock:
+			entry = self._load().get(to_file)
+		return entry is not None and entry[0] == inputs and entry[1] == _file_digest(to_file)
+
+	def update(self, to_file, inputs, digest):
+		# type: (str, Optional[str], str) -> None
+		"""
+		Remember digests of generated target file.
+
+		:param to_file: Destination file name.
+		:param inputs: Digest of the rendering inputs as returned by :py:meth:`inputs`.
+		:param digest: Digest of the written content.
+		"""
+		with self._lock:
+			if self._load().get(to_file) == (inputs, digest):
+				return
+		self._store(to_file, (inputs, digest))
+
+
+_digests = _DigestCache()
+
+
+def _save_caches():
+	# type: () -> None
+	_templates.save()
+	_digests.save()
 
-	return template
 
 
 def _replace_exec(template):
@@ -155,11 +350,28 @@ def _replace_exec(template):
 			start = next(i)
 			end = next(i)
 
-			proc = subprocess.Popen(
-				(sys.executable,),
-				stdin=subprocess.PIPE, stdout=subprocess.PIPE,
-				close_fds=True)
-			value = proc.communicate(b'''\
+			value = _exec_engine.run(template[start.end():end.start()])
+			template = template[:start.start()] + value + template[end.end():]
+
+		except StopIteration:
+			break
+
+	return template
+
+
+def _exec_subprocess(code):
+	# type: (bytes) -> bytes
+	"""
+	Execute Python code in a new interpreter.
+
+	:param code: The Python code of a `@!@` block.
+	:returns: The captured output.
+	"""
+	proc = subprocess.Popen(
+		(sys.executable,),
+		stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+		close_fds=True)
+	return proc.communicate(b'''\
 # -*- coding: utf-8 -*-
 import univention.config_registry
 configRegistry = univention.config_registry.ConfigRegistry()
@@ -167,13 +379,155 @@ configRegistry.load()
 # for compatibility
 baseConfig = configRegistry
 %s
-''' % template[start.end():end.start()])[0]
-			template = template[:start.start()] + value + template[end.end():]
+''' % code)[0]
 
-		except StopIteration:
-			break
 
-	return template
+# Runs in the worker process: loads UCR once, then forks a fresh child for
+# each block, which gets its own copy of the registry and its stdout
+# redirected into a pipe.
+_EXEC_WORKER = '''\
+import os
+import struct
+import sys
+import traceback
+import univention.config_registry
+configRegistry = univention.config_registry.ConfigRegistry()
+requests = os.fdopen(os.dup(0), 'rb')
+replies = os.fdopen(os.dup(1), 'wb')
+null = os.open(os.devnull, os.O_RDWR)
+os.dup2(null, 0)
+os.dup2(null, 1)
+while True:
+	header = requests.read(4)
+	if len(header) < 4:
+		break
+	code = requests.read(struct.unpack('!I', header)[0])
+	configRegistry.load()
+	read_fd, write_fd = os.pipe()
+	pid = os.fork()
+	if not pid:
+		try:
+			requests.close()
+			replies.close()
+			os.close(read_fd)
+			os.dup2(write_fd, 1)
+			os.close(write_fd)
+			namespace = {
+				'__name__': '__main__',
+				'__builtins__': __builtins__,
+				'univention': univention,
+				'configRegistry': configRegistry,
+				'baseConfig': configRegistry,
+			}
+			exec(compile(code, '<stdin>', 'exec'), namespace)
+		except SystemExit as exc:
+			if exc.code is not None and not isinstance(exc.code, int):
+				sys.stderr.write('%s\\n' % (exc.code,))
+		except BaseException:
+			traceback.print_exc()
+		finally:
+			for stream in (sys.stdout, sys.__stdout__, sys.stderr):
+				try:
+					stream.flush()
+				except Exception:
+					pass
+			os._exit(0)
+	os.close(write_fd)
+	with os.fdopen(read_fd, 'rb') as output:
+		value = output.read()
+	os.waitpid(pid, 0)
+	replies.write(struct.pack('!I', len(value)) + value)
+	replies.flush()
+'''
+
+
+class _ExecEngine(object):
+	"""
+	Execute `@!@` blocks in long-lived worker processes.
+
+	Each worker imports :py:mod:`univention.config_registry` and loads the
+	registry only once. For every block it forks a child, so blocks are still
+	isolated from each other like with a new interpreter per block.
+	Idle workers are kept in a pool, so concurrent callers each get their own.
+	Falls back to :py:func:`_exec_subprocess` if no worker can be used.
+	"""
+
+	def __init__(self):
+		# type: () -> None
+		self._lock = threading.Lock()
+		self._idle = []  # type: List[subprocess.Popen]
+		self._pid = os.getpid()
+		self.disabled = not hasattr(os, 'fork')
+
+	def _spawn(self):
+		# type: () -> subprocess.Popen
+		return subprocess.Popen(
+			(sys.executable, '-c', _EXEC_WORKER),
+			stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+			close_fds=True)
+
+	def _acquire(self):
+		# type: () -> subprocess.Popen
+		with self._lock:
+			if self._pid != os.getpid():
+				# forked: the pipes of the workers belong to the parent
+				self._idle = []
+				self._pid = os.getpid()
+			if self._idle:
+				return self._idle.pop()
+		return self._spawn()
+
+	def run(self, code):
+		# type: (bytes) -> bytes
+		"""
+		Execute the Python code of a `@!@` block.
+
+		:param code: The Python code.
+		:returns: The output of the code.
+		"""
+		if self.disabled:
+			return _exec_subprocess(code)
+
+		worker = self._acquire()
+		try:
+			worker.stdin.write(struct.pack('!I', len(code)) + code)
+			worker.stdin.flush()
+			header = worker.stdout.read(4)
+			if len(header) < 4:
+				raise EOFError()
+			value = worker.stdout.read(struct.unpack('!I', header)[0])
+		except (EnvironmentError, EOFError, ValueError) as ex:
+			print('W: failed to use the UCR template worker (%s), falling back to a new process for each block' % (ex,), file=sys.stderr)
+			self.disabled = True
+			self._stop(worker)
+			return _exec_subprocess(code)
+
+		with self._lock:
+			self._idle.append(worker)
+		return value
+
+	@staticmethod
+	def _stop(worker):
+		# type: (subprocess.Popen) -> None
+		try:
+			worker.stdin.close()
+			worker.stdout.close()
+			worker.wait()
+		except EnvironmentError:
+			pass
+
+	def close(self):
+		# type: () -> None
+		"""Stop all idle workers."""
+		with self._lock:
+			idle, self._idle = self._idle, []
+		if self._pid == os.getpid():
+			for worker in idle:
+				self._stop(worker)
+
+
+_exec_engine = _ExecEngine()
+atexit.register(_exec_engine.close)
 
 
 def run_script(script, arg, changes):
@@ -211,15 +565,20 @@ def run_module(modpath, fn, ucr, changes):
 	:param changes: Dictionary of changed UCR variables, mapping UCR variable names to 2-tuple (old-value, new-value).
 	"""
 	# temporarily prepend MODULE_DIR to load path
-	sys.path.insert(0, MODULE_DIR)
-	module_name = os.path.splitext(modpath)[0]
-	try:
-		module = __import__(module_name.replace(os.path.sep, '.'))
-		f = getattr(module, fn)
-		f(ucr, changes)
-	except (AttributeError, ImportError) as ex:
-		print(ex, file=sys.stderr)
-	del sys.path[0]
+	with _module_lock:
+		sys.path.insert(0, MODULE_DIR)
+		module_name = os.path.splitext(modpath)[0]
+		try:
+			module = __import__(module_name.replace(os.path.sep, '.'))
+			f = getattr(module, fn)
+			f(ucr, changes)
+		except (AttributeError, ImportError) as ex:
+			print(ex, file=sys.stderr)
+		del sys.path[0]
+
+
+# modules are run one at a time as they modify sys.path
+_module_lock = threading.RLock()
 
 
 def warning_string(prefix='# ', srcfiles=set()):
@@ -367,6 +726,66 @@ class ConfigHandlerDiverting(ConfigHandler):
 		filename = '.%s__ucr__commit__%s' % (basename, random.random())
 		return os.path.join(dirname, filename)
 
+	def _render(self, ucr, templates, srcfiles, stat):
+		# type: (_UCR, List[Tuple[str, Tuple[str, ...]]], Iterable[str], Optional[os.stat_result]) -> None
+		"""
+		Generate destination file from templates.
+
+		Rendering is skipped when the inputs are unchanged since the last run,
+		writing is skipped when the generated content is unchanged.
+
+		:param ucr: UCR instance.
+		:param templates: List of 2-tuples (file-name, compiled-template).
+		:param srcfiles: File names of source templates.
+		:param stat: File status used for the destination file.
+		"""
+		inputs = _digests.inputs(ucr, templates, srcfiles)
+		if _digests.unchanged(self.to_file, inputs):
+			self._set_perm(stat)
+			return
+
+		filter_opts = {}  # type: Dict[str, Any]
+		content = []
+		for from_file, template in templates:
+			try:
+				content.append(run_filter(template, ucr, srcfiles=srcfiles, opts=filter_opts))
+			except EnvironmentError:
+				continue
+		data = b''.join(content)
+
+		digest = hashlib.sha256(data).hexdigest()
+		if digest == _file_digest(self.to_file):
+			self._set_perm(stat)
+		else:
+			self._write(data, stat)
+		_digests.update(self.to_file, inputs, digest)
+
+	def _write(self, data, stat):
+		# type: (bytes, Optional[os.stat_result]) -> None
+		"""
+		Atomically replace destination file.
+
+		:param data: File content.
+		:param stat: File status used for the destination file.
+		"""
+		tmp_to_file = self._temp_file_name()
+		try:
+			with open(tmp_to_file, 'wb') as to_fp:
+				self._set_perm(stat, tmp_to_file)
+				to_fp.write(data)
+
+			try:
+				os.rename(tmp_to_file, self.to_file)
+			except EnvironmentError as ex:
+				if ex.errno == errno.EBUSY:
+					with open(self.to_file, 'w+', encoding='utf-8') as fd:
+						fd.write(open(tmp_to_file, 'r', encoding='utf-8').read())
+					os.unlink(tmp_to_file)
+		except Exception:
+			if os.path.exists(tmp_to_file):
+				os.unlink(tmp_to_file)
+			raise
+
 
 class ConfigHandlerMultifile(ConfigHandlerDiverting):
 	"""
@@ -435,31 +854,14 @@ class ConfigHandlerMultifile(ConfigHandlerDiverting):
 		else:
 			stat = None
 
-		tmp_to_file = self._temp_file_name()
-		try:
-			filter_opts = {}  # type: Dict[str, Any]
-
-			with open(tmp_to_file, 'wb') as to_fp:
-				self._set_perm(stat, tmp_to_file)
-
-				for from_file in sorted(self.from_files, key=os.path.basename):
-					try:
-						with open(from_file, 'r', encoding='utf-8') as from_fp:
-							to_fp.write(run_filter(from_fp.read(), ucr, srcfiles=self.from_files, opts=filter_opts))
-					except EnvironmentError:
-						continue
-
+		templates = []
+		for from_file in sorted(self.from_files, key=os.path.basename):
 			try:
-				os.rename(tmp_to_file, self.to_file)
-			except EnvironmentError as ex:
-				if ex.errno == errno.EBUSY:
-					with open(self.to_file, 'w+', encoding='utf-8') as fd:
-						fd.write(open(tmp_to_file, 'r', encoding='utf-8').read())
-					os.unlink(tmp_to_file)
-		except Exception:
-			if os.path.exists(tmp_to_file):
-				os.unlink(tmp_to_file)
-			raise
+				template, _variables = _templates.get(from_file)
+			except EnvironmentError:
+				continue
+			templates.append((from_file, template))
+		self._render(ucr, templates, self.from_files, stat)
 
 		if hasattr(self, 'postinst') and self.postinst:
 			run_module(self.postinst, 'postinst', ucr, changed)
@@ -525,26 +927,8 @@ class ConfigHandlerFile(ConfigHandlerDiverting):
 			print("The referenced template file does not exist", file=sys.stderr)
 			return None
 
-		tmp_to_file = self._temp_file_name()
-		try:
-			filter_opts = {}  # type: Dict[str, Any]
-
-			with open(self.from_file, 'r', encoding='utf-8') as from_fp, open(tmp_to_file, 'wb') as to_fp:
-				self._set_perm(stat, tmp_to_file)
-
-				to_fp.write(run_filter(from_fp.read(), ucr, srcfiles=[self.from_file], opts=filter_opts))
-
-			try:
-				os.rename(tmp_to_file, self.to_file)
-			except EnvironmentError as ex:
-				if ex.errno == errno.EBUSY:
-					with open(self.to_file, 'w+', encoding='utf-8') as fd:
-						fd.write(open(tmp_to_file, 'r', encoding='utf-8').read())
-					os.unlink(tmp_to_file)
-		except Exception:
-			if os.path.exists(tmp_to_file):
-				os.unlink(tmp_to_file)
-			raise
+		template, _variables = _templates.get(self.from_file)
+		self._render(ucr, [(self.from_file, template)], [self.from_file], stat)
 
 		if hasattr(self, 'postinst') and self.postinst:
 			run_module(self.postinst, 'postinst', ucr, changed)
@@ -632,6 +1016,23 @@ class ConfigHandlerModule(ConfigHandler):
 		run_module(self.module, 'handler', ucr, changed)
 
 
+def handler_name(handler):
+	# type: (ConfigHandler) -> str
+	"""
+	Return a name describing the handler.
+
+	:param handler: The handler.
+	:returns: The target file, script or module name.
+	"""
+	if isinstance(handler, ConfigHandlerDiverting):
+		return handler.to_file
+	elif isinstance(handler, ConfigHandlerScript):
+		return handler.script
+	elif isinstance(handler, ConfigHandlerModule):
+		return handler.module
+	return repr(handler)
+
+
 def grep_variables(text):
 	# type: (str) -> Set[str]
 	"""
@@ -642,6 +1043,75 @@ def grep_variables(text):
 	return set(VARIABLE_PATTERN.findall(text))
 
 
+REGEX_META = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+
+class _HandlerIndex(object):
+	"""
+	Index of the variable patterns of the handlers.
+
+	Like :py:func:`re.match` each pattern matches all variables starting with it.
+	Patterns without special characters are looked up by the prefixes of the
+	variable name, the regular expressions are grouped by their literal prefix,
+	so only the few expressions sharing a prefix with the variable are evaluated.
+
+	:param handlers: Mapping from variable pattern to set of handlers.
+	"""
+
+	def __init__(self, handlers):
+		# type: (Mapping[str, Set[ConfigHandler]]) -> None
+		self.literals = {}  # type: Dict[str, Set[ConfigHandler]]
+		self.patterns = {}  # type: Dict[str, List[Tuple[Any, Set[ConfigHandler]]]]
+		for reg_var, reg_handlers in handlers.items():
+			if not REGEX_META.search(reg_var):
+				self.literals.setdefault(reg_var, set()).update(reg_handlers)
+				continue
+			try:
+				_re = re.compile(reg_var)
+			except re.error as ex:
+				print('Failed to compile regular expression %s: %s' % (reg_var, ex), file=sys.stderr)
+				continue
+			self.patterns.setdefault(self._literal_prefix(reg_var), []).append((_re, reg_handlers))
+
+	@staticmethod
+	def _literal_prefix(pattern):
+		# type: (str) -> str
+		"""
+		Return the literal text every match of the regular expression starts with.
+
+		:param pattern: Regular expression.
+		:returns: The prefix, possibly empty.
+		"""
+		if '|' in pattern:
+			return ''
+		match = REGEX_META.search(pattern)
+		if not match:
+			return pattern
+		prefix = pattern[:match.start()]
+		if match.group() in '*?{':
+			# quantifier makes the last character optional
+			prefix = prefix[:-1]
+		return prefix
+
+	def __call__(self, variables):
+		# type: (Iterable[str]) -> Set[ConfigHandler]
+		"""
+		Find handlers for variables.
+
+		:param variables: Changed UCR variable names.
+		:returns: Set of handlers registered for any of the variables.
+		"""
+		pending_handlers = set()  # type: Set[ConfigHandler]
+		for variable in variables:
+			for i in range(len(variable) + 1):
+				prefix = variable[:i]
+				pending_handlers |= self.literals.get(prefix, set())
+				for _re, reg_handlers in self.patterns.get(prefix, ()):
+					if _re.match(variable):
+						pending_handlers |= reg_handlers
+		return pending_handlers
+
+
 class ConfigHandlers:
 	"""Manage handlers for configuration variables."""
 
@@ -650,9 +1120,10 @@ class ConfigHandlers:
 	# 1: with version header
 	# 2: switch to handlers mapping to set, drop file, add multifile.def_count
 	# 3: split config_registry into sub modules
-	VERSION = 3
-	VERSION_MIN = 3
-	VERSION_MAX = 3
+	# 4: add handler index
+	VERSION = 4
+	VERSION_MIN = 4
+	VERSION_MAX = 4
 	VERSION_TEXT = 'univention-config cache, version'
 	VERSION_NOTICE = '%s %s\n' % (VERSION_TEXT, VERSION)
 	VERSION_RE = re.compile('^%s (?P<version>[0-9]+)$' % VERSION_TEXT)
@@ -660,10 +1131,16 @@ class ConfigHandlers:
 	_handlers = {}    # type: Dict[str, Set[ConfigHandler]] # variable -> set(handlers)
 	_multifiles = {}  # type: Dict[str, ConfigHandlerMultifile] # multifile -> handler
 	_subfiles = {}    # type: Dict[str, List[Tuple[str, Set[str]]]] # multifile -> [(subfile, variables)] // pending
+	_index = None     # type: Optional[_HandlerIndex] # built from _handlers
+
+	try:
+		WORKERS = cpu_count()
+	except NotImplementedError:
+		WORKERS = 1
 
 	def __init__(self):
 		# type: () -> None
-		pass
+		self.timings = []  # type: List[Tuple[str, float]]
 
 	@staticmethod
 	def _get_cache_version(cache_file):
@@ -675,6 +1152,8 @@ class ConfigHandlers:
 		:returns: Version.
 		"""
 		line = cache_file.readline()    # IOError is propagated
+		if isinstance(line, bytes):
+			line = line.decode('utf-8', 'replace')
 		match = ConfigHandlers.VERSION_RE.match(line)
 		if match:
 			version = int(match.group('version'))
@@ -715,6 +1194,7 @@ class ConfigHandlers:
 					pickler.load()
 				self._subfiles = pickler.load()
 				self._multifiles = pickler.load()
+				self._index = pickler.load()
 		except (Exception, pickle.UnpicklingError):
 			self.update()
 
@@ -913,6 +1393,7 @@ class ConfigHandlers:
 		self._handlers.clear()
 		self._multifiles.clear()
 		self._subfiles.clear()
+		self._index = None
 
 		handlers = set()  # type: Set[ConfigHandler]
 		for info in directory_files(INFO_DIR):
@@ -967,6 +1448,14 @@ class ConfigHandlers:
 		for path, handler in wanted.items():
 			handler.install_divert()
 
+	@property
+	def index(self):
+		# type: () -> _HandlerIndex
+		"""Index to find the handlers for changed variables."""
+		if self._index is None:
+			self._index = _HandlerIndex(self._handlers)
+		return self._index
+
 	def _save_cache(self):
 		# type: () -> None
 		"""Write cache file."""
@@ -977,6 +1466,7 @@ class ConfigHandlers:
 				pickler.dump(self._handlers)
 				pickler.dump(self._subfiles)
 				pickler.dump(self._multifiles)
+				pickler.dump(self.index)
 		except IOError as ex:
 			if ex.errno != errno.EACCES:
 				raise
@@ -1005,6 +1495,7 @@ class ConfigHandlers:
 			for variable in handler.variables:
 				v2h = self._handlers.setdefault(variable, set())
 				v2h.add(handler)
+				self._index = None
 				values[variable] = (None, ucr[variable])
 				try:
 					_re = re.compile(variable)
@@ -1016,6 +1507,7 @@ class ConfigHandlers:
 			handler((ucr, values))
 
 		self._save_cache()
+		_save_caches()
 		return handlers
 
 	def unregister(self, package, ucr):
@@ -1080,21 +1572,10 @@ class ConfigHandlers:
 		"""
 		if not variables:
 			return
-		pending_handlers = set()  # type: Set[ConfigHandler]
 
-		for reg_var, handlers in self._handlers.items():
-			try:
-				_re = re.compile(reg_var)
-			except re.error as ex:
-				print('Failed to compile regular expression %s: %s' % (reg_var, ex), file=sys.stderr)
-				continue
+		self._run_handlers(self.index(variables), lambda handler: handler(arg))
 
-			for variable in variables:
-				if _re.match(variable):
-					pending_handlers |= handlers
-
-		for handler in pending_handlers:
-			handler(arg)
+		_save_caches()
 
 	def commit(self, ucr, filelist=list()):
 		# type: (_UCR, Iterable[str]) -> None
@@ -1141,8 +1622,52 @@ class ConfigHandlers:
 			print('Warning: The file %r is not registered as an UCR template.' % (fname,), file=sys.stderr)
 
 		# call handlers
-		for handler in pending_handlers:
-			self.call_handler(ucr, handler)
+		self._run_handlers(pending_handlers, lambda handler: self.call_handler(ucr, handler))
+
+		_save_caches()
+
+	def _run_handlers(self, handlers, call):
+		# type: (Iterable[ConfigHandler], Callable[[ConfigHandler], None]) -> None
+		"""
+		Run handlers: file and multifile handlers for different target files
+		in parallel using :py:attr:`WORKERS` threads, handlers for the same
+		target file one after the other. Scripts and modules are run afterwards
+		one by one, ordered by name. The duration of each handler is appended
+		to :py:attr:`timings`.
+
+		:param handlers: The handlers to run.
+		:param call: Function to call a handler.
+		"""
+		def run(group):
+			# type: (List[ConfigHandler]) -> None
+			for handler in group:
+				start = time.time()
+				try:
+					call(handler)
+				finally:
+					self.timings.append((handler_name(handler), time.time() - start))
+
+		files = {}  # type: Dict[str, List[ConfigHandler]]
+		others = []  # type: List[ConfigHandler]
+		for handler in handlers:
+			if isinstance(handler, ConfigHandlerDiverting):
+				files.setdefault(handler.to_file, []).append(handler)
+			else:
+				others.append(handler)
+
+		groups = [files[to_file] for to_file in sorted(files)]
+		if self.WORKERS > 1 and len(groups) > 1:
+			pool = ThreadPool(min(self.WORKERS, len(groups)))
+			try:
+				pool.map(run, groups, chunksize=1)
+			finally:
+				pool.close()
+				pool.join()
+		else:
+			for group in groups:
+				run(group)
+
+		run(sorted(others, key=handler_name))
 
 	def call_handler(self, ucr, handler):
 		# type: (_UCR, ConfigHandler) -> None
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+#
+#  watch configuration registry files for changes
+#
+# Copyright 2021 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+
+"""Univention Configuration Registry watcher for changed layer files."""
+
+import os
+import errno
+import select
+import threading
+import traceback
+import weakref
+import ctypes
+
+from univention.config_registry.backend import _file_key
+
+try:
+	from typing import Callable, Dict, List, Optional, Set  # noqa F401
+except ImportError:  # pragma: no cover
+	pass
+
+__all__ = ['Watcher']
+
+
+class _Inotify(object):
+	"""
+	Minimal :manpage:`inotify(7)` binding watching directories for replaced or rewritten files.
+
+	:raises EnvironmentError: if inotify is not available.
+	"""
+	IN_CLOSE_WRITE = 0x00000008
+	IN_MOVED_FROM = 0x00000040
+	IN_MOVED_TO = 0x00000080
+	IN_CREATE = 0x00000100
+	IN_DELETE = 0x00000200
+	MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+	IN_NONBLOCK = 0o4000
+	IN_CLOEXEC = 0o2000000
+
+	def __init__(self):
+		# type: () -> None
+		try:
+			self._libc = ctypes.CDLL(None, use_errno=True)
+			init = self._libc.inotify_init1
+		except (EnvironmentError, AttributeError):
+			raise EnvironmentError(errno.ENOSYS, 'inotify not available')
+		self.fd = init(self.IN_CLOEXEC | self.IN_NONBLOCK)
+		if self.fd < 0:
+			err = ctypes.get_errno()
+			raise EnvironmentError(err, os.strerror(err))
+
+	def add_watch(self, path):
+		# type: (str) -> None
+		"""
+		Watch directory.
+
+		:param path: Directory name.
+		"""
+		if self._libc.inotify_add_watch(self.fd, path.encode('UTF-8'), self.MASK) < 0:
+			err = ctypes.get_errno()
+			raise EnvironmentError(err, os.strerror(err), path)
+
+	def drain(self):
+		# type: () -> None
+		"""Discard all pending events."""
+		while True:
+			try:
+				if not os.read(self.fd, 65536):
+					return
+			except EnvironmentError as ex:
+				if ex.errno in (errno.EAGAIN, errno.EINTR):
+					return
+				raise
+
+	def close(self):
+		# type: () -> None
+		os.close(self.fd)
+
+
+class Watcher(threading.Thread):
+	"""
+	Background thread watching files for changes.
+
+	The files are identified by their inode, size and modification time. The
+	directories containing them are watched by :manpage:`inotify(7)`, if
+	available, otherwise the files are polled every :py:attr:`POLL_INTERVAL`
+	seconds.
+
+	:param files: Mapping from layer number to file name.
+	:param callback: Function called with the set of layer numbers whose files changed.
+		A bound method does not keep its object alive: watching stops when the object is garbage collected.
+	"""
+	POLL_INTERVAL = 1.0
+
+	def __init__(self, files, callback):
+		# type: (Dict[int, str], Callable[[Set[int]], None]) -> None
+		super(Watcher, self).__init__(name='ucr-watcher')
+		self.daemon = True
+		self._files = dict((reg, filename) for reg, filename in files.items() if filename != os.devnull)
+		self._callback = callback
+		self._owner = None  # type: Optional[weakref.ReferenceType]
+		owner = getattr(callback, '__self__', None)
+		if owner is not None:
+			self._callback = callback.__func__
+			self._owner = weakref.ref(owner, lambda ref: self.stop())
+		self._keys = dict((reg, _file_key(filename)) for reg, filename in self._files.items())
+		self._stop_r, self._stop_w = os.pipe()
+
+		self._inotify = None  # type: Optional[_Inotify]
+		try:
+			self._inotify = _Inotify()
+			for path in set(os.path.dirname(filename) or '.' for filename in self._files.values()):
+				self._inotify.add_watch(path)
+		except EnvironmentError:
+			if self._inotify is not None:
+				self._inotify.close()
+			self._inotify = None
+
+	def _changed(self):
+		# type: () -> Set[int]
+		"""
+		Return changed layers.
+
+		:returns: Set of layer numbers whose files changed since the last call.
+		"""
+		changed = set()
+		for reg, filename in self._files.items():
+			key = _file_key(filename)
+			if key != self._keys[reg]:
+				self._keys[reg] = key
+				changed.add(reg)
+		return changed
+
+	def run(self):
+		# type: () -> None
+		fds = [self._stop_r]
+		if self._inotify is not None:
+			fds.append(self._inotify.fd)
+			timeout = None  # type: Optional[float]
+		else:
+			timeout = self.POLL_INTERVAL
+
+		try:
+			self._watch(fds, timeout)
+		finally:
+			self._close()
+
+	def _watch(self, fds, timeout):
+		# type: (List[int], Optional[float]) -> None
+		while True:
+			try:
+				ready = select.select(fds, [], [], timeout)[0]
+			except select.error as ex:
+				if ex.args[0] == errno.EINTR:
+					continue
+				raise
+			if self._stop_r in ready:
+				return
+			if self._inotify is not None:
+				self._inotify.drain()
+
+			changed = self._changed()
+			if changed:
+				try:
+					self._notify(changed)
+				except Exception:
+					traceback.print_exc()
+
+	def _notify(self, changed):
+		# type: (Set[int]) -> None
+		"""
+		Call the callback.
+
+		:param changed: Set of changed layer numbers.
+		"""
+		if self._owner is None:
+			self._callback(changed)
+			return
+		owner = self._owner()
+		if owner is not None:
+			self._callback(owner, changed)
+
+	def _close(self):
+		# type: () -> None
+		os.close(self._stop_r)
+		if self._inotify is not None:
+			self._inotify.close()
+
+	def stop(self):
+		# type: () -> None
+		"""Stop watching and wait for the thread to terminate."""
+		if self._stop_w is None:
+			return
+		os.write(self._stop_w, b'x')
+		os.close(self._stop_w)
+		self._stop_w = None
+		if self.ident is None:
+			self._close()
+		elif threading.current_thread() is not self:
+			self.join()
+
+# vim:set sw=4 ts=4 noet:
@@ -454,3 +454,68 @@ class TestDefault(object):
 	def test_recusrion(self, ucr0, tmpdir):
 		ucr0._registry[ucr0.DEFAULTS]["key"] = "@%@key@%@"
 		assert ucr0["key"] == ""
+
+
+class TestSnapshot(object):
+
+	"""
+	Unit test for py:class:`univention.config_registry.backend._Snapshot`
+	"""
+
+	def test_used(self, ucrf, tmpdir):
+		assert (tmpdir / "base.snapshot").check(file=1)
+		assert ucrf._snapshot is not None
+		assert ucrf["foo"] == "LDAP"
+		assert ucrf.get("bar", getscope=True) == (ConfigRegistry.LDAP, "LDAP")
+		assert "baz" in ucrf
+		assert "unset" not in ucrf
+		assert ucrf.get("unset", "default") == "default"
+		assert dict(ucrf.items()) == {"foo": "LDAP", "bar": "LDAP", "baz": "NORMAL"}
+
+	def test_many(self, ucr0):
+		ucr = ConfigRegistry()
+		for i in range(100):
+			ucr["key%d" % i] = u"v\xe4lue%d" % i
+		ucr.save()
+		ucr0.load()
+		assert ucr0._snapshot is not None
+		assert len(ucr0) == 100
+		assert all(ucr0["key%d" % i] == u"v\xe4lue%d" % i for i in range(100))
+
+	def test_default(self, ucr0):
+		ucr = ConfigRegistry(write_registry=ConfigRegistry.DEFAULTS)
+		ucr["key"] = "@%@ref@%@"
+		ucr.save()
+		ucr = ConfigRegistry()
+		ucr["ref"] = "val"
+		ucr.save()
+		ucr0.load()
+		assert ucr0._snapshot is not None
+		assert ucr0["key"] == "val"
+
+	def test_stale(self, ucrf, tmpdir):
+		(tmpdir / "base.conf").write("# univention_ base.conf\n\nbaz: EXTERNAL\n")
+		ucrf.load()
+		assert ucrf._snapshot is None
+		assert ucrf["baz"] == "EXTERNAL"
+
+	def test_invalid(self, ucrf, tmpdir):
+		(tmpdir / "base.snapshot").write("invalid")
+		ucr = ConfigRegistry().load()
+		assert ucr._snapshot is None
+		assert ucr["baz"] == "NORMAL"
+
+	def test_write(self, ucrf):
+		ucrf["baz"] = "NEW"
+		assert ucrf._snapshot is None
+		ucrf.save()
+		assert ucrf["bar"] == "LDAP"
+		ucr = ConfigRegistry().load()
+		assert ucr._snapshot is not None
+		assert ucr["baz"] == "NEW"
+
+	def test_custom(self, tmpucr, tmpdir):
+		ucr = ConfigRegistry()
+		ucr["key"] = "val"
+		ucr.save()
+		assert not (tmpdir / "base.snapshot").check()
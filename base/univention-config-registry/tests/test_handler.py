@@ -6,6 +6,7 @@ import sys
 from argparse import Namespace
 from os import stat_result
 from os.path import dirname
+from io import BytesIO
 try:
 	from StringIO import StringIO
 except ImportError:
@@ -30,6 +31,7 @@ def test_filter_var(tmpl, out, ucrf):
 
 
 def test_filter_script(mocker, ucrf):
+	mocker.patch.object(ucrh._exec_engine, "disabled", True)
 	Popen = mocker.patch("subprocess.Popen")
 	Popen.return_value.communicate.return_value = (b"42", b"")
 	assert ucrh.run_filter("@!@print(42)@!@", ucrf) == b"42"
@@ -37,6 +39,45 @@ def test_filter_script(mocker, ucrf):
 	Popen.return_value.communicate.assert_called_once()
 
 
+@pytest.fixture
+def engine(monkeypatch, tmpucr):
+	monkeypatch.setenv("PYTHONPATH", ":".join(sys.path))
+	engine = ucrh._ExecEngine()
+	monkeypatch.setattr(ucrh, "_exec_engine", engine)
+	yield engine
+	engine.close()
+
+
+@pytest.mark.parametrize("tmpl,out", [
+	("@!@print(42)@!@", b"42\n"),
+	("1@!@print(configRegistry is baseConfig)@!@2", b"1True\n2"),
+	("@!@x = 1@!@@!@print('x' in globals())@!@", b"False\n"),
+	("@!@import os\nos.system('echo 42')@!@", b"42\n"),
+	("@!@print(1)\nraise SystemExit(0)\nprint(2)@!@", b"1\n"),
+])
+def test_filter_script_engine(tmpl, out, ucrf, engine):
+	assert ucrh.run_filter(tmpl, ucrf) == out
+	assert not engine.disabled
+	assert len(engine._idle) == 1
+
+
+def test_filter_script_engine_error(ucrf, engine, capfd):
+	assert ucrh.run_filter("@!@print(1)\nraise ValueError(42)@!@2", ucrf) == b"1\n2"
+	assert "ValueError: 42" in capfd.readouterr().err
+	assert ucrh.run_filter("@!@print(3)@!@", ucrf) == b"3\n"
+
+
+def test_filter_script_engine_fallback(mocker, ucrf, engine):
+	mocker.patch.object(engine, "_spawn", side_effect=OSError)
+	fallback = mocker.patch.object(ucrh, "_exec_subprocess", return_value=b"42")
+	with pytest.raises(OSError):
+		ucrh.run_filter("@!@print(42)@!@", ucrf)
+	mocker.patch.object(engine, "_spawn").return_value.stdout.read.return_value = b""
+	assert ucrh.run_filter("@!@print(42)@!@", ucrf) == b"42"
+	assert engine.disabled
+	fallback.assert_called_once_with(b"print(42)")
+
+
 @pytest.mark.parametrize("tmpl,line", [
 	("@%@BCWARNING=// @%@", "// "),
 	("@%@UCRWARNING=# @%@", "# "),
@@ -46,6 +87,44 @@ def test_filter_warning(tmpl, line, ucrf):
 	assert line in ucrh.run_filter(tmpl, ucrf, {"01head", "02tail"}).decode('UTF-8')
 
 
+@pytest.mark.parametrize("tmpl,tokens", [
+	("", ("",)),
+	("txt", ("txt",)),
+	("@%@foo@%@", ("", "foo", "")),
+	("1@%@foo@%@2@%@bar@%@3", ("1", "foo", "2", "bar", "3")),
+	("1@%@foo@%@2@%@3", ("1", "foo", "2@%@3")),
+	("1@%@2", ("1@%@2",)),
+])
+def test_compile_template(tmpl, tokens):
+	assert ucrh.compile_template(tmpl) == tokens
+
+
+def test_filter_compiled(ucrf):
+	assert ucrh.run_filter(ucrh.compile_template("1@%@baz@%@2"), ucrf) == b"1NORMAL2"
+
+
+def test_filter_value_not_expanded(ucrf):
+	ucrf["baz"] = "@%@foo@%@"
+	assert ucrh.run_filter("@%@baz@%@", ucrf) == b"@%@foo@%@"
+
+
+def test_template_cache(tmpdir, tmpcache):
+	tmpl = tmpdir / "tmpl"
+	tmpl.write("@%@foo@%@ @%@UCRWARNING=# @%@")
+	cache = ucrh._TemplateCache()
+	assert cache.get(str(tmpl)) == (("", "foo", " ", "UCRWARNING=# ", ""), {"foo"})
+	cache.save()
+	assert (tmpdir / "templates").check(file=1)
+
+	cache = ucrh._TemplateCache()
+	assert cache.get(str(tmpl)) == (("", "foo", " ", "UCRWARNING=# ", ""), {"foo"})
+	assert not cache._dirty
+
+	tmpl.write("@%@bar@%@")
+	assert cache.get(str(tmpl)) == (("", "bar", ""), {"bar"})
+	assert cache._dirty
+
+
 def test_run_script(mocker):
 	Popen = mocker.patch("subprocess.Popen")
 
@@ -229,6 +308,52 @@ def test_ConfigHandlerFile(mocker):
 	h((ucr, changes))
 
 
+@pytest.fixture
+def hfile(tmpdir, tmpcache, mocker):
+	mocker.patch("univention.config_registry.handler.run_script")
+	mocker.patch.object(ucrh, "_digests", ucrh._DigestCache())
+	tmpl = tmpdir / "tmpl"
+	tmpl.write("@%@foo@%@\n")
+	return ucrh.ConfigHandlerFile(str(tmpl), str(tmpdir / "out"))
+
+
+def test_ConfigHandlerFile_unchanged(hfile, tmpdir, mocker):
+	out = tmpdir / "out"
+	run_filter = mocker.patch("univention.config_registry.handler.run_filter", wraps=ucrh.run_filter)
+	write = mocker.patch.object(hfile, "_write", wraps=hfile._write)
+
+	hfile(({"foo": "1", "bar": "1"}, {}))
+	assert out.read() == "1\n"
+	assert (run_filter.call_count, write.call_count) == (1, 1)
+
+	hfile(({"foo": "1", "bar": "2"}, {}))
+	assert (run_filter.call_count, write.call_count) == (1, 1)
+
+	hfile(({"foo": "2", "bar": "2"}, {}))
+	assert out.read() == "2\n"
+	assert (run_filter.call_count, write.call_count) == (2, 2)
+
+	out.write("modified")
+	hfile(({"foo": "2", "bar": "2"}, {}))
+	assert out.read() == "2\n"
+	assert (run_filter.call_count, write.call_count) == (3, 3)
+
+	ucrh._digests.save()
+	assert (tmpdir / "digests").check(file=1)
+
+
+def test_ConfigHandlerFile_unchanged_exec(hfile, tmpdir, mocker):
+	(tmpdir / "tmpl").write("@!@print(1)@!@\n")
+	mocker.patch("univention.config_registry.handler._replace_exec", side_effect=lambda tmpl: b"1\n")
+	run_filter = mocker.patch("univention.config_registry.handler.run_filter", wraps=ucrh.run_filter)
+	write = mocker.patch.object(hfile, "_write", wraps=hfile._write)
+
+	hfile(({}, {}))
+	hfile(({}, {}))
+	assert (tmpdir / "out").read() == "1\n"
+	assert (run_filter.call_count, write.call_count) == (2, 1)
+
+
 def test_ConfigHandlerScipt(mocker):
 	h1 = ucrh.ConfigHandlerScript("script1")
 	h2 = ucrh.ConfigHandlerScript("script2")
@@ -393,6 +518,7 @@ class TestConfigHandlers():
 		("univention-config cache, version 1\n", 1),
 		("univention-config cache, version 2\n", 2),
 		("univention-config cache, version 3\n", 3),
+		("univention-config cache, version 4\n", 4),
 	])
 	def test_get_cache_version(self, data, version):
 		cache = StringIO(data)
@@ -406,11 +532,14 @@ class TestConfigHandlers():
 
 		h2 = ucrh.ConfigHandlers()
 		h2.load()
-		if sys.version_info >= (3,):
-			pytest.xfail("BUG")
 		assert h2._handlers == handlers._handlers
 		assert h2._subfiles == handlers._subfiles
 		assert h2._multifiles == handlers._multifiles
+		assert h2._index.literals == {"var": set()}
+
+	def test_get_cache_version_binary(self):
+		cache = BytesIO(b"univention-config cache, version 4\n")
+		assert 4 == ucrh.ConfigHandlers._get_cache_version(cache)
 
 	@pytest.mark.skip
 	def test_update(self, handlers):
@@ -428,9 +557,47 @@ class TestConfigHandlers():
 	def test_unregister(self, handlers):
 		pass
 
-	@pytest.mark.skip
-	def test_call(self, handlers):
-		pass
+	def test_call(self, handlers, mocker):
+		h1, h2, h3 = mocker.Mock(), mocker.Mock(), mocker.Mock()
+		handlers._handlers = {"foo": {h1}, "foo/.*/bar": {h2}, "(x|y)": {h3}, "[": {h3}}
+		handlers._index = None
+		handlers(["foo/1/bar"], "arg")
+		h1.assert_called_once_with("arg")
+		h2.assert_called_once_with("arg")
+		h3.assert_not_called()
+		handlers(["y"], "arg")
+		h3.assert_called_once_with("arg")
+
+	def test_run_handlers(self, handlers):
+		handlers.WORKERS = 4
+		f1, f2, f3 = ucrh.ConfigHandlerFile("a", "/f1"), ucrh.ConfigHandlerMultifile("b", "/f1"), ucrh.ConfigHandlerFile("c", "/f2")
+		s1, m1 = ucrh.ConfigHandlerScript("/s1"), ucrh.ConfigHandlerModule("m1")
+		calls = []
+		handlers._run_handlers([m1, s1, f3, f2, f1], calls.append)
+		assert set(calls[:3]) == {f1, f2, f3}
+		assert calls[3:] == [s1, m1]
+		assert sorted(name for name, duration in handlers.timings) == ["/f1", "/f1", "/f2", "/s1", "m1"]
+
+	def test_run_handlers_error(self, handlers, mocker):
+		handlers.WORKERS = 4
+		f1, f2 = ucrh.ConfigHandlerFile("a", "/f1"), ucrh.ConfigHandlerFile("b", "/f2")
+		call = mocker.Mock(side_effect=[ValueError(), None])
+		with pytest.raises(ValueError):
+			handlers._run_handlers([f1, f2], call)
+		assert call.call_count == 2
+
+	@pytest.mark.parametrize("pattern,prefix", [
+		("foo", "foo"),
+		("foo/.*", "foo/"),
+		("foo?", "fo"),
+		("foo{2}", "fo"),
+		("foo+", "foo"),
+		("foo|bar", ""),
+		(r"foo\.bar", "foo"),
+		(".*", ""),
+	])
+	def test_index_prefix(self, pattern, prefix):
+		assert ucrh._HandlerIndex._literal_prefix(pattern) == prefix
 
 	@pytest.mark.skip
 	def test_commit(self, handlers):
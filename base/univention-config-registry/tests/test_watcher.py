@@ -0,0 +1,102 @@
+#!/usr/bin/python
+"""Unit test for univention.config_registry.watcher."""
+# pylint: disable-msg=C0103,E0611,R0904
+
+import gc
+import threading
+
+import pytest
+
+import univention.config_registry.watcher as watcher
+from univention.config_registry.backend import ConfigRegistry, Load
+
+
+def no_inotify(self):
+	raise EnvironmentError()
+
+
+@pytest.fixture(params=["inotify", "poll"])
+def notify(request, monkeypatch):
+	if request.param == "poll":
+		monkeypatch.setattr(watcher._Inotify, "__init__", no_inotify)
+		monkeypatch.setattr(watcher.Watcher, "POLL_INTERVAL", 0.05)
+
+
+@pytest.fixture
+def ucrw(ucrf, notify):
+	ucr = ConfigRegistry().load(autoload=Load.NOTIFY)
+	yield ucr
+	ucr.load()
+	assert ucr._watcher is None
+
+
+@pytest.mark.timeout(timeout=10)
+def test_notify(ucrw):
+	changes = []
+	event = threading.Event()
+
+	def callback(ucr, changed):
+		changes.append(changed)
+		event.set()
+
+	ucrw.add_callback(callback)
+	assert ucrw._watcher.is_alive()
+
+	ucr = ConfigRegistry(write_registry=ConfigRegistry.FORCED).load()
+	ucr["bar"] = "FORCED"
+	ucr["new"] = "FORCED"
+	ucr.save()
+
+	assert event.wait(5)
+	assert changes == [{"bar": ("LDAP", "FORCED"), "new": (None, "FORCED")}]
+	assert ucrw["bar"] == "FORCED"
+
+	ucrw.remove_callback(callback)
+
+
+@pytest.mark.timeout(timeout=10)
+def test_notify_shadowed(ucrw):
+	event = threading.Event()
+	ucrw.add_callback(lambda ucr, changed: event.set())
+
+	ucr = ConfigRegistry().load()
+	ucr["bar"] = "SHADOWED"
+	ucr.save()
+
+	assert not event.wait(0.5)
+	assert ucrw._layers[ConfigRegistry.NORMAL]["bar"] == "SHADOWED"
+	assert ucrw["bar"] == "LDAP"
+
+
+@pytest.mark.timeout(timeout=10)
+def test_notify_replaces_layer(ucrw):
+	event = threading.Event()
+	ucrw.add_callback(lambda ucr, changed: event.set())
+	old = ucrw._layers[ConfigRegistry.FORCED]
+	before = dict(old)
+
+	ucr = ConfigRegistry(write_registry=ConfigRegistry.FORCED).load()
+	ucr["bar"] = "FORCED"
+	ucr.save()
+
+	assert event.wait(5)
+	assert ucrw._layers[ConfigRegistry.FORCED] is not old
+	assert dict(old) == before
+	assert ucrw._layers[ConfigRegistry.FORCED]["bar"] == "FORCED"
+
+
+@pytest.mark.timeout(timeout=10)
+def test_notify_collected(ucrf, notify):
+	ucr = ConfigRegistry().load(autoload=Load.NOTIFY)
+	w = ucr._watcher
+	assert w.is_alive()
+
+	del ucr
+	gc.collect()
+	w.join(5)
+	assert not w.is_alive()
+
+
+def test_stop_unstarted(tmpdir):
+	w = watcher.Watcher({0: str(tmpdir / "file")}, lambda changed: None)
+	w.stop()
@@ -0,0 +1,347 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021-2026 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+#
+
+
+"""Builds the whole cache at once from a paged LDAP search or an LDIF
+file. The objects are processed by a pool of worker processes, every sub
+cache is written as a new database and then moved over the current one.
+The listener keeps running meanwhile: while the journal file exists, it
+records every change it applies to the caches. The databases are replaced
+under the lock the listener holds for each of its transactions and the
+journaled changes are applied to the new databases before it is released.
+"""
+
+import fcntl
+import os
+import pickle
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from multiprocessing import Pool
+from pwd import getpwnam
+
+from univention.ldap_cache.cache import get_cache
+from univention.ldap_cache.cache.backend import _s, _walk
+from univention.ldap_cache.log import log
+
+CHUNK_SIZE = 1000
+LOCK_FILE = '.bulk-build.lock'
+JOURNAL_FILE = '.bulk-build.journal'
+NOTIFIER_ID_FILE = '/var/lib/univention-directory-listener/notifier_id'
+
+
+def _shards(query, cache_names):
+	return [shard for shard in get_cache().get_shards_for_query(query) if shard._cache.name in cache_names and not shard.closure]
+
+
+def _process_chunk(args):
+	query, cache_names, objs = args
+	ret = []
+	shards = _shards(query, cache_names)
+	for obj in objs:
+		for shard in shards:
+			try:
+				key = shard.get_key(obj)
+			except ValueError:
+				continue
+			ret.append((shard._cache.name, key, shard.get_values(obj)))
+	return ret
+
+
+def _write_cache(args):
+	name, data, directory = args
+	return name, get_cache().get_sub_cache(name).bulk_load(data, directory)
+
+
+class _Builder(object):
+
+	def __init__(self, cache_names, processes=None):
+		self.caches = get_cache()
+		self.cache_names = cache_names
+		self.data = dict((name, {}) for name in cache_names)
+		self.pool = Pool(processes)
+		self._max_pending = 2 * (processes or os.cpu_count() or 1)
+		self._pending = []
+		self._chunks = {}
+		self.count = 0
+
+	def add(self, query, obj):
+		chunk = self._chunks.setdefault(query, [])
+		chunk.append(obj)
+		self.count += 1
+		if len(chunk) >= CHUNK_SIZE:
+			self._submit(query)
+
+	def _submit(self, query):
+		chunk = self._chunks.pop(query, None)
+		if not chunk:
+			return
+		self._pending.append(self.pool.apply_async(_process_chunk, ((query, self.cache_names, chunk),)))
+		while len(self._pending) > self._max_pending:
+			self._merge(self._pending.pop(0).get())
+
+	def _merge(self, result):
+		for name, key, values in result:
+			data = self.data[name]
+			if self.caches.get_sub_cache(name).reverse:
+				for value in values:
+					data.setdefault(value, set()).add(key)
+			else:
+				data[key] = values
+
+	def finish(self):
+		for query in list(self._chunks):
+			self._submit(query)
+		while self._pending:
+			self._merge(self._pending.pop(0).get())
+		self._build_closures()
+
+	def _build_closures(self):
+		for name in self.cache_names:
+			for shard in self.caches.get_sub_cache(name).shards:
+				if not shard.closure:
+					continue
+				if shard.member_of_cache in self.data:
+					member_of = self.data[shard.member_of_cache]
+				else:
+					member_of = self.caches.get_sub_cache(shard.member_of_cache).load()
+				log('%s - Computing the closure of %d objects', name, len(member_of))
+				closure = self.data[name]
+				for member in member_of:
+					groups = _walk(member_of[member], member_of.get)
+					if groups:
+						closure[member] = sorted(groups)
+
+	def write(self, directory):
+		jobs = [(name, self.data[name], directory) for name in self.cache_names]
+		return dict(self.pool.imap_unordered(_write_cache, jobs))
+
+	def close(self):
+		self.pool.close()
+		self.pool.join()
+
+
+def _objects_from_ldif(fd, queries, builder):
+	from ldif import LDIFParser
+	filters = [(query, compile_filter(query)) for query in queries]
+
+	class Parser(LDIFParser):
+		def handle(self, dn, entry):
+			for query, matches in filters:
+				if matches(entry):
+					builder.add(query, (dn, entry))
+
+	Parser(fd).parse()
+
+
+def _objects_from_ldap(lo, queries, builder):
+	for query, attrs in queries.items():
+		log('Searching for %s', query)
+		for obj in lo.search_iter(query, attr=sorted(attrs)):
+			builder.add(query, obj)
+
+
+@contextmanager
+def changes_locked(directory):
+	"""Excludes the listener from the cache databases. It holds this lock
+	while it applies a change, the bulk build while it replaces them."""
+	fd = os.open(os.path.join(directory, LOCK_FILE), os.O_RDONLY | os.O_CREAT, 0o644)
+	try:
+		fcntl.flock(fd, fcntl.LOCK_EX)
+		yield
+	finally:
+		os.close(fd)
+
+
+def apply_change(caches, query, method, objs, cache_names=None):
+	"""Calls `method` (add_object, modify_object or rm_object) of all shards
+	for `query` in the sub caches `cache_names` (default: all)."""
+	for shard in caches.get_shards_for_query(query):
+		if cache_names is None or shard._cache.name in cache_names:
+			getattr(shard, method)(*objs)
+
+
+def journal_change(directory, query, method, objs):
+	"""Records a change applied by the listener while a bulk build runs."""
+	journal = os.path.join(directory, JOURNAL_FILE)
+	if not os.path.exists(journal):
+		return
+	with open(journal, 'ab') as fd:
+		pickle.dump((query, method, objs), fd, 2)
+
+
+def _start_journal(directory):
+	journal = os.path.join(directory, JOURNAL_FILE)
+	with changes_locked(directory):
+		with open(journal, 'wb'):
+			pass
+		os.chown(journal, getpwnam('listener').pw_uid, -1)
+	try:
+		with open(NOTIFIER_ID_FILE) as fd:
+			log('Recording the listener changes after notifier ID %s', fd.read().strip())
+	except EnvironmentError:
+		pass
+
+
+def _replay_journal(caches, directory, cache_names):
+	count = 0
+	with open(os.path.join(directory, JOURNAL_FILE), 'rb') as fd:
+		while True:
+			try:
+				query, method, objs = pickle.load(fd)
+			except EOFError:
+				break
+			with caches.transaction():
+				apply_change(caches, query, method, objs, cache_names)
+			count += 1
+	log('Applied %d changes made by the listener during the build', count)
+
+
+def _stop_journal(directory):
+	with changes_locked(directory):
+		try:
+			os.unlink(os.path.join(directory, JOURNAL_FILE))
+		except EnvironmentError:
+			pass
+
+
+def bulk_build(cache_names=None, ldif_file=None, processes=None):
+	"""Builds the sub caches `cache_names` (default: all) from `ldif_file`
+	or, if not given, from LDAP and replaces the current databases.
+	The listener is only blocked while the databases are replaced and the
+	changes it made during the build are applied to them. Changes made
+	before that are not recorded, so `ldif_file` has to be up to date."""
+	caches = get_cache()
+	if not cache_names:
+		cache_names = sorted(name for name, cache in caches)
+	queries = {}
+	for name in cache_names:
+		for shard in caches.get_sub_cache(name).shards:
+			attrs = queries.setdefault(shard.ldap_filter, set())
+			attrs.update([shard.key, shard.value] + list(shard.attributes))
+	for attrs in queries.values():
+		attrs.discard('dn')
+	builder = _Builder(cache_names, processes)
+	directory = tempfile.mkdtemp(prefix='.bulk-build-', dir=caches._directory)
+	try:
+		_start_journal(caches._directory)
+		if ldif_file:
+			with open(ldif_file) as fd:
+				_objects_from_ldif(fd, queries, builder)
+		else:
+			from univention.uldap import getMachineConnection
+			lo = getMachineConnection()
+			_objects_from_ldap(lo, queries, builder)
+		builder.finish()
+		log('Writing %d objects into %s', builder.count, ', '.join(cache_names))
+		filenames = builder.write(directory)
+		with changes_locked(caches._directory):
+			for name, filename in filenames.items():
+				caches.get_sub_cache(name).replace(filename)
+			_replay_journal(caches, caches._directory, cache_names)
+			os.unlink(os.path.join(caches._directory, JOURNAL_FILE))
+	finally:
+		_stop_journal(caches._directory)
+		builder.close()
+		shutil.rmtree(directory, ignore_errors=True)
+	return builder.count
+
+
+def compile_filter(ldap_filter):
+	"""Returns a function which evaluates `ldap_filter` against the attributes
+	of an LDAP object (like the entries of an LDIF file). Supports &, |, !,
+	equality, presence and substring matches; all matches are case insensitive.
+	Raises ValueError for other matches (ordering, approximate, extensible)."""
+	matcher, pos = _parse_filter(ldap_filter.strip(), 0)
+	if pos != len(ldap_filter.strip()):
+		raise ValueError('Invalid LDAP filter %r' % (ldap_filter,))
+	return matcher
+
+
+def _unescape(value):
+	return re.sub(r'\\([0-9a-fA-F]{2})', lambda match: chr(int(match.group(1), 16)), value)
+
+
+def _values(entry, attr):
+	for key, values in entry.items():
+		if key.lower() == attr:
+			return [value.lower() for value in _s(values)]
+	return []
+
+
+def _parse_filter(ldap_filter, pos):
+	if ldap_filter[pos:pos + 1] != '(':
+		raise ValueError('Invalid LDAP filter %r' % (ldap_filter,))
+	pos += 1
+	op = ldap_filter[pos:pos + 1]
+	if op in ('&', '|'):
+		pos += 1
+		children = []
+		while ldap_filter[pos:pos + 1] == '(':
+			child, pos = _parse_filter(ldap_filter, pos)
+			children.append(child)
+		combine = all if op == '&' else any
+
+		def matcher(entry):
+			return combine(child(entry) for child in children)
+	elif op == '!':
+		child, pos = _parse_filter(ldap_filter, pos + 1)
+
+		def matcher(entry):
+			return not child(entry)
+	else:
+		end = ldap_filter.find(')', pos)
+		if end < 0:
+			raise ValueError('Invalid LDAP filter %r' % (ldap_filter,))
+		attr, sep, value = ldap_filter[pos:end].partition('=')
+		if not sep:
+			raise ValueError('Invalid LDAP filter %r' % (ldap_filter,))
+		if attr[-1:] in ('~', '<', '>') or ':' in attr:
+			raise ValueError('Unsupported match in LDAP filter %r' % (ldap_filter,))
+		attr = attr.lower()
+		pos = end
+		if value == '*':
+			def matcher(entry):
+				return bool(_values(entry, attr))
+		elif '*' in value:
+			regex = re.compile('^%s$' % '.*'.join(re.escape(_unescape(part).lower()) for part in value.split('*')), re.DOTALL)
+
+			def matcher(entry):
+				return any(regex.match(val) for val in _values(entry, attr))
+		else:
+			value = _unescape(value).lower()
+
+			def matcher(entry):
+				return value in _values(entry, attr)
+	if ldap_filter[pos:pos + 1] != ')':
+		raise ValueError('Invalid LDAP filter %r' % (ldap_filter,))
+	return matcher, pos + 1
@@ -29,6 +29,8 @@
 # <https://www.gnu.org/licenses/>.
 #
 
+from contextlib import contextmanager
+
 from univention.ldap_cache.log import debug
 
 
@@ -65,9 +67,33 @@ class Caches(object):
 			cache = self._add_sub_cache(name, klass.single_value, klass.reverse)
 		cache.add_shard(klass)
 
-	def _add_sub_cache(self, name, single_value):
+	def _add_sub_cache(self, name, single_value, reverse):
 		raise NotImplementedError()
 
+	def begin(self):
+		for cache in self._caches.values():
+			cache.begin()
+
+	def commit(self):
+		for cache in self._caches.values():
+			cache.commit()
+
+	def abort(self):
+		for cache in self._caches.values():
+			cache.abort()
+
+	@contextmanager
+	def transaction(self):
+		"""Collects all changes to all sub caches and writes them
+		at once (with one writer per sub cache) when leaving the block"""
+		self.begin()
+		try:
+			yield self
+		except BaseException:
+			self.abort()
+			raise
+		self.commit()
+
 
 class Shard(object):
 	ldap_filter = None
@@ -77,6 +103,7 @@ class Shard(object):
 	value = None
 	attributes = []
 	reverse = False
+	closure = False
 
 	def __init__(self, cache):
 		self._cache = cache
@@ -102,13 +129,21 @@ class Shard(object):
 		else:
 			self._cache.delete(key, [])
 
+	def modify_object(self, old_obj, new_obj):
+		self.rm_object(old_obj)
+		self.add_object(new_obj)
+
 	def _get_from_object(self, obj, attr):
 		if attr == 'dn':
 			return [obj[0]]
 		return obj[1].get(attr, [])
 
 	def get_values(self, obj):
-		return _s(self._get_from_object(obj, self.value))
+		values = _s(self._get_from_object(obj, self.value))
+		if self.reverse:
+			# the values are the keys of a reverse shard; normalize them like get_key()
+			return [value.lower() for value in values]
+		return values
 
 	def get_key(self, obj):
 		values = self._get_from_object(obj, self.key)
@@ -117,6 +152,83 @@ class Shard(object):
 		raise ValueError(self.key)
 
 
+class ClosureShard(Shard):
+	"""Stores the transitive closure of a reverse membership shard:
+	member => [all groups the member is in, directly or through nested groups].
+
+	The shard is not filled from the object itself. Whenever the members of
+	a group change, the closure of the changed members and of everything
+	below them is recomputed from the `member_of_cache` (member => groups)
+	and `members_cache` (group => members) sub caches. Those need to be
+	updated before this shard, i.e. they have to be configured before it.
+	"""
+	closure = True
+	member_of_cache = 'memberOf'
+	members_cache = 'uniqueMembers'
+
+	def rm_object(self, obj):
+		self._update_closure(self._get_members(obj))
+
+	def add_object(self, obj):
+		self._update_closure(self._get_members(obj))
+
+	def modify_object(self, old_obj, new_obj):
+		old_members = self._get_members(old_obj)
+		new_members = self._get_members(new_obj)
+		try:
+			old_key = self.get_key(old_obj)
+		except ValueError:
+			old_key = None
+		try:
+			renamed = old_key != self.get_key(new_obj)
+		except ValueError:
+			renamed = True
+		if renamed:
+			if old_key is not None:
+				# the closure of a nested group is stored under its DN
+				debug('Removing %s', old_key)
+				self._cache.delete(old_key, [])
+			self._update_closure(old_members | new_members)
+		else:
+			self._update_closure(old_members ^ new_members)
+
+	def _get_members(self, obj):
+		return set(value.lower() for value in _s(self._get_from_object(obj, self.value)))
+
+	def _update_closure(self, members):
+		if not members:
+			return
+		from univention.ldap_cache.cache import get_cache
+		caches = get_cache()
+		member_of_cache = caches.get_sub_cache(self.member_of_cache)
+		members_cache = caches.get_sub_cache(self.members_cache)
+		if member_of_cache is None or members_cache is None:
+			debug('%s or %s not configured, cannot compute the closure', self.member_of_cache, self.members_cache)
+			return
+		with members_cache.reading() as reader:
+			affected = _walk(members, lambda dn: members_cache.get(dn, reader))
+		debug('Updating the closure of %d objects', len(affected))
+		with member_of_cache.reading() as reader:
+			for member in affected:
+				groups = _walk(member_of_cache.get(member, reader) or [], lambda dn: member_of_cache.get(dn, reader))
+				if groups:
+					self._cache.save(member, sorted(groups))
+				else:
+					self._cache.delete(member, [])
+
+
+def _walk(start, neighbours):
+	found = set()
+	todo = [dn.lower() for dn in start]
+	while todo:
+		dn = todo.pop()
+		if dn in found:
+			continue
+		found.add(dn)
+		todo.extend(neighbour.lower() for neighbour in neighbours(dn) or [])
+	return found
+
+
 class LdapCache(object):
 	def __init__(self, name, single_value, reverse):
 		self.name = name
@@ -127,6 +239,25 @@ class LdapCache(object):
 	def add_shard(self, shard_class):
 		self.shards.append(shard_class(self))
 
+	def begin(self):
+		raise NotImplementedError()
+
+	def commit(self):
+		raise NotImplementedError()
+
+	def abort(self):
+		raise NotImplementedError()
+
+	def bulk_load(self, data, directory):
+		"""Writes a complete new database with `data` into `directory` without
+		touching the current one. `data` maps keys to their list of values
+		(for reverse caches: values to the set of keys). Returns the file name."""
+		raise NotImplementedError()
+
+	def replace(self, filename):
+		"""Atomically replaces the current database with one written by `bulk_load`"""
+		raise NotImplementedError()
+
 
 def _s(input):
 	if isinstance(input, (list, tuple)):
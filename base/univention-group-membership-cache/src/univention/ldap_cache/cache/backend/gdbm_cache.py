@@ -55,6 +55,8 @@ class GdbmCaches(Caches):
 class GdbmCache(LdapCache):
 	def __init__(self, *args, **kwargs):
 		self.fail_count = 0
+		self._pending = None
+		self._reader = None
 		super(GdbmCache, self).__init__(*args, **kwargs)
 		log('%s - Recreating!', self.name)
 
@@ -64,13 +66,13 @@ class GdbmCache(LdapCache):
 		os.chmod(self.db_file, 0o640)
 
 	@contextmanager
-	def writing(self, writer=None):
+	def writing(self, writer=None, flags='csu'):
 		if writer is not None:
 			yield writer
 		else:
 			if not os.path.exists(self.db_file):
 				self.clear()
-			writer = gdbm.open(self.db_file, 'csu')
+			writer = gdbm.open(self.db_file, flags)
 			try:
 				yield writer
 			finally:
@@ -78,31 +80,106 @@ class GdbmCache(LdapCache):
 
 	reading = writing
 
+	def begin(self):
+		if self._pending is None:
+			debug('%s - Beginning transaction', self.name)
+			self._pending = {}
+
+	def _close_reader(self):
+		if self._reader is not None:
+			self._reader.close()
+			self._reader = None
+
+	def commit(self):
+		pending, self._pending = self._pending, None
+		self._close_reader()
+		if not pending:
+			return
+		debug('%s - Committing %d changes', self.name, len(pending))
+		with self.writing(flags='cu') as writer:
+			for key, value in pending.items():
+				if value is None or (self.reverse and not value):
+					try:
+						del writer[key]
+					except KeyError:
+						pass
+				elif self.single_value:
+					writer[key] = value
+				else:
+					writer[key] = _dumps(sorted(value) if self.reverse else value)
+			writer.sync()
+
+	def abort(self):
+		if self._pending is not None:
+			log('%s - Discarding %d uncommitted changes', self.name, len(self._pending))
+		self._pending = None
+		self._close_reader()
+
+	@contextmanager
+	def _changing(self):
+		if self._pending is not None:
+			yield self._pending
+			return
+		self.begin()
+		try:
+			yield self._pending
+		except BaseException:
+			self.abort()
+			raise
+		self.commit()
+
+	def _get_reverse(self, value, pending):
+		try:
+			return pending[value]
+		except KeyError:
+			current = pending[value] = set(self._get_stored(value) or [])
+			return current
+
 	def save(self, key, values):
-		with self.writing() as writer:
+		with self._changing() as pending:
 			if self.reverse:
 				for value in values:
-					current = self.get(value, writer) or []
-					if key in current:
-						continue
 					debug('%s - Adding %s %r', self.name, value, key)
-					current.append(key)
-					writer[value] = json.dumps(current)
+					self._get_reverse(value, pending).add(key)
 			else:
-				self.delete(key, values, writer)
 				if not values:
+					pending[key] = None
 					return
 				debug('%s - Saving %s %r', self.name, key, values)
 				if self.single_value:
-					writer[key] = values[0]
+					pending[key] = values[0]
 				else:
-					writer[key] = json.dumps(values)
+					pending[key] = list(values)
 
 	def clear(self):
 		log('%s - Clearing whole DB!', self.name)
+		self._close_reader()
 		gdbm.open(self.db_file, 'nu').close()
 		self._fix_permissions()
 
+	def bulk_load(self, data, directory):
+		db_file = os.path.join(directory, os.path.basename(self.db_file))
+		log('%s - Bulk loading %d keys into %s', self.name, len(data), db_file)
+		writer = gdbm.open(db_file, 'nfu')
+		try:
+			for key, values in data.items():
+				if not values:
+					continue
+				if self.single_value:
+					writer[key] = values[0]
+				else:
+					writer[key] = _dumps(sorted(values) if self.reverse else values)
+			writer.sync()
+		finally:
+			writer.close()
+		return db_file
+
+	def replace(self, filename):
+		log('%s - Replacing DB with %s', self.name, filename)
+		self._close_reader()
+		os.rename(filename, self.db_file)
+		self._fix_permissions()
+
 	def cleanup(self):
 		with self.writing() as db:
 			try:
@@ -117,22 +194,14 @@ class GdbmCache(LdapCache):
 				self.fail_count = 0
 		self._fix_permissions()
 
-	def delete(self, key, values, writer=None):
+	def delete(self, key, values):
 		debug('%s - Delete %s', self.name, key)
-		with self.writing(writer) as writer:
+		with self._changing() as pending:
 			if self.reverse:
 				for value in values:
-					current = self.get(value, writer) or []
-					try:
-						current.remove(key)
-					except ValueError:
-						continue
-					writer[value] = json.dumps(current)
+					self._get_reverse(value, pending).discard(key)
 			else:
-				try:
-					del writer[key]
-				except KeyError:
-					pass
+				pending[key] = None
 
 	def __iter__(self):
 		with self.reading() as reader:
@@ -142,6 +211,23 @@ class GdbmCache(LdapCache):
 				key = _s(reader.nextkey(key))
 
 	def get(self, key, reader=None):
+		if self._pending is not None and key in self._pending:
+			value = self._pending[key]
+			if value is None or (self.reverse and not value):
+				return None
+			elif self.single_value:
+				return value
+			return sorted(value) if self.reverse else list(value)
+		return self._get_stored(key, reader)
+
+	def _get_stored(self, key, reader=None):
+		if reader is None and self._pending is not None:
+			# keep one handle open for the whole transaction
+			if self._reader is None:
+				if not os.path.exists(self.db_file):
+					return None
+				self._reader = gdbm.open(self.db_file, 'ru')
+			reader = self._reader
 		with self.reading(reader) as reader:
 			try:
 				value = reader[key]
@@ -157,5 +243,9 @@ class GdbmCache(LdapCache):
 		return dict(self)
 
 
+def _dumps(values):
+	return json.dumps(values, separators=(',', ':'))
+
+
 class GdbmShard(Shard):
 	key = 'dn'
@@ -41,6 +41,7 @@ from univention.ldap_cache.cache.backend import Caches, LdapCache, Shard
 class LmdbCaches(Caches):
 	def __init__(self, *args, **kwargs):
 		super(LmdbCaches, self).__init__(*args, **kwargs)
+		self._txn = None
 		self.env = lmdb.open(self._directory, 2 ** 32 - 1, max_dbs=128)
 		self._fix_permissions(self._directory)
 
@@ -51,29 +52,64 @@ class LmdbCaches(Caches):
 		os.chmod(os.path.join(db_directory, 'data.mdb'), 0o640)
 		os.chmod(os.path.join(db_directory, 'lock.mdb'), 0o640)
 
-	def _add_sub_cache(self, name, single_value):
+	def _add_sub_cache(self, name, single_value, reverse):
 		sub_db = self.env.open_db(name, dupsort=not single_value)
-		cache = LmdbCache(name, single_value)
+		cache = LmdbCache(name, single_value, reverse)
 		cache.env = self.env
 		cache.sub_db = sub_db
 		self._caches[name] = cache
 		return cache
 
+	def begin(self):
+		# LMDB allows only one write transaction per environment at a time,
+		# so all sub caches share it
+		if self._txn is None:
+			self._txn = self.env.begin(write=True)
+			for name, cache in self:
+				cache._txn = self._txn
+
+	def commit(self):
+		txn, self._txn = self._txn, None
+		if txn is not None:
+			for name, cache in self:
+				cache._txn = None
+			txn.commit()
+
+	def abort(self):
+		txn, self._txn = self._txn, None
+		if txn is not None:
+			for name, cache in self:
+				cache._txn = None
+			txn.abort()
+
 
 class LmdbCache(LdapCache):
+	_txn = None
+
 	@contextmanager
 	def writing(self, writer=None):
 		if writer is not None:
 			yield writer
+		elif self._txn is not None:
+			yield self._txn
 		else:
 			with self.env.begin(self.sub_db, write=True) as writer:
 				yield writer
 
+	def begin(self):
+		pass
+
+	def commit(self):
+		pass
+
+	def abort(self):
+		pass
+
 	def save(self, key, values):
 		with self.writing() as writer:
 			self.delete(key, writer)
 			for value in values:
-				writer.put(key, value)
+				writer.put(key, value, db=self.sub_db)
 
 	def clear(self):
 		with self.env.begin(write=True) as writer:
@@ -84,13 +120,17 @@ class LmdbCache(LdapCache):
 
 	def delete(self, key, writer=None):
 		with self.writing(writer) as writer:
-			writer.delete(key)
+			writer.delete(key, db=self.sub_db)
 
 	@contextmanager
 	def reading(self):
-		with self.env.begin(self.sub_db) as txn:
-			with txn.cursor() as cursor:
+		if self._txn is not None:
+			with self._txn.cursor(self.sub_db) as cursor:
 				yield cursor
+		else:
+			with self.env.begin(self.sub_db) as txn:
+				with txn.cursor() as cursor:
+					yield cursor
 
 	def __iter__(self):
 		with self.reading() as reader:
@@ -34,6 +34,7 @@ import json
 
 from univention.ldap_cache.log import log
 from univention.ldap_cache.cache import Shard
+from univention.ldap_cache.cache.backend import ClosureShard
 
 CONFIG_FILE = '/usr/share/univention-group-membership-cache/shards.json'
 
@@ -47,8 +48,9 @@ def shards_from_config():
 		log('Could not load CONFIG_FILE: %s', exc)
 	else:
 		for data in config:
+			base = ClosureShard if data.get('closure') else Shard
 			try:
-				class FromConfig(Shard):
+				class FromConfig(base):
 					db_name = data['db_name']
 					single_value = data['single_value']
 					reverse = data.get('reverse', False)
@@ -73,7 +75,7 @@ def _writing_config():
 		json.dump(shards, fd, sort_keys=True, indent=4)
 
 
-def add_shard_to_config(db_name, single_value, reverse, key, value, ldap_filter):
+def add_shard_to_config(db_name, single_value, reverse, key, value, ldap_filter, closure=False):
 	with _writing_config() as shards:
 		shard_config = {
 			'db_name': db_name,
@@ -83,20 +85,25 @@ def add_shard_to_config(db_name, single_value, reverse, key, value, ldap_filter)
 			'value': value,
 			'ldap_filter': ldap_filter,
 		}
+		if closure:
+			shard_config['closure'] = True
 		if shard_config not in shards:
 			shards.append(shard_config)
 
 
-def rm_shard_from_config(db_name, single_value, reverse, key, value, ldap_filter):
+def rm_shard_from_config(db_name, single_value, reverse, key, value, ldap_filter, closure=False):
 	with _writing_config() as shards:
+		shard_config = {
+			'db_name': db_name,
+			'single_value': single_value and not reverse,
+			'reverse': reverse,
+			'key': key,
+			'value': value,
+			'ldap_filter': ldap_filter,
+		}
+		if closure:
+			shard_config['closure'] = True
 		try:
-			shards.remove({
-				'db_name': db_name,
-				'single_value': single_value and not reverse,
-				'reverse': reverse,
-				'key': key,
-				'value': value,
-				'ldap_filter': ldap_filter,
-			})
+			shards.remove(shard_config)
 		except ValueError:
 			pass
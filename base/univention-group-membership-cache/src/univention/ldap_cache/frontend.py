@@ -47,9 +47,21 @@ def _extract_id_from_dn(dn):
 
 
 def groups_for_user(user_dn, consider_nested_groups=True, cache=None):
+	"""Returns the (lowercased) DNs of all groups `user_dn` is member of.
+	Uses the "memberOfClosure" resp. "memberOf" sub caches if configured,
+	so that this is a keyed read instead of a scan of all groups.
+	`cache` may be a dict {group: set(members)} to search in instead."""
 	user_dn = user_dn.lower()
 	if cache is None:
 		_cache = get_cache()
+		if consider_nested_groups:
+			closure_cache = _cache.get_sub_cache('memberOfClosure')
+			if closure_cache is not None:
+				return sorted(closure_cache.get(user_dn) or [])
+		member_of_cache = _cache.get_sub_cache('memberOf')
+		if member_of_cache is not None:
+			with member_of_cache.reading() as reader:
+				return _groups_for_user_from_member_of(user_dn, consider_nested_groups, lambda dn: member_of_cache.get(dn, reader))
 		cache = _cache.get_sub_cache('uniqueMembers').load()
 		cache = dict((key, set(val.lower() for val in values)) for key, values in cache.items())
 	search_for_dns = [user_dn]
@@ -66,6 +78,19 @@ def groups_for_user(user_dn, consider_nested_groups=True, cache=None):
 	return sorted(found)
 
 
+def _groups_for_user_from_member_of(user_dn, consider_nested_groups, get_groups):
+	search_for_dns = [user_dn]
+	found = set()
+	while search_for_dns:
+		for group in get_groups(search_for_dns.pop()) or []:
+			if group not in found:
+				found.add(group)
+				search_for_dns.append(group)
+		if not consider_nested_groups:
+			break
+	return sorted(found)
+
+
 def users_in_group(group_dn, consider_nested_groups=True, readers=(None, None)):
 	group_dn = group_dn.lower()
 	cache = get_cache()
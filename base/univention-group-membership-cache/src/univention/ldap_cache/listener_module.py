@@ -31,11 +31,19 @@
 
 from logging import getLogger
 
+from univention.ldap_cache.bulk_build import apply_change, changes_locked, journal_change
 from univention.ldap_cache.cache import get_cache
 from univention.listener.handler import ListenerModuleHandler
 
 
 class LdapCacheHandler(ListenerModuleHandler):
+	# The changes of one LDAP object are collected in a transaction which is
+	# committed before the handler returns: the listener stores its notifier ID
+	# afterwards, so uncommitted changes would be lost if it was killed.
+	# This also releases the LMDB write lock between the callbacks.
+	# A bulk build may replace the databases between two changes, but not
+	# during one, and replays the changes journaled while it was running.
+
 	def __init__(self, *args, **kwargs):
 		self._counter = 0
 		super(LdapCacheHandler, self).__init__(*args, **kwargs)
@@ -50,25 +58,28 @@ class LdapCacheHandler(ListenerModuleHandler):
 			for name, db in get_cache():
 				db.cleanup()
 
+	def _apply(self, method, *objs):
+		caches = get_cache()
+		query = self._get_configuration().get_ldap_filter()
+		with changes_locked(caches._directory):
+			self._cleanup_cache_if_needed()
+			with caches.transaction():
+				apply_change(caches, query, method, objs)
+			journal_change(caches._directory, query, method, objs)
+
 	def create(self, dn, new):
-		self._cleanup_cache_if_needed()
-		for shard in get_cache().get_shards_for_query(self._get_configuration().get_ldap_filter()):
-			shard.add_object((dn, new))
+		self._apply('add_object', (dn, new))
 
 	def modify(self, dn, old, new, old_dn):
-		self._cleanup_cache_if_needed()
-		for shard in get_cache().get_shards_for_query(self._get_configuration().get_ldap_filter()):
-			shard.rm_object((old_dn or dn, old))
-			shard.add_object((dn, new))
+		self._apply('modify_object', (old_dn or dn, old), (dn, new))
 
 	def remove(self, dn, old):
-		self._cleanup_cache_if_needed()
-		for shard in get_cache().get_shards_for_query(self._get_configuration().get_ldap_filter()):
-			shard.rm_object((dn, old))
+		self._apply('rm_object', (dn, old))
 
 	def post_run(self):
 		self._counter = -1
-		self._cleanup_cache_if_needed()
+		with changes_locked(get_cache()._directory):
+			self._cleanup_cache_if_needed()
 
 	class Configuration(ListenerModuleHandler.Configuration):
 		def get_priority(self):
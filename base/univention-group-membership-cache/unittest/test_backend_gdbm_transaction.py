@@ -0,0 +1,175 @@
+#!/usr/bin/python3
+#
+# Copyright 2021 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+#
+import json
+import sys
+
+import pytest
+from univentionunittests import import_module
+
+
+class FakeGdbm(object):
+	"""Keeps the databases in memory and records the calls of the backend"""
+
+	error = Exception
+
+	def __init__(self):
+		self.files = {}
+		self.opened = []
+		self.synced = 0
+
+	def open(self, filename, flags):
+		self.opened.append((filename, flags))
+		if 'n' in flags or filename not in self.files:
+			self.files[filename] = {}
+		open(filename, 'a').close()
+		return FakeDb(self, self.files[filename])
+
+
+class FakeDb(object):
+	def __init__(self, module, data):
+		self._module = module
+		self._data = data
+
+	def __getitem__(self, key):
+		return self._data[key]
+
+	def __setitem__(self, key, value):
+		self._data[key] = value
+
+	def __delitem__(self, key):
+		del self._data[key]
+
+	def sync(self):
+		self._module.synced += 1
+
+	def close(self):
+		pass
+
+
+@pytest.fixture
+def gdbm(mocker):
+	gdbm = FakeGdbm()
+	mocker.patch.dict(sys.modules, {'gdbm': gdbm, 'dbm.gnu': gdbm})
+	return gdbm
+
+
+@pytest.fixture
+def backend(gdbm, mocker):
+	module = import_module("univention.ldap_cache.cache.backend.gdbm_cache", "src/", "univention.ldap_cache.cache.backend.gdbm_cache", use_installed=False)
+	mocker.patch.object(module, 'gdbm', gdbm)
+	mocker.patch.object(module.GdbmCache, '_fix_permissions')
+	return module
+
+
+@pytest.fixture
+def caches(backend, tmpdir):
+	caches = backend.GdbmCaches(str(tmpdir))
+	caches._add_sub_cache('uniqueMembers', False, False)
+	caches._add_sub_cache('memberOf', False, True)
+	caches._add_sub_cache('entryUUID', True, False)
+	return caches
+
+
+def stored(gdbm, cache):
+	return gdbm.files.get(cache.db_file, {})
+
+
+def test_save_without_transaction(caches, gdbm):
+	cache = caches.get_sub_cache('uniqueMembers')
+	cache.save('cn=g1', ['uid=a', 'uid=b'])
+	assert json.loads(stored(gdbm, cache)['cn=g1']) == ['uid=a', 'uid=b']
+	cache.delete('cn=g1', [])
+	assert 'cn=g1' not in stored(gdbm, cache)
+
+
+def test_transaction_commit(caches, gdbm):
+	members = caches.get_sub_cache('uniqueMembers')
+	uuids = caches.get_sub_cache('entryUUID')
+	with caches.transaction():
+		members.save('cn=g1', ['uid=a'])
+		members.save('cn=g2', ['uid=b'])
+		uuids.save('cn=g1', ['1234'])
+		assert stored(gdbm, members) == {}
+		assert members.get('cn=g1') == ['uid=a']
+		assert uuids.get('cn=g1') == '1234'
+		synced = gdbm.synced
+	assert gdbm.synced == synced + 2
+	assert json.loads(stored(gdbm, members)['cn=g1']) == ['uid=a']
+	assert json.loads(stored(gdbm, members)['cn=g2']) == ['uid=b']
+	assert stored(gdbm, uuids)['cn=g1'] == '1234'
+	assert members._pending is None
+	assert members._reader is None
+
+
+def test_transaction_reads_stored_values(caches, gdbm):
+	members = caches.get_sub_cache('uniqueMembers')
+	members.save('cn=g1', ['uid=a'])
+	del gdbm.opened[:]
+	with caches.transaction():
+		assert members.get('cn=g1') == ['uid=a']
+		assert members.get('cn=g2') is None
+		members.delete('cn=g1', [])
+		assert members.get('cn=g1') is None
+	# one reader for the whole transaction, one writer on commit
+	assert [flags for filename, flags in gdbm.opened] == ['ru', 'cu']
+	assert 'cn=g1' not in stored(gdbm, members)
+
+
+def test_transaction_abort(caches, gdbm):
+	members = caches.get_sub_cache('uniqueMembers')
+	members.save('cn=g1', ['uid=a'])
+	with pytest.raises(ValueError):
+		with caches.transaction():
+			members.save('cn=g1', ['uid=b'])
+			members.save('cn=g2', ['uid=b'])
+			raise ValueError()
+	assert json.loads(stored(gdbm, members)['cn=g1']) == ['uid=a']
+	assert 'cn=g2' not in stored(gdbm, members)
+	assert members._pending is None
+
+
+def test_transaction_reverse(caches, gdbm):
+	member_of = caches.get_sub_cache('memberOf')
+	member_of.save('cn=g1', ['uid=a', 'uid=b'])
+	with caches.transaction():
+		member_of.save('cn=g2', ['uid=a'])
+		member_of.save('cn=g2', ['uid=a'])
+		member_of.delete('cn=g1', ['uid=a', 'uid=b'])
+		assert member_of.get('uid=a') == ['cn=g2']
+		assert member_of.get('uid=b') is None
+	assert json.loads(stored(gdbm, member_of)['uid=a']) == ['cn=g2']
+	assert 'uid=b' not in stored(gdbm, member_of)
+
+
+def test_empty_commit_does_not_write(caches, gdbm):
+	del gdbm.opened[:]
+	with caches.transaction():
+		pass
+	assert gdbm.opened == []
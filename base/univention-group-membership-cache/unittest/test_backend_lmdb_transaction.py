@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+#
+# Copyright 2021 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+#
+import sys
+
+import pytest
+from univentionunittests import import_module
+
+
+@pytest.fixture
+def lmdb(mocker):
+	lmdb = mocker.MagicMock()
+	mocker.patch.dict(sys.modules, {'lmdb': lmdb, 'gdbm': mocker.Mock(), 'dbm.gnu': mocker.Mock()})
+	return lmdb
+
+
+@pytest.fixture
+def backend(lmdb, mocker):
+	module = import_module("univention.ldap_cache.cache.backend.lmdb_cache", "src/", "univention.ldap_cache.cache.backend.lmdb_cache", use_installed=False)
+	mocker.patch.object(module, 'lmdb', lmdb)
+	mocker.patch.object(module.LmdbCaches, '_fix_permissions')
+	return module
+
+
+@pytest.fixture
+def caches(backend):
+	caches = backend.LmdbCaches()
+	caches._add_sub_cache('uniqueMembers', False, False)
+	caches._add_sub_cache('entryUUID', True, False)
+	return caches
+
+
+def test_save_without_transaction(caches):
+	cache = caches.get_sub_cache('entryUUID')
+	cache.save('cn=g1', ['1234'])
+	caches.env.begin.assert_called_once_with(cache.sub_db, write=True)
+	writer = caches.env.begin.return_value.__enter__.return_value
+	writer.put.assert_called_once_with('cn=g1', '1234', db=cache.sub_db)
+
+
+def test_transaction_shares_one_writer(caches):
+	members = caches.get_sub_cache('uniqueMembers')
+	uuids = caches.get_sub_cache('entryUUID')
+	with caches.transaction():
+		members.save('cn=g1', ['uid=a', 'uid=b'])
+		uuids.save('cn=g1', ['1234'])
+		assert members._txn is uuids._txn is caches._txn
+	caches.env.begin.assert_called_once_with(write=True)
+	txn = caches.env.begin.return_value
+	assert txn.put.call_count == 3
+	txn.delete.assert_any_call('cn=g1', db=members.sub_db)
+	txn.put.assert_any_call('cn=g1', '1234', db=uuids.sub_db)
+	txn.commit.assert_called_once_with()
+	txn.abort.assert_not_called()
+	assert caches._txn is None
+	assert members._txn is None
+	assert uuids._txn is None
+
+
+def test_transaction_abort(caches):
+	members = caches.get_sub_cache('uniqueMembers')
+	with pytest.raises(ValueError):
+		with caches.transaction():
+			members.save('cn=g1', ['uid=a'])
+			raise ValueError()
+	txn = caches.env.begin.return_value
+	txn.abort.assert_called_once_with()
+	txn.commit.assert_not_called()
+	assert caches._txn is None
+	assert members._txn is None
+
+
+def test_begin_is_reentrant(caches):
+	caches.begin()
+	caches.begin()
+	caches.commit()
+	caches.commit()
+	caches.env.begin.assert_called_once_with(write=True)
+	caches.env.begin.return_value.commit.assert_called_once_with()
@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+#
+# Copyright 2021 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+#
+import fcntl
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+from univentionunittests import import_module
+
+
+@pytest.fixture
+def bulk_build(mocker):
+	mocker.patch.dict(sys.modules, {'gdbm': mocker.Mock(), 'dbm.gnu': mocker.Mock()})
+	return import_module("univention.ldap_cache.bulk_build", "src/", "univention.ldap_cache.bulk_build", use_installed=False)
+
+
+USER = {
+	'objectClass': [b'top', b'person', b'posixAccount'],
+	'uid': [b'Administrator'],
+	'cn': [b'Admin (main)'],
+	'univentionObjectType': [b'users/user'],
+}
+
+
+@pytest.mark.parametrize('ldap_filter,expected', [
+	('(uid=Administrator)', True),
+	('(uid=administrator)', True),
+	('(UID=ADMINISTRATOR)', True),
+	('(uid=admin)', False),
+	('(uid=*)', True),
+	('(mail=*)', False),
+	('(uid=admin*)', True),
+	('(uid=*strat*)', True),
+	('(uid=*tor)', True),
+	('(uid=a*x*r)', False),
+	('(cn=Admin \\28main\\29)', True),
+	('(cn=*\\28*)', True),
+	('(&(objectClass=person)(univentionObjectType=users/user))', True),
+	('(&(objectClass=person)(objectClass=univentionGroup))', False),
+	('(|(objectClass=univentionGroup)(objectClass=posixAccount))', True),
+	('(|(objectClass=univentionGroup)(uid=nobody))', False),
+	('(!(objectClass=univentionGroup))', True),
+	('(!(uid=*))', False),
+	('(&(uid=*)(|(objectClass=univentionGroup)(!(mail=*))))', True),
+	(' (uid=Administrator) ', True),
+])
+def test_compile_filter(bulk_build, ldap_filter, expected):
+	assert bulk_build.compile_filter(ldap_filter)(USER) is expected
+
+
+def test_compile_filter_text_values(bulk_build):
+	assert bulk_build.compile_filter('(uid=administrator)')({'uid': ['Administrator']})
+
+
+@pytest.mark.parametrize('ldap_filter', [
+	'',
+	'uid=Administrator',
+	'(uid=Administrator',
+	'(uid)',
+	'(&(uid=a)(uid=b)',
+	'(uid=a))',
+	'(uid=a)(uid=b)',
+	'(uidNumber>=1000)',
+	'(uidNumber<=1000)',
+	'(cn~=Admin)',
+	'(uid:caseExactMatch:=Administrator)',
+	'(:dn:2.5.13.5:=Administrator)',
+])
+def test_compile_filter_invalid(bulk_build, ldap_filter):
+	with pytest.raises(ValueError):
+		bulk_build.compile_filter(ldap_filter)
+
+
+def test_changes_locked(bulk_build, tmpdir):
+	with bulk_build.changes_locked(str(tmpdir)):
+		with open(str(tmpdir.join(bulk_build.LOCK_FILE))) as fd:
+			with pytest.raises(EnvironmentError):
+				fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+	with open(str(tmpdir.join(bulk_build.LOCK_FILE))) as fd:
+		fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+class Cache(object):
+	def __init__(self, name):
+		self.name = name
+
+
+class Shard(object):
+	"""Records the calls of add_object, modify_object and rm_object"""
+
+	def __init__(self, name, calls):
+		self._cache = Cache(name)
+		self._calls = calls
+
+	def __getattr__(self, method):
+		return lambda *objs: self._calls.append((self._cache.name, method, objs))
+
+
+class Caches(object):
+	def __init__(self, calls):
+		self.calls = calls
+		self.shards = [Shard('memberUids', calls), Shard('uniqueMembers', calls)]
+
+	def get_shards_for_query(self, query):
+		return self.shards if query == '(objectClass=posixGroup)' else []
+
+	@contextmanager
+	def transaction(self):
+		self.calls.append('transaction')
+		yield self
+
+
+def test_journal(bulk_build, mocker, tmpdir):
+	mocker.patch.object(bulk_build.os, 'chown')
+	mocker.patch.object(bulk_build, 'getpwnam')
+	mocker.patch.object(bulk_build, 'NOTIFIER_ID_FILE', str(tmpdir.join('notifier_id')))
+	directory = str(tmpdir)
+	group = ('cn=g,dc=base', {'memberUid': [b'u1']})
+	group_new = ('cn=g,dc=base', {'memberUid': [b'u2']})
+	bulk_build.journal_change(directory, '(objectClass=posixGroup)', 'add_object', (group,))
+	assert not os.path.exists(os.path.join(directory, bulk_build.JOURNAL_FILE))
+
+	bulk_build._start_journal(directory)
+	bulk_build.journal_change(directory, '(objectClass=posixGroup)', 'add_object', (group,))
+	bulk_build.journal_change(directory, '(objectClass=posixGroup)', 'modify_object', (group, group_new))
+	bulk_build.journal_change(directory, '(objectClass=person)', 'rm_object', (('uid=u,dc=base', {}),))
+	calls = []
+	bulk_build._replay_journal(Caches(calls), directory, ['memberUids'])
+	assert calls == [
+		'transaction',
+		('memberUids', 'add_object', (group,)),
+		'transaction',
+		('memberUids', 'modify_object', (group, group_new)),
+		'transaction',
+	]
+
+	bulk_build._stop_journal(directory)
+	assert not os.path.exists(os.path.join(directory, bulk_build.JOURNAL_FILE))
+	bulk_build._stop_journal(directory)
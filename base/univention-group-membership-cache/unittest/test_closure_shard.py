@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+#
+# Copyright 2021 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+#
+import sys
+from contextlib import contextmanager
+
+import pytest
+from univentionunittests import import_module
+
+
+class DictCache(object):
+	"""In-memory sub cache with the semantics of the gdbm and lmdb backends"""
+
+	def __init__(self, reverse=False):
+		self.reverse = reverse
+		self.data = {}
+
+	@contextmanager
+	def reading(self, reader=None):
+		yield reader
+
+	def get(self, key, reader=None):
+		values = self.data.get(key)
+		if values:
+			return sorted(values)
+
+	def save(self, key, values):
+		if self.reverse:
+			for value in values:
+				self.data.setdefault(value, set()).add(key)
+		else:
+			self.data[key] = set(values)
+
+	def delete(self, key, values):
+		if self.reverse:
+			for value in values:
+				self.data.get(value, set()).discard(key)
+		else:
+			self.data.pop(key, None)
+
+
+@pytest.fixture
+def backend(mocker):
+	mocker.patch.dict(sys.modules, {'gdbm': mocker.Mock(), 'dbm.gnu': mocker.Mock(), 'lmdb': mocker.Mock()})
+	return import_module("univention.ldap_cache.cache.backend", "src/", "univention.ldap_cache.cache.backend", use_installed=False)
+
+
+@pytest.fixture
+def caches(backend, mocker):
+	class UniqueMembers(backend.Shard):
+		key = 'dn'
+		value = 'uniqueMember'
+
+	class MemberOf(backend.Shard):
+		key = 'dn'
+		value = 'uniqueMember'
+		reverse = True
+
+	class MemberOfClosure(backend.ClosureShard):
+		key = 'dn'
+		value = 'uniqueMember'
+
+	sub_caches = {
+		'uniqueMembers': DictCache(),
+		'memberOf': DictCache(reverse=True),
+		'memberOfClosure': DictCache(),
+	}
+	get_cache = mocker.patch('univention.ldap_cache.cache.get_cache', create=True)
+	get_cache.return_value.get_sub_cache.side_effect = sub_caches.get
+	sub_caches['shards'] = [
+		UniqueMembers(sub_caches['uniqueMembers']),
+		MemberOf(sub_caches['memberOf']),
+		MemberOfClosure(sub_caches['memberOfClosure']),
+	]
+	return sub_caches
+
+
+def group(name, *members):
+	return ('cn=%s,cn=groups,dc=base' % (name,), {'uniqueMember': [member.encode('utf-8') for member in members]})
+
+
+def add(caches, obj):
+	for shard in caches['shards']:
+		shard.add_object(obj)
+
+
+def modify(caches, old_obj, new_obj):
+	for shard in caches['shards']:
+		shard.modify_object(old_obj, new_obj)
+
+
+def remove(caches, obj):
+	for shard in caches['shards']:
+		shard.rm_object(obj)
+
+
+def closure(caches, dn):
+	return caches['memberOfClosure'].get(dn.lower())
+
+
+USER = 'uid=user,cn=users,dc=base'
+G1 = 'cn=g1,cn=groups,dc=base'
+G2 = 'cn=g2,cn=groups,dc=base'
+G3 = 'cn=g3,cn=groups,dc=base'
+
+
+def test_reverse_values_are_lowercased(caches):
+	add(caches, group('G1', 'uid=User,cn=users,dc=base'))
+	assert caches['memberOf'].get(USER) == ['cn=g1,cn=groups,dc=base']
+
+
+def test_add_nested(caches):
+	add(caches, group('g1', USER))
+	add(caches, group('g2', G1))
+	assert closure(caches, USER) == [G1, G2]
+	assert closure(caches, G1) == [G2]
+	assert closure(caches, G2) is None
+
+
+def test_add_nested_parent_first(caches):
+	add(caches, group('g2', G1))
+	add(caches, group('g1', USER))
+	assert closure(caches, USER) == [G1, G2]
+
+
+def test_modify_members(caches):
+	add(caches, group('g1', USER))
+	add(caches, group('g2', G1))
+	add(caches, group('g3', G2))
+	assert closure(caches, USER) == [G1, G2, G3]
+	modify(caches, group('g3', G2), group('g3'))
+	assert closure(caches, USER) == [G1, G2]
+	assert closure(caches, G1) == [G2]
+	assert closure(caches, G2) is None
+
+
+def test_rename(caches):
+	add(caches, group('g1', USER))
+	add(caches, group('g2', G1))
+	modify(caches, group('g1', USER), group('g1new', USER))
+	assert closure(caches, G1) is None
+	assert closure(caches, USER) == ['cn=g1new,cn=groups,dc=base']
+	modify(caches, group('g2', G1), group('g2', 'cn=g1new,cn=groups,dc=base'))
+	assert closure(caches, USER) == ['cn=g1new,cn=groups,dc=base', G2]
+	assert closure(caches, 'cn=g1new,cn=groups,dc=base') == [G2]
+
+
+def test_remove(caches):
+	add(caches, group('g1', USER))
+	add(caches, group('g2', G1))
+	remove(caches, group('g2', G1))
+	assert closure(caches, USER) == [G1]
+	assert closure(caches, G1) is None
+	remove(caches, group('g1', USER))
+	assert closure(caches, USER) is None
+
+
+def test_cycle(caches):
+	add(caches, group('g1', USER, G2))
+	add(caches, group('g2', G1))
+	assert closure(caches, USER) == [G1, G2]
+	assert closure(caches, G1) == [G1, G2]
+
+
+def test_walk(backend):
+	graph = {'a': ['B'], 'b': ['c', 'a'], 'c': None}
+	assert backend._walk(['A'], graph.get) == {'a', 'b', 'c'}
@@ -31,6 +31,9 @@
 # <https://www.gnu.org/licenses/>.
 
 import re
+import time
+import threading
+from contextlib import contextmanager
 from functools import wraps
 import random
 
@@ -38,13 +41,15 @@ import six
 import ldap
 import ldap.schema
 import ldap.sasl
+from ldap.controls import SimplePagedResultsControl
+from ldap.filter import filter_format
 from ldapurl import LDAPUrl
 from ldapurl import isLDAPUrl
 
 import univention.debug
 from univention.config_registry import ConfigRegistry
 try:
-	from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union  # noqa: F401
+	from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union  # noqa: F401
 except ImportError:
 	pass
 
@@ -285,8 +290,41 @@ class access(object):
 
 		self.client_connection_attempt = client_retry_count + 1
 
+		self._policy_local = threading.local()
+
 		self.__open(ca_certfile)
 
+	@property
+	def policy_resolver(self):
+		# type: () -> Optional[PolicyResolver]
+		"""
+		The cache used for resolving policies in the current thread.
+
+		:returns: the policy cache or `None` if policies are not cached.
+		"""
+		return getattr(self._policy_local, 'resolver', None)
+
+	@policy_resolver.setter
+	def policy_resolver(self, resolver):
+		# type: (Optional[PolicyResolver]) -> None
+		self._policy_local.resolver = resolver
+
+	@contextmanager
+	def cached_policies(self, ttl=60.0):
+		# type: (float) -> Iterator[PolicyResolver]
+		"""
+		Cache policies resolved by :py:meth:`getPolicies` in the current thread.
+
+		:param float ttl: Seconds after which cached entries are re-validated.
+		:returns: A context manager yielding the :py:class:`PolicyResolver`.
+		"""
+		previous = self.policy_resolver
+		self.policy_resolver = resolver = PolicyResolver(self, ttl)
+		try:
+			yield resolver
+		finally:
+			self.policy_resolver = previous
+
 	@_fix_reconnect_handling
 	def bind(self, binddn, bindpw):
 		# type: (str, str) -> None
@@ -543,12 +581,97 @@ class access(object):
 		"""
 		return [x[0] for x in self.search(filter, base, scope, ['dn'], unique, required, timeout, sizelimit, serverctrls, response)]
 
+	def search_iter(self, filter='(objectClass=*)', base='', scope='sub', attr=[], timeout=-1, sizelimit=0, serverctrls=None, page_size=1000):
+		# type: (str, str, str, List[str], int, int, Optional[List[ldap.controls.LDAPControl]], int) -> Iterator[Tuple[str, Dict[str, List[bytes]]]]
+		"""
+		Perform paged LDAP search and yield the values as the pages arrive.
+
+		The search uses the :rfc:`2696` Simple Paged Results control, so only a single page of results is held in memory.
+		If the connection breaks during the search and `reconnect` is enabled, the search is restarted and the entries already returned are skipped by their DN.
+		OpenLDAP keeps the paged results state per connection, so the caller must not start other paged searches on the same connection before the iterator is exhausted.
+
+		:param str filter: LDAP search filter.
+		:param str base: the starting point for the search.
+		:param str scope: Specify the scope of the search to be one of `base`, `base+one`, `one`, `sub`, or `domain` to specify a base object, base plus one-level, one-level, subtree, or children search.
+		:param attr: The list of attributes to fetch.
+		:type attr: list[str]
+		:param int timeout: wait at most timeout seconds for each page to arrive. `-1` for no limit.
+		:param int sizelimit: retrieve at most sizelimit entries for a search. `0` for no limit.
+		:param serverctrls: a list of additional :py:class:`ldap.controls.LDAPControl` instances sent to the server along with each LDAP request.
+		:type serverctrls: list[ldap.controls.LDAPControl]
+		:param int page_size: The number of entries to request per page.
+		:returns: An iterator of 2-tuples (dn, values) for each LDAP object, where values is a dictionary mapping attribute names to a list of values.
+		:rtype: iterator[tuple[str, dict[str, list[str]]]]
+		:raises ldap.NO_SUCH_OBJECT: Indicates the target object cannot be found.
+		:raises ldap.INAPPROPRIATE_MATCHING: Indicates that the matching rule specified in the search filter does not match a rule defined for the attribute's syntax.
+		"""
+		univention.debug.debug(univention.debug.LDAP, univention.debug.INFO, 'uldap.search_iter filter=%s base=%s scope=%s attr=%s timeout=%d sizelimit=%d page_size=%d' % (
+			filter, base, scope, attr, timeout, sizelimit, page_size))
+
+		if not base:
+			base = self.base
+
+		if scope == 'base+one':
+			ldap_scopes = [ldap.SCOPE_BASE, ldap.SCOPE_ONELEVEL]
+		elif scope == 'sub' or scope == 'domain':
+			ldap_scopes = [ldap.SCOPE_SUBTREE]
+		elif scope == 'one':
+			ldap_scopes = [ldap.SCOPE_ONELEVEL]
+		else:
+			ldap_scopes = [ldap.SCOPE_BASE]
+
+		for ldap_scope in ldap_scopes:
+			for entry in self.__search_paged(base, ldap_scope, filter, attr, timeout, sizelimit, serverctrls, page_size):
+				yield entry
+
+	def __search_paged(self, base, scope, filter, attr, timeout, sizelimit, serverctrls, page_size):
+		# type: (str, int, str, List[str], int, int, Optional[List[ldap.controls.LDAPControl]], int) -> Iterator[Tuple[str, Dict[str, List[bytes]]]]
+		page_ctrl = SimplePagedResultsControl(True, size=page_size, cookie='')
+		returned = set()  # type: Set[str]
+		reconnected = False
+		while True:
+			try:
+				msgid = self.lo.search_ext(base, scope, filter, attr, serverctrls=[page_ctrl] + list(serverctrls or []), clientctrls=None, timeout=timeout, sizelimit=sizelimit)
+				rtype, rdata, rmsgid, rctrls = self.lo.result3(msgid, timeout=timeout)
+			except (ldap.SERVER_DOWN, ldap.UNAVAILABLE, ldap.CONNECT_ERROR):
+				# search_ext() and result3() are not wrapped by ReconnectLDAPObject, so reconnect explicitly
+				if not self.reconnect or reconnected:
+					raise
+				# the paged results cookie is only valid for the broken connection
+				# the order of the results is not stable across searches, so skip the entries by DN
+				univention.debug.debug(univention.debug.LDAP, univention.debug.WARN, 'uldap.search_iter: connection lost after %d entries, restarting search' % (len(returned),))
+				self._reconnect()
+				reconnected = True
+				page_ctrl.cookie = ''
+				continue
+			reconnected = False
+
+			for dn, values in rdata:
+				if self.reconnect:
+					key = dn.lower()
+					if key in returned:
+						continue
+					returned.add(key)
+				yield dn, values
+
+			for ctrl in rctrls:
+				if ctrl.controlType == SimplePagedResultsControl.controlType:
+					page_ctrl.cookie = ctrl.cookie
+					break
+			else:
+				univention.debug.debug(univention.debug.LDAP, univention.debug.WARN, 'uldap.search_iter: server ignores RFC 2696 Simple Paged Results Control')
+				break
+			if not page_ctrl.cookie:
+				break
+
 	@_fix_reconnect_handling
 	def getPolicies(self, dn, policies=None, attrs=None, result=None, fixedattrs=None):
 		# type: (str, List[str], Dict[str, List[Any]], Any, Any) -> Dict[str, Dict[str, Any]]
 		"""
 		Return |UCS| policies for |LDAP| entry.
 
+		If :py:attr:`policy_resolver` is set, the policy references of the parent containers and the policy objects are cached by it.
+
 		:param str dn: The distinguished name of the |LDAP| entry.
 		:param list policies: List of policy object classes...
 		:param dict attrs: |LDAP| attributes. If not given, the data is fetched from LDAP.
@@ -556,92 +679,8 @@ class access(object):
 		:param fixedattrs: UNUSED!
 		:returns: A mapping of policy names to
 		"""
-		if attrs is None:
-			attrs = {}
-		if policies is None:
-			policies = []
-		if not dn and not policies:  # if policies is set apply a fictionally referenced list of policies
-			return {}
-
-		# get current dn
-		if 'objectClass' in attrs and 'univentionPolicyReference' in attrs:
-			oattrs = attrs
-		else:
-			oattrs = self.get(dn, ['univentionPolicyReference', 'objectClass'])
-
-		if 'univentionPolicyReference' in attrs:
-			policies = [x.decode('utf-8') for x in attrs['univentionPolicyReference']]
-		elif not policies and not attrs:
-			policies = [x.decode('utf-8') for x in oattrs.get('univentionPolicyReference', [])]
-
-		object_classes = set(oc.lower() for oc in oattrs.get('objectClass', []))
-
-		merged = {}  # type: Dict[str, Dict[str, Any]]
-		if dn:
-			obj_dn = dn
-			while True:
-				for policy_dn in policies or []:
-					self._merge_policy(policy_dn, obj_dn, object_classes, merged)
-				dn = self.parentDn(dn) or ''
-				if not dn:
-					break
-				try:
-					parent = self.get(dn, attr=['univentionPolicyReference'], required=True)
-				except ldap.NO_SUCH_OBJECT:
-					break
-				policies = [x.decode('utf-8') for x in parent.get('univentionPolicyReference', [])]
-
-		univention.debug.debug(
-			univention.debug.LDAP, univention.debug.INFO,
-			"getPolicies: result: %s" % merged)
-		return merged
-
-	def _merge_policy(self, policy_dn, obj_dn, object_classes, result):
-		# type: (str, str, Set[bytes], Dict[str, Dict[str, Any]]) -> None
-		"""
-		Merge policies into result.
-
-		:param policy_dn str: Distinguished name of the policy object.
-		:param obj_dn: Distinguished name of the LDAP object.
-		:param object_classes set: the set of object classes of the LDAP object.
-		:param result list: A mapping, into which the policy is merged.
-		"""
-		pattrs = self.get(policy_dn)
-		if not pattrs:
-			return
-
-		try:
-			classes = set(pattrs['objectClass']) - {b'top', b'univentionPolicy', b'univentionObject'}
-			ptype = classes.pop().decode('utf-8')
-		except KeyError:
-			return
-
-		if pattrs.get('ldapFilter'):
-			try:
-				self.search(pattrs['ldapFilter'][0].decode('utf-8'), base=obj_dn, scope='base', unique=True, required=True)
-			except ldap.NO_SUCH_OBJECT:
-				return
-
-		if not all(oc.lower() in object_classes for oc in pattrs.get('requiredObjectClasses', [])):
-			return
-		if any(oc.lower() in object_classes for oc in pattrs.get('prohibitedObjectClasses', [])):
-			return
-
-		fixed = set(x.decode('utf-8') for x in pattrs.get('fixedAttributes', ()))
-		empty = set(x.decode('utf-8') for x in pattrs.get('emptyAttributes', ()))
-		values = result.setdefault(ptype, {})
-		SKIP = {'requiredObjectClasses', 'prohibitedObjectClasses', 'fixedAttributes', 'emptyAttributes', 'objectClass', 'cn', 'univentionObjectType', 'ldapFilter'}
-		for key in (empty | set(pattrs) | fixed) - SKIP:
-			if key not in values or key in fixed:
-				value = [] if key in empty else pattrs.get(key, [])
-				univention.debug.debug(
-					univention.debug.LDAP, univention.debug.INFO,
-					"getPolicies: %s sets: %s=%r" % (policy_dn, key, value))
-				values[key] = {
-					'policy': policy_dn,
-					'value': value,
-					'fixed': key in fixed,
-				}
+		resolver = self.policy_resolver or PolicyResolver(self)
+		return resolver.get_policies(dn, policies, attrs)
 
 	@_fix_reconnect_handling
 	def get_schema(self):
@@ -687,6 +726,7 @@ class access(object):
 			vals |= set(val)
 
 		nal = self.__encode_entry([(k, list(v)) for k, v in nal.items()])
+		self.__invalidate_policies(dn)
 
 		try:
 			rtype, rdata, rmsgid, resp_ctrls = self.lo.add_ext_s(dn, nal, serverctrls=serverctrls)
@@ -785,6 +825,7 @@ class access(object):
 		:param str dn: The distinguished name of the object to modify.
 		:param ml: The modify-list of 3-tuples (attribute-name, old-values, new-values).
 		"""
+		self.__invalidate_policies(dn)
 		try:
 			self.lo.modify_ext_s(dn, ml)
 		except ldap.REFERRAL as exc:
@@ -808,6 +849,7 @@ class access(object):
 		if not serverctrls:
 			serverctrls = []
 
+		self.__invalidate_policies(dn)
 		try:
 			rtype, rdata, rmsgid, resp_ctrls = self.lo.modify_ext_s(dn, ml, serverctrls=serverctrls)
 		except ldap.REFERRAL as exc:
@@ -861,6 +903,7 @@ class access(object):
 		if not serverctrls:
 			serverctrls = []
 
+		self.__invalidate_policies()
 		try:
 			rtype, rdata, rmsgid, resp_ctrls = self.lo.rename_s(dn, newrdn, newsuperior, serverctrls=serverctrls)
 		except ldap.REFERRAL as exc:
@@ -883,6 +926,7 @@ class access(object):
 		univention.debug.debug(univention.debug.LDAP, univention.debug.INFO, 'uldap.delete %s' % dn)
 		if dn:
 			univention.debug.debug(univention.debug.LDAP, univention.debug.INFO, 'delete')
+			self.__invalidate_policies(dn)
 			try:
 				self.lo.delete_s(dn)
 			except ldap.REFERRAL as exc:
@@ -891,6 +935,11 @@ class access(object):
 				lo_ref = self._handle_referral(exc)
 				lo_ref.delete_s(dn)
 
+	def __invalidate_policies(self, dn=None):
+		# type: (Optional[str]) -> None
+		if self.policy_resolver is not None:
+			self.policy_resolver.invalidate(dn)
+
 	def parentDn(self, dn):
 		# type: (str) -> Optional[str]
 		"""
@@ -954,6 +1003,7 @@ class access(object):
 		"""
 		odict = self.__dict__.copy()
 		del odict['lo']
+		del odict['_policy_local']
 		return odict
 
 	def __setstate__(self, dict):
@@ -961,6 +1011,7 @@ class access(object):
 		Set state for pickling.
 		"""
 		self.__dict__.update(dict)
+		self._policy_local = threading.local()
 		self.__open(self.ca_certfile)
 
 	def _handle_referral(self, exception):
@@ -1000,6 +1051,268 @@ class access(object):
 			raise ldap.CONNECT_ERROR('Bad referral "%s"' % (exc,))
 
 
+class _Policy(object):
+	"""
+	A parsed |UCS| policy object.
+
+	:param str dn: Distinguished name of the policy object.
+	:param dict attrs: |LDAP| attributes of the policy object.
+	:raises KeyError: if the object is not a policy.
+	"""
+
+	SKIP = {'requiredObjectClasses', 'prohibitedObjectClasses', 'fixedAttributes', 'emptyAttributes', 'objectClass', 'cn', 'univentionObjectType', 'ldapFilter'}
+
+	def __init__(self, dn, attrs):
+		# type: (str, Dict[str, List[bytes]]) -> None
+		self.dn = dn
+		classes = set(attrs['objectClass']) - {b'top', b'univentionPolicy', b'univentionObject'}
+		self.type = classes.pop().decode('utf-8')
+		self.ldap_filter = attrs['ldapFilter'][0].decode('utf-8') if attrs.get('ldapFilter') else None
+		self.required = set(oc.lower() for oc in attrs.get('requiredObjectClasses', []))
+		self.prohibited = set(oc.lower() for oc in attrs.get('prohibitedObjectClasses', []))
+		self.fixed = set(x.decode('utf-8') for x in attrs.get('fixedAttributes', ()))
+		self.empty = set(x.decode('utf-8') for x in attrs.get('emptyAttributes', ()))
+		self.values = dict(
+			(key, [] if key in self.empty else attrs.get(key, []))
+			for key in (self.empty | set(attrs) | self.fixed) - self.SKIP
+		)  # type: Dict[str, List[bytes]]
+
+	def applies_to(self, object_classes):
+		# type: (Set[bytes]) -> bool
+		"""
+		Check if the policy applies to an object with the given object classes.
+
+		:param object_classes set: the set of lower cased object classes of the LDAP object.
+		"""
+		return self.required <= object_classes and not self.prohibited & object_classes
+
+	def merge(self, result):
+		# type: (Dict[str, Dict[str, Any]]) -> None
+		"""
+		Merge policy values into result.
+
+		:param result list: A mapping, into which the policy is merged.
+		"""
+		values = result.setdefault(self.type, {})
+		for key, value in self.values.items():
+			if key not in values or key in self.fixed:
+				univention.debug.debug(
+					univention.debug.LDAP, univention.debug.INFO,
+					"getPolicies: %s sets: %s=%r" % (self.dn, key, value))
+				values[key] = {
+					'policy': self.dn,
+					'value': list(value),  # do not expose the cached list
+					'fixed': key in self.fixed,
+				}
+
+
+class PolicyResolver(object):
+	"""
+	Resolve |UCS| policies for |LDAP| entries.
+
+	The policy references of the parent containers and the parsed policy
+	objects are cached, so resolving the policies of many objects in the same
+	container does not read them again and again. After `ttl` seconds a cached
+	entry is re-validated by comparing its `entryCSN`, which is cheaper than
+	reading and parsing it again.
+
+	:param access lo: The |LDAP| connection.
+	:param float ttl: Seconds after which cached entries are re-validated.
+	"""
+
+	def __init__(self, lo, ttl=60.0):
+		# type: (access, float) -> None
+		self.lo = lo
+		self.ttl = ttl
+		self._references = {}  # type: Dict[str, Tuple[float, Optional[bytes], Optional[List[str]]]]
+		self._policies = {}  # type: Dict[str, Tuple[float, Optional[bytes], Optional[_Policy]]]
+
+	def invalidate(self, dn=None):
+		# type: (Optional[str]) -> None
+		"""
+		Drop cached entries.
+
+		:param str dn: The distinguished name of the changed |LDAP| entry. If not given, the whole cache is dropped.
+		"""
+		if dn is None:
+			self._references.clear()
+			self._policies.clear()
+			return
+		key = dn.lower()
+		self._references.pop(key, None)
+		self._policies.pop(key, None)
+
+	def _cached(self, cache, dn, attr, parse):
+		# type: (Dict[str, Tuple[float, Optional[bytes], Any]], str, List[str], Callable[[str, Dict[str, List[bytes]]], Any]) -> Any
+		key = dn.lower()
+		now = time.time()
+		try:
+			stamp, csn, value = cache[key]
+		except KeyError:
+			pass
+		else:
+			if now - stamp < self.ttl:
+				return value
+			if csn is not None and self.lo.getAttr(dn, 'entryCSN') == [csn]:
+				cache[key] = (now, csn, value)
+				return value
+
+		try:
+			attrs = self.lo.get(dn, attr=attr + ['entryCSN'], required=True)
+		except ldap.NO_SUCH_OBJECT:
+			csn, value = None, None
+		else:
+			csn = attrs.pop('entryCSN', [None])[0]
+			value = parse(dn, attrs)
+		cache[key] = (now, csn, value)
+		return value
+
+	def _policy_references(self, dn):
+		# type: (str) -> Optional[List[str]]
+		"""
+		Return the policy references of a container.
+
+		:returns: The list of referenced policies or `None` if the container does not exist.
+		"""
+		return self._cached(self._references, dn, ['univentionPolicyReference'], lambda dn, attrs: [x.decode('utf-8') for x in attrs.get('univentionPolicyReference', [])])
+
+	def _policy(self, dn):
+		# type: (str) -> Optional[_Policy]
+		"""
+		Return the parsed policy object.
+
+		:returns: The policy or `None` if it does not exist or is not a policy.
+		"""
+		def parse(dn, attrs):
+			try:
+				return _Policy(dn, attrs)
+			except KeyError:
+				return None
+		return self._cached(self._policies, dn, ['*'], parse)
+
+	def _merge_policy(self, policy_dn, obj_dn, object_classes, result):
+		# type: (str, str, Set[bytes], Dict[str, Dict[str, Any]]) -> None
+		"""
+		Merge policies into result.
+
+		:param policy_dn str: Distinguished name of the policy object.
+		:param obj_dn: Distinguished name of the LDAP object.
+		:param object_classes set: the set of object classes of the LDAP object.
+		:param result list: A mapping, into which the policy is merged.
+		"""
+		policy = self._policy(policy_dn)
+		if policy is None:
+			return
+
+		if policy.ldap_filter:
+			try:
+				self.lo.search(policy.ldap_filter, base=obj_dn, scope='base', unique=True, required=True)
+			except ldap.NO_SUCH_OBJECT:
+				return
+
+		if policy.applies_to(object_classes):
+			policy.merge(result)
+
+	def get_policies(self, dn, policies=None, attrs=None):
+		# type: (str, Optional[List[str]], Optional[Dict[str, List[Any]]]) -> Dict[str, Dict[str, Any]]
+		"""
+		Return |UCS| policies for |LDAP| entry.
+
+		:param str dn: The distinguished name of the |LDAP| entry.
+		:param list policies: List of policy object classes...
+		:param dict attrs: |LDAP| attributes. If not given, the data is fetched from LDAP.
+		:returns: A mapping of policy names to
+		"""
+		if attrs is None:
+			attrs = {}
+		if policies is None:
+			policies = []
+		if not dn and not policies:  # if policies is set apply a fictionally referenced list of policies
+			return {}
+
+		# get current dn
+		if 'objectClass' in attrs and 'univentionPolicyReference' in attrs:
+			oattrs = attrs
+		else:
+			oattrs = self.lo.get(dn, ['univentionPolicyReference', 'objectClass'])
+
+		if 'univentionPolicyReference' in attrs:
+			policies = [x.decode('utf-8') for x in attrs['univentionPolicyReference']]
+		elif not policies and not attrs:
+			policies = [x.decode('utf-8') for x in oattrs.get('univentionPolicyReference', [])]
+
+		object_classes = set(oc.lower() for oc in oattrs.get('objectClass', []))
+
+		merged = {}  # type: Dict[str, Dict[str, Any]]
+		if dn:
+			obj_dn = dn
+			while True:
+				for policy_dn in policies or []:
+					self._merge_policy(policy_dn, obj_dn, object_classes, merged)
+				dn = self.lo.parentDn(dn) or ''
+				if not dn:
+					break
+				policies = self._policy_references(dn)
+				if policies is None:
+					break
+
+		univention.debug.debug(
+			univention.debug.LDAP, univention.debug.INFO,
+			"getPolicies: result: %s" % merged)
+		return merged
+
+	def get_policies_for(self, dns, chunk_size=500):
+		# type: (Iterable[str], int) -> Dict[str, Dict[str, Dict[str, Any]]]
+		"""
+		Return |UCS| policies for many |LDAP| entries at once.
+
+		The policy references and object classes of the entries are read with one search per parent container and chunk of entries instead of one read per entry.
+		The parent containers and the policy objects are cached as for :py:meth:`get_policies`.
+
+		:param list dns: The distinguished names of the |LDAP| entries.
+		:param int chunk_size: The maximum number of entries read by a single search.
+		:returns: A mapping of distinguished names to the result of :py:meth:`get_policies`.
+		"""
+		dns = list(dns)
+		children = {}  # type: Dict[str, List[str]]
+		for dn in dns:
+			parent = self.lo.parentDn(dn)
+			if parent:
+				children.setdefault(parent, []).append(dn)
+
+		entries = {}  # type: Dict[str, Dict[str, List[bytes]]]
+		for parent, group in children.items():
+			for i in range(0, len(group), chunk_size):
+				rdn_filters = [self._rdn_filter(dn) for dn in group[i:i + chunk_size]]
+				for dn, attrs in self.lo.search('(|%s)' % ''.join(rdn_filters), base=parent, scope='one', attr=['univentionPolicyReference', 'objectClass']):
+					entries[self._dn_key(dn)] = attrs
+
+		result = {}  # type: Dict[str, Dict[str, Dict[str, Any]]]
+		for dn in dns:
+			attrs = entries.get(self._dn_key(dn))
+			if attrs is None:
+				result[dn] = self.get_policies(dn)
+			else:
+				attrs.setdefault('univentionPolicyReference', [])
+				attrs.setdefault('objectClass', [])
+				result[dn] = self.get_policies(dn, attrs=attrs)
+		return result
+
+	@staticmethod
+	def _rdn_filter(dn):
+		# type: (str) -> str
+		"""
+		Return a |LDAP| filter matching the relative distinguished name of an entry.
+		"""
+		filters = [filter_format('(%s=%s)', [attr, value]) for attr, value, _flags in ldap.dn.str2dn(dn)[0]]
+		return filters[0] if len(filters) == 1 else '(&%s)' % ''.join(filters)
+
+	@staticmethod
+	def _dn_key(dn):
+		# type: (str) -> str
+		return ldap.dn.dn2str(ldap.dn.str2dn(dn)).lower()
+
+
 if __name__ == '__main__':
 	import doctest
 	doctest.testmod()
@@ -44,9 +44,10 @@ from __future__ import absolute_import
 from univention.listener.api_adapter import ListenerModuleAdapter
 from univention.listener.handler_configuration import ListenerModuleConfiguration
 from univention.listener.handler import ListenerModuleHandler
+from univention.listener.handler_batched import BatchedListenerModuleHandler
 from univention.listener.exceptions import ListenerModuleConfigurationError, ListenerModuleRuntimeError
 
 __all__ = [
 	'ListenerModuleAdapter', 'ListenerModuleConfigurationError', 'ListenerModuleRuntimeError',
-	'ListenerModuleConfiguration', 'ListenerModuleHandler'
+	'ListenerModuleConfiguration', 'ListenerModuleHandler', 'BatchedListenerModuleHandler'
 ]
@@ -57,6 +57,8 @@ class ListenerModuleAdapter(object):
 		self._saved_old_dn = None  # type: Optional[str]
 		self._rename = False
 		self._renamed = False
+		self._watched_attributes = self.config.get_watched_attributes()
+		self._skipped = 0
 		self._run_checks()
 
 	def _run_checks(self):
@@ -86,6 +88,18 @@ class ListenerModuleAdapter(object):
 		prerun = self._lazy_pre_run
 		postrun = self._lazy_post_run
 		setdata = self._setdata
+		callbacks = dict(
+			handler=handler,
+			initialize=initialize,
+			clean=clean,
+			prerun=prerun,
+			postrun=postrun,
+			setdata=setdata,
+		)
+		if self.config.get_parallel():
+			from univention.listener.dispatcher import ParallelDispatcher, is_worker
+			if not is_worker():
+				callbacks = ParallelDispatcher(self.config).get_globals()
 		return dict(
 			name=name,
 			description=description,
@@ -93,12 +107,7 @@ class ListenerModuleAdapter(object):
 			attributes=attributes,
 			priority=priority,
 			modrdn=modrdn,
-			handler=handler,
-			initialize=initialize,
-			clean=clean,
-			prerun=prerun,
-			postrun=postrun,
-			setdata=setdata,
+			**callbacks
 		)
 
 	def _setdata(self, key, value):
@@ -158,6 +167,11 @@ class ListenerModuleAdapter(object):
 					# attribute changed
 					self._rename = self._renamed = False
 					return
+				if not self._rename and self._watched_attributes and not self._module_handler.diff(old, new, keys=self._watched_attributes):
+					# ignore modifications of unwatched attributes
+					self._renamed = False
+					self._skipped += 1
+					return
 				self._module_handler.modify(dn, old, new, self._saved_old_dn if self._rename else None)
 				self._renamed = self._rename
 				self._rename = False
@@ -182,4 +196,7 @@ class ListenerModuleAdapter(object):
 
 	def _lazy_post_run(self):
 		# type: () -> None
+		if self._skipped:
+			self._module_handler.logger.info('Skipped %d modifications of unwatched attributes.', self._skipped)
+			self._skipped = 0
 		return self._module_handler.post_run()
@@ -0,0 +1,478 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+
+"""
+Run listener modules in worker processes.
+
+Listener modules setting `parallel = True` in their configuration are
+executed in a dedicated worker process. The listener only queues the calls, so
+one slow module no longer delays the other modules. All calls of a module are
+processed by its worker in the original order, so the order of changes per
+module and per DN is kept.
+
+Run with `status` to show the queue depth and latency of all such modules.
+"""
+
+from __future__ import absolute_import, print_function
+
+import os
+import sys
+import json
+import time
+import errno
+import pickle
+import select
+import struct
+import inspect
+import argparse
+import traceback
+import subprocess
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, IO, Any, Deque, Dict, List, Optional, Tuple  # noqa F401
+
+import six
+
+import listener
+from univention.listener.handler_logging import get_logger
+from univention.listener.journal import Journal
+
+if TYPE_CHECKING:
+	from univention.listener.handler_configuration import ListenerModuleConfiguration  # noqa F401
+
+
+JOURNAL_DIR = '/var/lib/univention-directory-listener/parallel'
+METRICS_DIR = '/var/lib/univention-directory-listener/metrics'
+WORKER_ENV = 'UNIVENTION_LISTENER_WORKER'
+FRAME = struct.Struct('!I')
+COMMANDS = ('handler', 'setdata', 'initialize', 'clean', 'prerun', 'postrun')
+
+
+def _write_frame(fd, obj):
+	# type: (IO[bytes], Any) -> None
+	data = pickle.dumps(obj, 2)
+	fd.write(FRAME.pack(len(data)) + data)
+	fd.flush()
+
+
+def _read_frame(fd):
+	# type: (IO[bytes]) -> Any
+	header = fd.read(FRAME.size)
+	if len(header) < FRAME.size:
+		raise EOFError()
+	size, = FRAME.unpack(header)
+	data = fd.read(size)
+	if len(data) < size:
+		raise EOFError()
+	return pickle.loads(data)
+
+
+def is_worker():
+	# type: () -> bool
+	"""
+	Check if running inside a worker process.
+
+	:return: `True` in a worker process, `False` in the listener.
+	:rtype: bool
+	"""
+	return bool(os.environ.get(WORKER_ENV))
+
+
+class ParallelDispatcher(object):
+	"""
+	Forward all calls of a listener module to its worker process.
+
+	Changes are appended to a :py:class:`Journal` until the worker processed
+	them, so they are replayed after a restart of the listener or the worker.
+	The journal is synced to disk at most every `JOURNAL_SYNC_INTERVAL` seconds
+	and whenever the listener is idle, and compacted once `COMPACT_THRESHOLD`
+	processed changes have built up in it.
+
+	:param ListenerModuleConfiguration config: configuration object
+	"""
+
+	MAX_QUEUE = 1000
+	METRICS_INTERVAL = 10.0
+	JOURNAL_SYNC_INTERVAL = 1.0
+	COMPACT_THRESHOLD = 10000
+
+	def __init__(self, config):
+		# type: (ListenerModuleConfiguration) -> None
+		self.name = config.get_name()
+		self.module_file = inspect.getfile(config.get_listener_module_class())
+		self.logger = get_logger(self.name)
+		self._journal = Journal(JOURNAL_DIR, self.name, self.JOURNAL_SYNC_INTERVAL)
+		self._process = None  # type: Optional[subprocess.Popen]
+		self._acks = None  # type: Optional[IO[bytes]]
+		self._seq = 0
+		self._pending = OrderedDict()  # type: OrderedDict[int, float]
+		self._data = OrderedDict()  # type: OrderedDict[str, str]
+		self._prepared = False
+		self._replay = True
+		self._records = deque()  # type: Deque[List[Any]]
+		self._done = 0  # processed records still in the journal
+		self._metrics = dict(
+			name=self.name,
+			depth=0,
+			max_depth=0,
+			processed=0,
+			failed=0,
+			latency_avg=0.0,
+			latency_max=0.0,
+			restarts=0,
+		)  # type: Dict[str, Any]
+		self._latency_total = 0.0
+		self._metrics_written = 0.0
+
+	def get_globals(self):
+		# type: () -> Dict[str, Any]
+		"""
+		Return the callbacks for the legacy listener module interface.
+
+		:return: a mapping with keys: `handler`, `initialize`, `clean`, `prerun`, `postrun` and `setdata`
+		:rtype: dict
+		"""
+		return dict(
+			handler=self.handler,
+			initialize=self.initialize,
+			clean=self.clean,
+			prerun=self.prerun,
+			postrun=self.postrun,
+			setdata=self.setdata,
+		)
+
+	def handler(self, dn, new, old, command):
+		# type: (str, Dict[str, List[bytes]], Dict[str, List[bytes]], str) -> None
+		self._submit('handler', (dn, new, old, command))
+
+	def setdata(self, key, value):
+		# type: (str, str) -> None
+		self._submit('setdata', (key, value))
+		self._data[key] = value  # restored when a new worker is started
+
+	def initialize(self):
+		# type: () -> None
+		self._submit('initialize', (), wait=True)
+
+	def clean(self):
+		# type: () -> None
+		self._submit('clean', (), wait=True)
+		self._journal.truncate()
+		self._records.clear()
+		self._done = 0
+		self._replay = False
+
+	def prerun(self):
+		# type: () -> None
+		self._submit('prerun', ())
+		self._prepared = True
+		if self._replay:
+			self._replay_journal()
+
+	def postrun(self):
+		# type: () -> None
+		self._submit('postrun', (), wait=True)
+		self._journal.sync()
+		self._prepared = False
+		self._write_metrics()
+
+	def _start(self):
+		# type: () -> None
+		"""Start worker process and restore its state."""
+		self._spawn()
+		self.logger.info('Started worker process %d.', self._process.pid)
+
+		for key, value in self._data.items():
+			self._send('setdata', (key, value))
+		if self._prepared:
+			self._send('prerun', ())
+			if self._replay:
+				self._replay_journal()
+
+	def _spawn(self):
+		# type: () -> None
+		"""Start worker process."""
+		ack_r, ack_w = os.pipe()
+		python = os.path.join(sys.exec_prefix, 'bin', 'python%d.%d' % sys.version_info[:2])
+		env = dict(os.environ)
+		env[WORKER_ENV] = '1'
+		kwargs = dict(pass_fds=(ack_w,)) if six.PY3 else dict(close_fds=False)
+		self._process = subprocess.Popen(
+			[python, '-m', __name__, 'worker', self.module_file, str(ack_w)],
+			stdin=subprocess.PIPE,
+			env=env,
+			**kwargs
+		)
+		os.close(ack_w)
+		self._acks = os.fdopen(ack_r, 'rb', 0)
+
+	def _stopped(self):
+		# type: () -> None
+		"""Clean up after the worker process terminated unexpectedly."""
+		assert self._process
+		try:
+			self._process.stdin.close()
+		except EnvironmentError:
+			pass
+		rc = self._process.wait()
+		try:
+			# confirmations sent before the worker terminated
+			while select.select([self._acks], [], [], 0)[0]:
+				self._confirm(*_read_frame(self._acks))
+		except EOFError:
+			pass
+		self._acks.close()
+		self.logger.error('Worker process %d terminated with %d, %d calls not confirmed.', self._process.pid, rc, len(self._pending))
+		self._process = self._acks = None
+
+		# keep unsent and unconfirmed changes except the one being processed when the worker died:
+		# the calls are processed in order, so that is the first unconfirmed call if it is a change
+		current = next(iter(self._pending), None)
+		records = []
+		for seq, record in self._records:
+			if seq and seq == current:
+				self.logger.error('Dropping change of %r, which terminated the worker process.', record[0])
+			elif not seq or seq in self._pending:
+				records.append(record)
+		self._journal.rewrite(records)
+		self._records = deque([0, record] for record in records)
+		self._done = 0
+		self._pending.clear()
+		self._metrics['restarts'] += 1
+		self._replay = True
+
+	def _replay_journal(self):
+		# type: () -> None
+		"""Send changes not confirmed by the previous worker."""
+		self._replay = False
+		self._records = deque([0, record] for record in self._journal.read())
+		self._done = 0
+		if self._records:
+			self.logger.info('Replaying %d changes from journal.', len(self._records))
+		for entry in list(self._records):
+			if self._process is None:
+				break
+			entry[0] = self._send('handler', entry[1])
+
+	def _submit(self, command, args, wait=False):
+		# type: (str, Tuple[Any, ...], bool) -> None
+		"""
+		Queue call in worker process.
+
+		:param str command: name of the callback
+		:param tuple args: arguments of the callback
+		:param bool wait: wait until the worker processed all queued calls
+		"""
+		if self._process is None:
+			self._start()
+		if command == 'handler':
+			# self._records contains the records of the journal not yet processed, each with the
+			# sequence number of its call or 0 if it was not sent to the current worker
+			self._journal.append(args)
+			entry = [0, args]
+			self._records.append(entry)
+			entry[0] = self._send(command, args)
+			seq = entry[0]
+		else:
+			seq = self._send(command, args)
+		self._collect(wait=wait or len(self._pending) >= self.MAX_QUEUE, seq=seq)
+		if wait and self._process is None:
+			# worker died before confirming, try once more with a new one
+			self._start()
+			seq = self._send(command, args)
+			self._collect(wait=True, seq=seq)
+
+	def _send(self, command, args):
+		# type: (str, Tuple[Any, ...]) -> int
+		if self._process is None:
+			return 0
+		self._seq += 1
+		try:
+			_write_frame(self._process.stdin, (self._seq, command, args))
+		except EnvironmentError as ex:
+			if ex.errno != errno.EPIPE:
+				raise
+			self._stopped()
+			return 0
+		self._pending[self._seq] = time.time()
+		self._metrics['max_depth'] = max(self._metrics['max_depth'], len(self._pending))
+		return self._seq
+
+	def _collect(self, wait=False, seq=0):
+		# type: (bool, int) -> None
+		"""
+		Process confirmations of the worker.
+
+		:param bool wait: block until call `seq` is confirmed or the queue is below its maximum size
+		:param int seq: sequence number of the call to wait for
+		"""
+		while self._process is not None and self._pending:
+			block = wait and (seq in self._pending or len(self._pending) >= self.MAX_QUEUE)
+			if not select.select([self._acks], [], [], None if block else 0)[0]:
+				break
+			try:
+				done, ok = _read_frame(self._acks)
+			except EOFError:
+				self._stopped()
+				break
+			self._confirm(done, ok)
+
+		if self._done and not self._records:
+			self._journal.truncate()
+			self._done = 0
+		elif self._done >= self.COMPACT_THRESHOLD and self._done >= len(self._records):
+			self._journal.rewrite([record for seq, record in self._records])
+			self._done = 0
+		if time.time() - self._metrics_written >= self.METRICS_INTERVAL:
+			self._write_metrics()
+
+	def _confirm(self, done, ok):
+		# type: (int, bool) -> None
+		"""
+		Process confirmation of the worker.
+
+		:param int done: sequence number of the processed call
+		:param bool ok: `False` if the call raised an exception
+		"""
+		latency = time.time() - self._pending.pop(done)
+		# calls are processed in order, so the records up to this one are done
+		while self._records and 0 < self._records[0][0] <= done:
+			self._records.popleft()
+			self._done += 1
+		self._metrics['processed'] += 1
+		if not ok:
+			self._metrics['failed'] += 1
+		self._latency_total += latency
+		self._metrics['latency_max'] = max(self._metrics['latency_max'], latency)
+
+	def _write_metrics(self):
+		# type: () -> None
+		"""Write queue metrics to :file:`/var/lib/univention-directory-listener/metrics/`."""
+		now = time.time()
+		self._metrics_written = now
+		self._metrics.update(
+			depth=len(self._pending),
+			latency_avg=self._latency_total / self._metrics['processed'] if self._metrics['processed'] else 0.0,
+			updated=now,
+		)
+		filename = os.path.join(METRICS_DIR, '%s.json' % (self.name,))
+		try:
+			with listener.SetUID(0):
+				if not os.path.isdir(METRICS_DIR):
+					os.makedirs(METRICS_DIR, 0o755)
+				with open(filename + '.tmp', 'w') as fd:
+					json.dump(self._metrics, fd)
+				os.rename(filename + '.tmp', filename)
+		except EnvironmentError as ex:
+			self.logger.warning('Failed to write metrics %r: %s', filename, ex)
+
+
+def worker(module_file, ack_fd):
+	# type: (str, int) -> None
+	"""
+	Load listener module and execute the calls received on stdin.
+
+	:param str module_file: file name of the listener module
+	:param int ack_fd: file descriptor to confirm processed calls
+	"""
+	name = os.path.splitext(os.path.basename(module_file))[0]
+	if six.PY3:
+		import importlib.util
+		spec = importlib.util.spec_from_file_location(name, module_file)
+		module = importlib.util.module_from_spec(spec)
+		sys.modules[name] = module
+		spec.loader.exec_module(module)
+	else:
+		import imp
+		module = imp.load_source(name, module_file)
+	callbacks = dict((command, getattr(module, command, None)) for command in COMMANDS)
+
+	stdin = sys.stdin.buffer if six.PY3 else sys.stdin
+	with os.fdopen(ack_fd, 'wb') as acks:
+		while True:
+			try:
+				seq, command, args = _read_frame(stdin)
+			except EOFError:
+				return
+			ok = True
+			callback = callbacks[command]
+			if callback is not None:
+				try:
+					callback(*args)
+				except Exception:
+					traceback.print_exc()
+					ok = False
+				finally:
+					listener.unsetuid()
+			_write_frame(acks, (seq, ok))
+
+
+def status():
+	# type: () -> None
+	"""Print queue metrics of all modules executed in worker processes."""
+	try:
+		names = sorted(os.listdir(METRICS_DIR))
+	except EnvironmentError:
+		names = []
+	print('%-32s %8s %8s %10s %8s %10s %10s  %s' % ('Module', 'Depth', 'Max', 'Processed', 'Failed', 'Avg[s]', 'Max[s]', 'Updated'))
+	for name in names:
+		if not name.endswith('.json'):
+			continue
+		with open(os.path.join(METRICS_DIR, name)) as fd:
+			metrics = json.load(fd)
+		print('%-32s %8d %8d %10d %8d %10.3f %10.3f  %s' % (
+			metrics['name'],
+			metrics['depth'],
+			metrics['max_depth'],
+			metrics['processed'],
+			metrics['failed'],
+			metrics['latency_avg'],
+			metrics['latency_max'],
+			time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(metrics['updated'])),
+		))
+
+
+def main():
+	# type: () -> None
+	parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+	subparsers = parser.add_subparsers(dest='command')
+	subparsers.required = True
+	subparsers.add_parser('status', help='show queue depth and latency of modules')
+	parser_worker = subparsers.add_parser('worker', help=argparse.SUPPRESS)
+	parser_worker.add_argument('module_file')
+	parser_worker.add_argument('ack_fd', type=int)
+	options = parser.parse_args()
+
+	if options.command == 'status':
+		status()
+	else:
+		worker(options.module_file, options.ack_fd)
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+
+from __future__ import absolute_import
+
+import time
+from collections import OrderedDict, namedtuple
+from itertools import count
+from typing import Any, Dict, List, Mapping, Optional, Sequence  # noqa F401
+
+from univention.listener.handler import ListenerModuleHandler
+from univention.listener.journal import Journal
+
+
+Change = namedtuple('Change', ['command', 'dn', 'old', 'new', 'old_dn'])
+Change.__doc__ = """
+A buffered LDAP change.
+
+`command` is one of `a` (created), `m` (modified or moved) and `d` (deleted).
+`old` is `None` for created objects, `new` is `None` for deleted objects and
+`old_dn` is the previous DN of moved objects.
+"""
+
+
+class BatchedListenerModuleHandler(ListenerModuleHandler):
+	"""
+	Listener module base class receiving changes in batches.
+
+	Subclass this and implement :py:meth:`handle_batch()` instead of
+	:py:meth:`create()`, :py:meth:`modify()` and :py:meth:`remove()`.
+
+	Changes are buffered and repeated changes of the same object are coalesced
+	into one, see :py:meth:`_coalesce()`. The batch is delivered when :py:attr:`batch_size` changes are
+	buffered, when the oldest change is older than :py:attr:`batch_timeout`
+	seconds at the time of the next change and always in :py:meth:`post_run()`.
+
+	The listener commits its transaction ID after every single change, so all
+	buffered changes are also appended to a journal file, which is only
+	truncated after :py:meth:`handle_batch()` succeeded. Changes still in the
+	journal are delivered again after a restart of the listener.
+	"""
+
+	batch_size = 100  # type: int
+	batch_timeout = 10.0  # type: float
+	journal_dir = '/var/lib/univention-directory-listener/batched'
+
+	def __init__(self, *args, **kwargs):
+		# type: (*Any, **Any) -> None
+		super(BatchedListenerModuleHandler, self).__init__(*args, **kwargs)
+		self._changes = OrderedDict()  # type: OrderedDict[Any, Change]
+		self._displaced = count()
+		self._oldest = None  # type: Optional[float]
+		assert self.config
+		self._journal = Journal(self.journal_dir, self.config.get_name())
+		self._replay_journal()
+
+	def handle_batch(self, changes):
+		# type: (List[Change]) -> None
+		"""
+		Called with a batch of changes.
+
+		When an exception is raised, the changes are kept and delivered again
+		with the next batch.
+
+		:param list changes: list of :py:class:`Change` objects in the order of the first change of each object
+		"""
+		pass
+
+	def create(self, dn, new):
+		# type: (str, Mapping[str, Sequence[bytes]]) -> None
+		self._add_change(Change('a', dn, None, new, None))
+
+	def modify(self, dn, old, new, old_dn):
+		# type: (str, Mapping[str, Sequence[bytes]], Mapping[str, Sequence[bytes]], Optional[str]) -> None
+		self._add_change(Change('m', dn, old, new, old_dn))
+
+	def remove(self, dn, old):
+		# type: (str, Mapping[str, Sequence[bytes]]) -> None
+		self._add_change(Change('d', dn, old, None, None))
+
+	def post_run(self):
+		# type: () -> None
+		"""
+		Deliver all buffered changes.
+
+		When overwriting, call :py:meth:`post_run()` of this class first.
+		"""
+		self.flush()
+
+	def clean(self):
+		# type: () -> None
+		"""
+		Discard all buffered changes on resync.
+
+		When overwriting, call :py:meth:`clean()` of this class first.
+		"""
+		self._changes.clear()
+		self._oldest = None
+		self._journal.truncate()
+
+	def flush(self):
+		# type: () -> bool
+		"""
+		Deliver all buffered changes to :py:meth:`handle_batch()`.
+
+		:return: `True` if all changes were delivered, `False` otherwise.
+		:rtype: bool
+		"""
+		if not self._changes:
+			return True
+		changes = list(self._changes.values())
+		try:
+			self.handle_batch(changes)
+		except Exception:
+			self.logger.exception('Failed to handle batch of %d changes, retrying later.', len(changes))
+			self._oldest = time.time()  # back off until batch_timeout expires again
+			return False
+		self.logger.debug('Handled batch of %d changes.', len(changes))
+		self._changes.clear()
+		self._oldest = None
+		self._journal.truncate()
+		return True
+
+	def _add_change(self, change):
+		# type: (Change) -> None
+		"""
+		Buffer change and deliver the batch if a threshold is reached.
+
+		:param Change change: the change
+		"""
+		self._journal.append(tuple(change))
+		self._coalesce(change)
+		now = time.time()
+		if self._oldest is None:
+			self._oldest = now
+		if len(self._changes) >= self.batch_size or now - self._oldest >= self.batch_timeout:
+			self.flush()
+
+	def _coalesce(self, change):
+		# type: (Change) -> None
+		"""
+		Merge change with the buffered change of the same object.
+
+		* create + delete: dropped, the object never reached the backend
+		* create + modify: create with the new attributes at the new DN
+		* modify + delete: delete at the original DN
+		* modify + modify: one modify from the original to the new DN and attributes
+		* delete + create: modify, the DN was re-used
+		* otherwise the new change replaces the buffered one
+
+		The merged change keeps the position of the first buffered change of the
+		object. A buffered delete never gets replaced by the change of another
+		object moved to or created at its DN: it is kept under a separate key.
+
+		:param Change change: the change
+		"""
+		key = change.old_dn or change.dn
+		previous = self._changes.get(key)
+		if previous is None:
+			merged = change  # type: Optional[Change]
+		elif previous.command == 'a' and change.command == 'd':
+			merged = None
+		elif previous.command == 'a':
+			merged = Change('a', change.dn, None, change.new, None)
+		elif previous.command == 'm' and change.command == 'd':
+			merged = Change('d', previous.old_dn or change.dn, previous.old, None, None)
+		elif previous.command == 'm':
+			merged = Change('m', change.dn, previous.old, change.new, previous.old_dn or change.old_dn)
+		elif previous.command == 'd' and change.command == 'a':
+			merged = Change('m', change.dn, previous.old, change.new, None)
+		else:
+			merged = change
+
+		if merged is None:
+			del self._changes[key]
+			return
+		new_key = merged.dn
+		other = self._changes.get(new_key) if new_key != key or previous is None else None
+		if other is not None:
+			if merged.command == 'd':
+				new_key = (merged.dn, next(self._displaced))
+			else:
+				self._rename(new_key, (new_key, next(self._displaced)), other)
+		if previous is None:
+			self._changes[new_key] = merged
+		else:
+			self._rename(key, new_key, merged)
+
+	def _rename(self, key, new_key, change):
+		# type: (Any, Any, Change) -> None
+		"""
+		Replace the buffered change `key` by `change` at the same position.
+
+		:param key: the key of the buffered change
+		:param new_key: the new key
+		:param Change change: the change
+		"""
+		if key == new_key:
+			self._changes[key] = change
+			return
+		self._changes = OrderedDict(
+			(new_key, change) if k == key else (k, v)
+			for k, v in self._changes.items()
+		)
+
+	def _replay_journal(self):
+		# type: () -> None
+		"""Buffer changes not yet delivered before the last restart."""
+		for record in self._journal.read():
+			self._coalesce(Change(*record))
+		self._journal.rewrite([tuple(change) for change in self._changes.values()])
+		if self._changes:
+			self.logger.info('Replaying %d changes from journal.', len(self._changes))
+			self._oldest = 0.0
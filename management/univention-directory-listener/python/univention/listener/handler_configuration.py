@@ -68,6 +68,8 @@ class ListenerModuleConfiguration(object):
 	ldap_filter = ''              # (*) LDAP filter, if matched will trigger the listener module
 	listener_module_class = None  # type: Type[ListenerModuleHandler] # (**) class that implements the module
 	attributes = []               # type: List[str] # only trigger module, if any of the listed attributes has changed
+	watched_attributes = []       # type: List[str] # only pass modifications to module, if any of the listed attributes has changed
+	parallel = False              # type: bool # run module in a separate worker process
 	# (*) required
 	# (**) will be set automatically by the handlers metaclass
 
@@ -142,6 +144,8 @@ class ListenerModuleConfiguration(object):
 			'ldap_filter',
 			'listener_module_class',
 			'name',
+			'watched_attributes',
+			'parallel',
 		]
 
 	def get_name(self):
@@ -178,6 +182,33 @@ class ListenerModuleConfiguration(object):
 		assert isinstance(self.attributes, list)
 		return self.attributes
 
+	def get_watched_attributes(self):
+		# type: () -> List[str]
+		"""
+		Modifications touching none of these attributes are dropped by the
+		:py:class:`ListenerModuleAdapter` before calling the module. Creations,
+		removals and moves are always passed. An empty list passes all
+		modifications.
+
+		:return: attributes of matching LDAP objects the module will be
+		called for if changed
+		:rtype: list(str)
+		"""
+		assert isinstance(self.watched_attributes, list)
+		return self.watched_attributes
+
+	def get_parallel(self):
+		# type: () -> bool
+		"""
+		Run the module in a separate worker process, so it does not delay
+		other modules. The order of changes is preserved. Modules depending on
+		other modules having processed a change before must not use this.
+
+		:return: whether to run the module in a worker process
+		:rtype: bool
+		"""
+		return bool(self.parallel)
+
 	def get_priority(self):
 		# type: () -> float
 		"""
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+
+from __future__ import absolute_import
+
+import os
+import time
+import pickle
+from typing import IO, Any, List, Optional, Tuple  # noqa F401
+
+import listener
+from univention.listener.handler_logging import get_logger
+
+
+class Journal(object):
+	"""
+	Append-only file of records not yet handled by a listener module.
+
+	The listener commits its transaction ID after every call of a module. A
+	module deferring the work appends the changes here first and truncates the
+	journal once the work is done, so they can be replayed after a restart.
+
+	Records are always flushed to the operating system. With a `sync_interval`,
+	they are written to disk at most that often, otherwise after every append.
+
+	:param str directory: directory for the journal files
+	:param str name: name of the listener module
+	:param float sync_interval: minimum number of seconds between two syncs
+	"""
+
+	def __init__(self, directory, name, sync_interval=0.0):
+		# type: (str, str, float) -> None
+		self.filename = os.path.join(directory, name)
+		self.logger = get_logger(name)
+		self.sync_interval = sync_interval
+		self._fd = None  # type: Optional[IO[bytes]]
+		self._synced = 0.0
+		self._unsynced = False
+
+	def append(self, record):
+		# type: (Tuple[Any, ...]) -> None
+		"""
+		Append record to journal.
+
+		:param tuple record: picklable record
+		"""
+		self._write([record], sync=time.time() - self._synced >= self.sync_interval)
+
+	def _write(self, records, sync=True):
+		# type: (List[Tuple[Any, ...]], bool) -> None
+		"""
+		Append records and write them to disk.
+
+		:param list records: picklable records
+		:param bool sync: `False` to only flush them to the operating system
+		"""
+		if self._fd is None:
+			with listener.SetUID(0):
+				directory = os.path.dirname(self.filename)
+				if not os.path.isdir(directory):
+					os.makedirs(directory, 0o700)
+				self._fd = open(self.filename, 'ab')
+		for record in records:
+			pickle.dump(record, self._fd, 2)
+		self._fd.flush()
+		self._unsynced = True
+		if sync:
+			self.sync()
+
+	def sync(self):
+		# type: () -> None
+		"""Write all appended records to disk."""
+		if self._fd is not None and self._unsynced:
+			os.fsync(self._fd.fileno())
+			self._unsynced = False
+		self._synced = time.time()
+
+	def truncate(self):
+		# type: () -> None
+		"""Discard all records."""
+		if self._fd is not None:
+			self._fd.seek(0)
+			self._fd.truncate()
+			return
+		with listener.SetUID(0):
+			if os.path.exists(self.filename):
+				os.unlink(self.filename)
+
+	def read(self):
+		# type: () -> List[Tuple[Any, ...]]
+		"""
+		Read all records.
+
+		:return: records in the order they were appended
+		:rtype: list(tuple)
+		"""
+		records = []  # type: List[Tuple[Any, ...]]
+		try:
+			with listener.SetUID(0), open(self.filename, 'rb') as fd:
+				while True:
+					try:
+						records.append(pickle.load(fd))
+					except EOFError:
+						break
+		except EnvironmentError:
+			pass
+		except Exception:
+			self.logger.exception('Ignoring unreadable rest of journal %r.', self.filename)
+		return records
+
+	def rewrite(self, records):
+		# type: (List[Tuple[Any, ...]]) -> None
+		"""
+		Replace all records.
+
+		:param list records: picklable records
+		"""
+		self.truncate()
+		if records:
+			self._write(records)
@@ -92,16 +92,18 @@ def update_schema(lo):
 	os.rename(tmp, SCHEMA)
 
 
-def create_ldif_from_master(lo, ldif_file, base, page_size):
-	# type: (uldap.access, str, str, int) -> None
+def create_ldif_from_master(lo, ldif_file, base, page_size, ldap_filter='(objectclass=*)'):
+	# type: (uldap.access, str, str, int, str) -> None
 	"""
-	create ldif file from everything from lo
+	create ldif file from everything from lo matching the filter
 	"""
 	logging.info('Fetching LDIF ...')
 	if ldif_file == '-':
 		output = sys.stdout
 	else:
-		output = io.StringIO()
+		if os.path.isfile(ldif_file):
+			os.unlink(ldif_file)
+		output = io.TextIOWrapper(gzip.open(ldif_file, 'wb'), encoding='UTF-8')
 
 	lc = SimplePagedResultsControl(
 		criticality=True,
@@ -111,7 +113,7 @@ def create_ldif_from_master(lo, ldif_file, base, page_size):
 
 	writer = ldif.LDIFWriter(output, cols=10000)
 	while True:
-		msgid = lo.lo.search_ext(base, ldap.SCOPE_SUBTREE, '(objectclass=*)', ['+', '*'], serverctrls=[lc])
+		msgid = lo.lo.search_ext(base, ldap.SCOPE_SUBTREE, ldap_filter, ['+', '*'], serverctrls=[lc])
 		rtype, rdata, rmsgid, serverctrls = lo.lo.result3(msgid)
 
 		for dn, data in rdata:
@@ -135,12 +137,8 @@ def create_ldif_from_master(lo, ldif_file, base, page_size):
 			logging.warning("Server ignores RFC 2696 Simple Paged Results Control.")
 			break
 
-	if isinstance(output, io.StringIO):
-		if os.path.isfile(ldif_file):
-			os.unlink(ldif_file)
-		with gzip.open(ldif_file, 'w') as fd:
-			fd.write(output.getvalue().encode('UTF-8'))
-	output.close()
+	if output is not sys.stdout:
+		output.close()
 
 
 def main():
@@ -150,6 +148,7 @@ def main():
 	parser.add_argument("-s", "--schema", action="store_true", help="Update LDAP schema [%s]" % SCHEMA)
 	parser.add_argument("-o", "--outfile", default=LDIF, help="File to store gzip LDIF data [%(default)s]")
 	parser.add_argument("-p", "--pagesize", type=int, default=1000, help="page size to use for LDAP paged search")
+	parser.add_argument("-f", "--filter", default='(objectclass=*)', help="LDAP filter selecting the objects [%(default)s]")
 	parser.add_argument("-v", "--verbose", action="count", help="Increase verbosity")
 	opts = parser.parse_args()
 
@@ -167,7 +166,7 @@ def main():
 		update_schema(lo)
 
 	if opts.ldif:
-		create_ldif_from_master(lo, opts.outfile, base, opts.pagesize)
+		create_ldif_from_master(lo, opts.outfile, base, opts.pagesize, opts.filter)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+#
+# Copyright 2021 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+#
+
+import sys
+
+import pytest
+from univentionunittests import import_module
+
+
+@pytest.fixture
+def listener_lib(mocker):
+	"""Replaces the modules only available inside the listener or from other packages."""
+	modules = dict((name, mocker.MagicMock()) for name in (
+		'listener',
+		'univention.admin',
+		'univention.admin.uldap',
+		'univention.config_registry',
+		'univention.debug',
+	))
+	mocker.patch.dict(sys.modules, modules)
+	return modules
+
+
+def import_listener_module(name):
+	return import_module('univention.listener.{}'.format(name), 'python/', 'univention.listener.{}'.format(name), use_installed=False)
@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+#
+# Copyright 2021 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+#
+
+import pytest
+
+from .conftest import import_listener_module
+
+OLD = {'cn': [b'a'], 'description': [b'old'], 'entryCSN': [b'1']}
+
+
+@pytest.fixture
+def handler(listener_lib):
+	return import_listener_module('handler')
+
+
+@pytest.fixture
+def adapter(handler, mocker):
+	module_handler = mocker.Mock()
+	module_handler.diff = handler.ListenerModuleHandler.diff
+	config = mocker.Mock()
+	config.get_watched_attributes.return_value = ['cn']
+	config.get_listener_module_instance.return_value = module_handler
+	return handler.ListenerModuleAdapter(config)
+
+
+def changed(**attrs):
+	new = dict(OLD, entryCSN=[b'2'])
+	new.update((key, [value]) for key, value in attrs.items())
+	return new
+
+
+def test_unwatched_modify_skipped(adapter):
+	adapter._handler('cn=a', changed(description=b'new'), OLD, 'm')
+	assert not adapter._module_handler.modify.called
+	assert adapter._skipped == 1
+
+
+def test_watched_modify(adapter):
+	new = changed(cn=b'b', description=b'new')
+	adapter._handler('cn=a', new, OLD, 'm')
+	adapter._module_handler.modify.assert_called_once_with('cn=a', OLD, new, None)
+	assert adapter._skipped == 0
+
+
+def test_no_watched_attributes(adapter):
+	adapter._watched_attributes = []
+	new = changed(description=b'new')
+	adapter._handler('cn=a', new, OLD, 'm')
+	adapter._module_handler.modify.assert_called_once_with('cn=a', OLD, new, None)
+
+
+def test_create_and_remove(adapter):
+	adapter._handler('cn=a', OLD, {}, 'a')
+	adapter._module_handler.create.assert_called_once_with('cn=a', OLD)
+	adapter._handler('cn=a', {}, OLD, 'd')
+	adapter._module_handler.remove.assert_called_once_with('cn=a', OLD)
+	assert adapter._skipped == 0
+
+
+def test_move(adapter):
+	new = changed(description=b'new')
+	adapter._handler('cn=a,dc=old', {}, OLD, 'r')
+	adapter._handler('cn=a,dc=new', new, {}, 'a')
+	adapter._module_handler.modify.assert_called_once_with('cn=a,dc=new', OLD, new, 'cn=a,dc=old')
+	assert adapter._skipped == 0
+
+
+def test_post_run_logs_skipped(adapter):
+	adapter._handler('cn=a', changed(description=b'new'), OLD, 'm')
+	adapter._handler('cn=a', changed(description=b'newer'), OLD, 'm')
+	adapter._lazy_post_run()
+	adapter._module_handler.logger.info.assert_called_once_with('Skipped %d modifications of unwatched attributes.', 2)
+	adapter._module_handler.post_run.assert_called_once_with()
+	assert adapter._skipped == 0
+	adapter._module_handler.logger.info.reset_mock()
+	adapter._lazy_post_run()
+	assert not adapter._module_handler.logger.info.called
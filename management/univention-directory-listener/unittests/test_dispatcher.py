@@ -0,0 +1,238 @@
+#!/usr/bin/python3
+#
+# Copyright 2021 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+#
+
+import errno
+import os
+import pickle
+
+import pytest
+
+from .conftest import import_listener_module
+
+
+class Module(object):
+	pass
+
+
+class FakeWorker(object):
+	"""Records the calls sent to the worker process and confirms them on request or when waited for."""
+
+	pid = 4711
+
+	def __init__(self, dispatcher):
+		self.frame = dispatcher.FRAME
+		self.calls = []  # type: list
+		self.confirmed = 0
+		self.dead = False
+		ack_r, self._ack_w = os.pipe()
+		self.acks = os.fdopen(ack_r, 'rb', 0)
+		self.stdin = self
+
+	def write(self, data):
+		if self.dead:
+			raise IOError(errno.EPIPE, 'Broken pipe')
+		self.calls.append(pickle.loads(data[self.frame.size:]))
+		if self.calls[-1][1] in ('initialize', 'clean', 'postrun'):
+			self.confirm()  # the dispatcher waits for these
+
+	def flush(self):
+		pass
+
+	def close(self):
+		pass
+
+	def wait(self):
+		return 1
+
+	def confirm(self, count=None):
+		for seq, command, args in self.calls[self.confirmed:][:count]:
+			data = pickle.dumps((seq, True), 2)
+			os.write(self._ack_w, self.frame.pack(len(data)) + data)
+			self.confirmed += 1
+
+	def die(self):
+		self.dead = True
+		os.close(self._ack_w)
+
+	def commands(self):
+		return [(command, args[0] if command == 'handler' else args) for seq, command, args in self.calls]
+
+
+@pytest.fixture
+def dispatcher(listener_lib, mocker, tmpdir):
+	dispatcher = import_listener_module('dispatcher')
+	mocker.patch.object(import_listener_module('journal'), 'get_logger')
+	mocker.patch.object(dispatcher, 'get_logger')
+	mocker.patch.object(dispatcher, 'JOURNAL_DIR', str(tmpdir / 'journal'))
+	mocker.patch.object(dispatcher, 'METRICS_DIR', str(tmpdir / 'metrics'))
+	return dispatcher
+
+
+@pytest.fixture
+def workers(dispatcher, mocker):
+	workers = []
+
+	def spawn(self):
+		worker = FakeWorker(dispatcher)
+		workers.append(worker)
+		self._process = worker
+		self._acks = worker.acks
+
+	mocker.patch.object(dispatcher.ParallelDispatcher, '_spawn', spawn)
+	return workers
+
+
+@pytest.fixture
+def parallel(dispatcher, workers, mocker):
+	config = mocker.Mock()
+	config.get_name.return_value = 'test'
+	config.get_listener_module_class.return_value = Module
+	return dispatcher.ParallelDispatcher(config)
+
+
+def change(dn):
+	return (dn, {'cn': [b'new']}, {}, 'a')
+
+
+def journal(parallel):
+	return [record[0] for record in parallel._journal.read()]
+
+
+def test_confirmed(parallel, workers):
+	parallel.setdata('basedn', 'dc=base')
+	parallel.prerun()
+	parallel.handler(*change('cn=a'))
+	parallel.handler(*change('cn=b'))
+	assert journal(parallel) == ['cn=a', 'cn=b']
+	workers[0].confirm()
+	parallel.postrun()
+	assert journal(parallel) == []
+	assert workers[0].commands() == [('setdata', ('basedn', 'dc=base')), ('prerun', ()), ('handler', 'cn=a'), ('handler', 'cn=b'), ('postrun', ())]
+
+
+def test_crash_in_handler(parallel, workers):
+	parallel.prerun()
+	parallel.handler(*change('cn=a'))
+	parallel.handler(*change('cn=b'))
+	parallel.handler(*change('cn=c'))
+	workers[0].confirm(2)  # prerun and cn=a
+	workers[0].die()
+	parallel.handler(*change('cn=d'))
+	# cn=b terminated the worker
+	assert journal(parallel) == ['cn=c', 'cn=d']
+	parallel.postrun()
+	assert workers[1].commands() == [('prerun', ()), ('handler', 'cn=c'), ('handler', 'cn=d'), ('postrun', ())]
+	assert journal(parallel) == []
+
+
+def test_crash_in_prerun(parallel, workers):
+	parallel.prerun()
+	parallel.handler(*change('cn=a'))
+	workers[0].die()
+	parallel.handler(*change('cn=b'))
+	# prerun terminated the worker, no change is dropped
+	assert journal(parallel) == ['cn=a', 'cn=b']
+	parallel.postrun()
+	assert workers[1].commands() == [('prerun', ()), ('handler', 'cn=a'), ('handler', 'cn=b'), ('postrun', ())]
+	assert journal(parallel) == []
+
+
+def test_broken_pipe(parallel, workers):
+	parallel.prerun()
+	workers[0].confirm()
+	workers[0].dead = True
+	parallel.handler(*change('cn=a'))
+	assert journal(parallel) == ['cn=a']
+	parallel.handler(*change('cn=b'))
+	assert journal(parallel) == ['cn=a', 'cn=b']
+	assert workers[1].commands() == [('prerun', ()), ('handler', 'cn=a'), ('handler', 'cn=b')]
+
+
+def test_crash_during_replay(parallel, workers, dispatcher, mocker):
+	parallel._journal.rewrite([change('cn=a'), change('cn=b'), change('cn=c')])
+	send = dispatcher.ParallelDispatcher._send
+
+	def die_before_b(self, command, args):
+		if args[:1] == ('cn=b',) and len(workers) == 1:
+			self._process.dead = True
+		return send(self, command, args)
+
+	mocker.patch.object(dispatcher.ParallelDispatcher, '_send', die_before_b)
+	parallel.prerun()
+	# the worker died before cn=b was sent: cn=a was not confirmed, nothing is lost
+	assert journal(parallel) == ['cn=a', 'cn=b', 'cn=c']
+	parallel.handler(*change('cn=d'))
+	assert [command for command in workers[1].commands() if command[0] == 'handler'] == [('handler', 'cn=a'), ('handler', 'cn=b'), ('handler', 'cn=c'), ('handler', 'cn=d')]
+	workers[1].confirm()
+	parallel.postrun()
+	assert journal(parallel) == []
+
+
+def test_replay_after_restart(parallel, workers):
+	parallel._journal.rewrite([change('cn=a'), change('cn=b')])
+	parallel.setdata('basedn', 'dc=base')
+	parallel.prerun()
+	assert workers[0].commands() == [('setdata', ('basedn', 'dc=base')), ('prerun', ()), ('handler', 'cn=a'), ('handler', 'cn=b')]
+	workers[0].confirm()
+	parallel.postrun()
+	assert journal(parallel) == []
+
+
+def test_slow_worker(parallel, workers, dispatcher, mocker):
+	mocker.patch.object(dispatcher.ParallelDispatcher, 'COMPACT_THRESHOLD', 100)
+	rewrite = mocker.spy(parallel._journal, 'rewrite')
+	parallel.prerun()
+	for i in range(3000):
+		parallel.handler(*change('cn=%d' % (i,)))
+		# the worker lags one call behind
+		workers[0].confirm(len(workers[0].calls) - workers[0].confirmed - 1)
+	assert len(parallel._records) <= 2
+	assert len(journal(parallel)) <= 2 * 100
+	assert 3000 // 100 - 1 <= rewrite.call_count <= 3000 // 100
+	workers[0].confirm()
+	parallel.postrun()
+	assert not parallel._records
+	assert journal(parallel) == []
+
+
+def test_journal_sync_interval(parallel, workers, dispatcher, mocker):
+	fsync = mocker.patch.object(import_listener_module('journal').os, 'fsync')
+	now = mocker.patch.object(import_listener_module('journal').time, 'time', return_value=1000.0)
+	parallel.prerun()
+	for i in range(10):
+		parallel.handler(*change('cn=%d' % (i,)))
+	assert fsync.call_count == 1
+	now.return_value += parallel.JOURNAL_SYNC_INTERVAL
+	parallel.handler(*change('cn=10'))
+	assert fsync.call_count == 2
+	parallel.handler(*change('cn=11'))
+	workers[0].confirm()
+	parallel.postrun()
+	assert fsync.call_count == 3
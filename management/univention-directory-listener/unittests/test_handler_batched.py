@@ -0,0 +1,185 @@
+#!/usr/bin/python3
+#
+# Copyright 2021 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+#
+
+import pytest
+
+from .conftest import import_listener_module
+
+OLD = {'cn': [b'old']}
+NEW = {'cn': [b'new']}
+
+
+@pytest.fixture
+def handler_batched(listener_lib):
+	return import_listener_module('handler_batched')
+
+
+@pytest.fixture
+def journal(listener_lib):
+	return import_listener_module('journal')
+
+
+@pytest.fixture
+def handler(handler_batched, journal, mocker, tmpdir):
+	def init(self, *args, **kwargs):
+		self.config = mocker.Mock()
+		self.config.get_name.return_value = 'test'
+		self.logger = mocker.Mock()
+
+	mocker.patch.object(handler_batched.ListenerModuleHandler, '__init__', init)
+	mocker.patch.object(journal, 'get_logger')
+
+	class Handler(handler_batched.BatchedListenerModuleHandler):
+		batch_size = 1000
+		batch_timeout = 1000.0
+		journal_dir = str(tmpdir)
+
+		def __init__(self):
+			self.batches = []
+			super(Handler, self).__init__()
+
+		def handle_batch(self, changes):
+			self.batches.append(changes)
+
+	return Handler
+
+
+def changes(handler, *calls):
+	for call in calls:
+		getattr(handler, call[0])(*call[1:])
+	return [tuple(change) for change in handler._changes.values()]
+
+
+def test_single(handler):
+	assert changes(handler(), ('create', 'cn=a', NEW)) == [('a', 'cn=a', None, NEW, None)]
+
+
+def test_create_delete(handler):
+	assert changes(handler(), ('create', 'cn=a', NEW), ('remove', 'cn=a', NEW)) == []
+
+
+def test_create_modify(handler):
+	assert changes(handler(), ('create', 'cn=a', OLD), ('modify', 'cn=b', OLD, NEW, 'cn=a')) == [('a', 'cn=b', None, NEW, None)]
+
+
+def test_modify_modify(handler):
+	assert changes(
+		handler(),
+		('modify', 'cn=b', OLD, {}, 'cn=a'),
+		('modify', 'cn=c', {}, NEW, 'cn=b'),
+	) == [('m', 'cn=c', OLD, NEW, 'cn=a')]
+
+
+def test_modify_delete(handler):
+	assert changes(handler(), ('modify', 'cn=b', OLD, NEW, 'cn=a'), ('remove', 'cn=b', NEW)) == [('d', 'cn=a', OLD, None, None)]
+
+
+def test_delete_create(handler):
+	assert changes(handler(), ('remove', 'cn=a', OLD), ('create', 'cn=a', NEW)) == [('m', 'cn=a', OLD, NEW, None)]
+
+
+def test_order_of_first_change(handler):
+	assert changes(
+		handler(),
+		('create', 'cn=a', OLD),
+		('create', 'cn=b', OLD),
+		('modify', 'cn=a', OLD, NEW, None),
+		('modify', 'cn=c', OLD, NEW, 'cn=b'),
+		('create', 'cn=d', NEW),
+		('modify', 'cn=a', NEW, OLD, None),
+	) == [
+		('a', 'cn=a', None, OLD, None),
+		('a', 'cn=c', None, NEW, None),
+		('a', 'cn=d', None, NEW, None),
+	]
+
+
+def test_move_onto_deleted(handler):
+	assert changes(
+		handler(),
+		('remove', 'cn=a', OLD),
+		('modify', 'cn=a', NEW, NEW, 'cn=b'),
+	) == [
+		('d', 'cn=a', OLD, None, None),
+		('m', 'cn=a', NEW, NEW, 'cn=b'),
+	]
+
+
+def test_move_onto_deleted_then_changed(handler):
+	h = handler()
+	assert changes(
+		h,
+		('remove', 'cn=a', OLD),
+		('modify', 'cn=a', NEW, NEW, 'cn=b'),
+		('modify', 'cn=a', NEW, OLD, None),
+	) == [
+		('d', 'cn=a', OLD, None, None),
+		('m', 'cn=a', NEW, OLD, 'cn=b'),
+	]
+
+
+def test_delete_at_reused_dn(handler):
+	assert changes(
+		handler(),
+		('modify', 'cn=b', OLD, OLD, 'cn=a'),
+		('create', 'cn=a', NEW),
+		('remove', 'cn=b', OLD),
+	) == [
+		('d', 'cn=a', OLD, None, None),
+		('a', 'cn=a', None, NEW, None),
+	]
+
+
+def test_flush(handler):
+	h = handler()
+	changes(h, ('create', 'cn=a', NEW), ('remove', 'cn=b', OLD))
+	h.post_run()
+	assert [[tuple(change) for change in batch] for batch in h.batches] == [[('a', 'cn=a', None, NEW, None), ('d', 'cn=b', OLD, None, None)]]
+	assert h._changes == {}
+	assert h._journal.read() == []
+
+
+def test_replay(handler):
+	h = handler()
+	changes(h, ('remove', 'cn=a', OLD), ('modify', 'cn=a', NEW, NEW, 'cn=b'), ('create', 'cn=c', NEW))
+	expected = [tuple(change) for change in h._changes.values()]
+	assert changes(handler()) == expected
+
+
+def test_journal_fsync(journal, mocker, tmpdir):
+	fsync = mocker.patch.object(journal.os, 'fsync')
+	mocker.patch.object(journal, 'get_logger')
+	j = journal.Journal(str(tmpdir / 'journal'), 'test')
+	j.append(('a',))
+	j.append(('b',))
+	assert fsync.call_count == 2
+	j.rewrite([('c',), ('d',)])
+	assert fsync.call_count == 3
+	assert j.read() == [('c',), ('d',)]
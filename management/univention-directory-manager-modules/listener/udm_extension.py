@@ -174,6 +174,7 @@ def handler(dn, new, old):
 			if objectclass == 'univentionUDMModule':
 				install_umcregistration(dn, new)
 				install_umcicons(dn, new)
+				write_handler_manifests()
 		finally:
 			listener.unsetuid()
 
@@ -188,6 +189,7 @@ def handler(dn, new, old):
 			if objectclass == 'univentionUDMModule':
 				remove_umcicons(dn, old)
 				remove_umcregistration(dn, old)
+				write_handler_manifests()
 		finally:
 			listener.unsetuid()
 
@@ -281,6 +283,14 @@ def install_python_file(objectclass, target_subdir, target_filename, data):
 	return not failed
 
 
+def write_handler_manifests():
+	"""Describe the installed UDM handler modules, so they can be imported on demand"""
+	for python in ('/usr/bin/python2.7', '/usr/bin/python3'):
+		if os.path.exists(python):
+			if subprocess.call([python, '-c', 'import univention.admin.modules; univention.admin.modules.write_manifest()']):
+				ud.debug(ud.LISTENER, ud.ERROR, '%s: Writing the manifest of the UDM handler modules with %s failed.' % (name, python))
+
+
 def remove_python_file(objectclass, target_subdir, target_filename):
 	"""Remove python module files"""
 	remove_python_files(PYTHON_DIR, target_subdir, target_filename)
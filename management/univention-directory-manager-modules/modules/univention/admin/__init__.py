@@ -622,8 +622,7 @@ class policiesGroup:
 
 univention.admin = sys.modules[__name__]
 from univention.admin import modules, objects, syntax, hook, mapping  # noqa
-syntax.import_syntax_files()
-hook.import_hook_files()
+modules.import_extension_files()
 
 if __name__ == '__main__':
 	prop = property('_replace')
@@ -31,6 +31,11 @@
 |UDM| allocators to allocate and lock resources for |LDAP| object creation.
 """
 
+import atexit
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set, Tuple  # noqa F401
+
 import ldap
 from ldap.filter import filter_format
 
@@ -100,8 +105,251 @@ def requestGroupSid(lo, position, gid_s, generateDomainLocalSid=False):
 	return request(lo, position, 'sid', sid)
 
 
+def _uidGidUnique():
+	return configRegistry.is_true('directory/manager/uid_gid/uniqueness', True)
+
+
+class _Reservation(object):
+	"""
+	A block of IDs reserved by this process by advancing `univentionLastUsedValue` in one atomic modify.
+	IDs already used by objects are dropped with a single range search when the block is reserved.
+	The state is guarded by :py:data:`_reservations_lock`.
+
+	SIDs are not reserved, as they are derived from the uidNumber and gidNumber.
+	"""
+
+	def __init__(self, lo, position, atype):
+		self.lo = lo
+		self.position = position
+		self.atype = atype
+		self.free = []  # type: List[int]
+		self.handed_out = set()  # type: Set[int]
+		self.last = None  # type: Optional[int]
+
+	def reserve(self, lo, ranges, size):
+		"""
+		Reserve the next `size` IDs from the ranges.
+		The free IDs may be less, if some of the reserved IDs are already used.
+
+		:returns: `False` if the ranges are exhausted.
+		:raises univention.admin.uexceptions.noObject: if the object storing `univentionLastUsedValue` is missing.
+		"""
+		self.lo = lo
+		for attempt in range(10):
+			old = _lastUsedValue(lo, self.position, self.atype)
+			start = old if old is not None else ranges[0]['first']
+			ids = []
+			for _range in ranges:
+				candidate = max(start + 1, _range['first'] + 1)
+				while candidate <= _range['last'] + 1 and len(ids) < size:
+					ids.append(candidate)
+					candidate += 1
+			if not ids:
+				return False
+			if not _swapLastUsedValue(lo, self.position, self.atype, old, ids[-1]):
+				ud.debug(ud.ADMIN, ud.INFO, 'ALLOCATE: Concurrent reservation for %r, retrying' % (self.atype,))
+				continue
+			ud.debug(ud.ADMIN, ud.INFO, 'ALLOCATE: Reserved %d IDs %r-%r for %r' % (len(ids), ids[0], ids[-1], self.atype))
+			if self.atype in ('uidNumber', 'gidNumber') and _uidGidUnique():
+				# keep the other type from handing out the same IDs
+				other = 'uidNumber' if self.atype == 'gidNumber' else 'gidNumber'
+				for other_attempt in range(10):
+					other_old = _lastUsedValue(lo, self.position, other)
+					try:
+						if (other_old or 0) >= ids[-1] or _swapLastUsedValue(lo, self.position, other, other_old, ids[-1]):
+							break
+					except univention.admin.uexceptions.noObject:
+						break
+			used = self._used(lo, ids[0], ids[-1])
+			self.free = [id_ for id_ in ids if id_ not in used]
+			self.last = ids[-1]
+			return True
+		raise univention.admin.uexceptions.noLock(_('The attribute %r could not get locked.') % (self.atype,))
+
+	def _used(self, lo, first, last):
+		"""
+		Return the IDs between `first` and `last` which are already used, e.g. by objects with manually set IDs.
+		"""
+		if self.atype in ('uidNumber', 'gidNumber') and _uidGidUnique():
+			attrs = ['uidNumber', 'gidNumber']
+		else:
+			attrs = [_type2attr[self.atype]]
+		_filter = '(|%s)' % ''.join('(&(%s>=%d)(%s<=%d))' % (attr, first, attr, last) for attr in attrs)
+		used = set()
+		for dn, values in lo.search(base=self.position.getBase(), filter=_filter, attr=attrs):
+			for attr in attrs:
+				used.update(int(value) for value in values.get(attr, []))
+		return used
+
+	def give_back(self):
+		"""
+		Return the unused IDs, if no other process reserved IDs in the meantime.
+		"""
+		if not self.free or self.last is None:
+			return
+		try:
+			if _swapLastUsedValue(self.lo, self.position, self.atype, self.last, self.free[0] - 1):
+				ud.debug(ud.ADMIN, ud.INFO, 'ALLOCATE: Returned %d unused IDs for %r' % (len(self.free), self.atype))
+		except (ldap.LDAPError, univention.admin.uexceptions.base):
+			pass
+		self.free = []
+		self.last = None
+
+
+_reservations = {}  # type: Dict[Tuple[str, str], _Reservation]
+_reservations_lock = threading.Lock()
+_batch = threading.local()
+_BATCH_RESERVATION_SIZE = 100
+
+
+def _configuredReservationSize():
+	try:
+		return int(configRegistry.get('directory/manager/allocators/reservation/size', 0))
+	except ValueError:
+		return 0
+
+
+def _reservationSize():
+	return max(_configuredReservationSize(), getattr(_batch, 'size', 0))
+
+
+@contextmanager
+def reservation(size):
+	# type: (int) -> Iterator[None]
+	"""
+	Reserve the uidNumber and gidNumber values for a batch of `size` objects in blocks.
+	A block holds at most as many IDs as configured by |UCR| or 100, so large batches reserve further blocks as needed.
+	Unused IDs are given back when leaving the context, unless reservations are enabled by |UCR|.
+
+	:param size: The number of objects to be created.
+	"""
+	previous = getattr(_batch, 'size', 0)
+	_batch.size = max(previous, min(size, _configuredReservationSize() or _BATCH_RESERVATION_SIZE))
+	try:
+		yield
+	finally:
+		_batch.size = previous
+		if not _reservationSize():
+			release_reservations()
+
+
+def _lastUsedDn(position, atype):
+	return 'cn=%s,cn=temporary,cn=univention,%s' % (ldap.dn.escape_dn_chars(atype), position.getBase())
+
+
+def _lastUsedValue(lo, position, atype):
+	value = lo.getAttr(_lastUsedDn(position, atype), 'univentionLastUsedValue')
+	return int(value[0]) if value else None
+
+
+def _swapLastUsedValue(lo, position, atype, old, new):
+	"""
+	Atomically replace `univentionLastUsedValue` if it still has the old value.
+
+	:returns: `False` if the value was changed concurrently.
+	:raises univention.admin.uexceptions.noObject: if the object storing the value is missing.
+	"""
+	dn = _lastUsedDn(position, atype)
+	ml = [(ldap.MOD_ADD, 'univentionLastUsedValue', [str(new).encode('ASCII')])]
+	if old is not None:
+		ml.insert(0, (ldap.MOD_DELETE, 'univentionLastUsedValue', [str(old).encode('ASCII')]))
+	try:
+		lo.lo.modify_ext_s(dn, ml)
+	except ldap.NO_SUCH_OBJECT:
+		raise univention.admin.uexceptions.noObject(dn)
+	except (ldap.NO_SUCH_ATTRIBUTE, ldap.TYPE_OR_VALUE_EXISTS, ldap.CONSTRAINT_VIOLATION):
+		return False
+	return True
+
+
+def _raiseLastUsedValue(lo, position, atype, value):
+	"""
+	Set `univentionLastUsedValue` to `value`, unless it is already higher, e.g. as IDs were reserved meanwhile.
+	"""
+	for attempt in range(10):
+		old = _lastUsedValue(lo, position, atype)
+		if old is not None and old >= value:
+			return
+		if _swapLastUsedValue(lo, position, atype, old, value):
+			return
+	ud.debug(ud.ADMIN, ud.WARN, 'ALLOCATE: Can not update the last used value of %r' % (atype,))
+
+
+def _acquireReserved(lo, position, atype, attr, ranges, size, scope):
+	"""
+	Hand out the next ID of the reservation of this process, reserving a new block if necessary.
+
+	Other processes using reservations never get the same IDs and processes not using reservations only allocate
+	IDs above `univentionLastUsedValue`. The ID is still locked, as objects with manually set IDs lock them as well
+	and :py:func:`confirm` and :py:func:`release` remove the lock. Locking `atype` suffices, as
+	:py:func:`acquireRange` locks both `uidNumber` and `gidNumber`.
+
+	:returns: `None` if IDs can not be reserved, as the object storing `univentionLastUsedValue` is missing.
+	"""
+	key = (position.getBase(), atype)
+	while True:
+		with _reservations_lock:
+			reservation = _reservations.get(key)
+			if reservation is None:
+				reservation = _reservations[key] = _Reservation(lo, position, atype)
+			try:
+				while not reservation.free:
+					if not reservation.reserve(lo, ranges, size):
+						raise univention.admin.uexceptions.noLock(_('The attribute %r could not get locked.') % (atype,))
+			except univention.admin.uexceptions.noObject as exc:
+				ud.debug(ud.ADMIN, ud.WARN, 'ALLOCATE: Can not reserve IDs, %s is missing' % (exc,))
+				return None
+			startID = reservation.free.pop(0)
+
+		try:
+			univention.admin.locking.lock(lo, position, atype, str(startID).encode('utf-8'), scope=scope)
+		except (univention.admin.uexceptions.noLock, univention.admin.uexceptions.objectExists):
+			ud.debug(ud.ADMIN, ud.INFO, 'ALLOCATE: Cannot Lock reserved ID %r' % startID)
+			continue
+		ud.debug(ud.ADMIN, ud.INFO, 'ALLOCATE: Return reserved ID %r' % startID)
+		with _reservations_lock:
+			reservation.handed_out.add(startID)
+		return str(startID)
+
+
+def _releaseReserved(position, atype, value, confirmed):
+	"""
+	Handle confirming or releasing an ID handed out from a reservation.
+	The lock object of the ID is removed by the caller.
+
+	:returns: `False` if the ID was not handed out from a reservation.
+	"""
+	try:
+		value = int(value)
+	except ValueError:
+		return False
+	with _reservations_lock:
+		reservation = _reservations.get((position.getBase(), atype))
+		if reservation is None or value not in reservation.handed_out:
+			return False
+		reservation.handed_out.discard(value)
+		if not confirmed and reservation.last is not None and value <= reservation.last:
+			reservation.free.insert(0, value)
+	return True
+
+
+@atexit.register
+def release_reservations():
+	"""
+	Return the unused IDs of all reservations of this process.
+	"""
+	with _reservations_lock:
+		for reservation in _reservations.values():
+			reservation.give_back()
+
+
 def acquireRange(lo, position, atype, attr, ranges, scope='base'):
 	ud.debug(ud.ADMIN, ud.INFO, 'ALLOCATE: Start allocation for type = %r' % atype)
+	size = _reservationSize()
+	if size > 0:
+		startID = _acquireReserved(lo, position, atype, attr, ranges, size, scope)
+		if startID is not None:
+			return startID
 	startID = lo.getAttr('cn=%s,cn=temporary,cn=univention,%s' % (ldap.dn.escape_dn_chars(atype), position.getBase()), 'univentionLastUsedValue')
 
 	ud.debug(ud.ADMIN, ud.INFO, 'ALLOCATE: Start ID = %r' % startID)
@@ -210,12 +458,16 @@ def request(lo, position, type, value=None):
 
 
 def confirm(lo, position, type, value, updateLastUsedValue=True):
-	if type in ('uidNumber', 'gidNumber') and updateLastUsedValue:
-		lo.modify('cn=%s,cn=temporary,cn=univention,%s' % (ldap.dn.escape_dn_chars(type), position.getBase()), [('univentionLastUsedValue', b'1', value.encode('utf-8'))])
+	if type in ('uidNumber', 'gidNumber') and _releaseReserved(position, type, value, True):
+		pass  # univentionLastUsedValue is already beyond the reserved IDs
+	elif type in ('uidNumber', 'gidNumber') and updateLastUsedValue:
+		_raiseLastUsedValue(lo, position, type, int(value))
 	elif type == 'cn-uid-position':
 		return
 	univention.admin.locking.unlock(lo, position, type, value.encode('utf-8'), _type2scope[type])
 
 
 def release(lo, position, type, value):
+	if type in ('uidNumber', 'gidNumber'):
+		_releaseReserved(position, type, value, False)
 	univention.admin.locking.unlock(lo, position, type, value.encode('utf-8'), _type2scope[type])
@@ -1750,7 +1750,7 @@ class simpleLdap(object):
 		return containers
 
 	@classmethod
-	def lookup(cls, co, lo, filter_s, base='', superordinate=None, scope='sub', unique=False, required=False, timeout=-1, sizelimit=0, serverctrls=None, response=None):  # type: (None, univention.admin.uldap.access, str, str, Optional[str], str, bool, bool, int, int, Optional[List], Optional[Dict]) -> List[simpleLdap]
+	def lookup(cls, co, lo, filter_s, base='', superordinate=None, scope='sub', unique=False, required=False, timeout=-1, sizelimit=0, serverctrls=None, response=None, properties=None):  # type: (None, univention.admin.uldap.access, str, str, Optional[str], str, bool, bool, int, int, Optional[List], Optional[Dict], Optional[Iterable[str]]) -> List[simpleLdap]
 		"""
 		Perform a LDAP search and return a list of instances.
 
@@ -1767,6 +1767,8 @@ class simpleLdap(object):
 		:param serverctrls: a list of :py:class:`ldap.controls.LDAPControl` instances sent to the server along with the LDAP request.
 		:type serverctrls: list[ldap.controls.LDAPControl]
 		:param dict response: An optional dictionary to receive the server controls of the result.
+		:param properties: Only the given properties are needed, so only the |LDAP| attributes mapped to them are requested.
+		:type properties: list[str]
 		:return: A list of UDM objects.
 		:rtype: list[simpleLdap]
 		"""
@@ -1774,7 +1776,7 @@ class simpleLdap(object):
 		if superordinate:
 			filter_s = cls.lookup_filter_superordinate(filter_s, superordinate)
 		filter_str = six.text_type(filter_s or u'')
-		attr = cls._ldap_attributes()
+		attr = cls._ldap_attributes_for_properties(properties) if properties is not None else cls._ldap_attributes()
 		result = []
 		for dn, attrs in lo.search(filter_str, base, scope, attr, unique, required, timeout, sizelimit, serverctrls=serverctrls, response=response):
 			try:
@@ -1880,6 +1882,25 @@ class simpleLdap(object):
 	def _ldap_attributes(cls):
 		return []
 
+	@classmethod
+	def _ldap_attributes_for_properties(cls, properties):  # type: (Iterable[str]) -> List[str]
+		"""
+		Return the |LDAP| attributes required to load the given properties.
+		Falls back to :py:meth:`_ldap_attributes` if a property is not mapped to an |LDAP| attribute.
+
+		:param properties: The names of the properties.
+		"""
+		mapping = univention.admin.modules.get_module(cls.module).mapping
+		attr = {u'objectClass', u'univentionObjectType', u'univentionObjectFlag'}
+		for name in properties:
+			try:
+				if name == '*' or not mapping.shouldMap(name):
+					return cls._ldap_attributes()
+			except KeyError:
+				return cls._ldap_attributes()
+			attr.add(mapping.mapName(name))
+		return sorted(attr)
+
 
 class simpleComputer(simpleLdap):
 
@@ -216,10 +216,13 @@ class License(object):
 		return True
 
 	def modifyOptions(self, mod):
+		if mod in licenses.modules and licenses.modules[mod].options(self.types):
+			self._modifyOptions(mod, univention.admin.modules.modules[mod])
+
+	def _modifyOptions(self, mod, module):
 		if mod in licenses.modules:
 			opts = licenses.modules[mod].options(self.types)
 			if opts:
-				module = univention.admin.modules.modules[mod]
 				if module and hasattr(module, 'options'):
 					ud.debug(ud.ADMIN, ud.INFO, 'modifyOptions: %r' % (opts,))
 					for opt, val in opts:
@@ -230,40 +233,42 @@ class License(object):
 						ud.debug(ud.ADMIN, ud.INFO, 'modifyOption: %s, %d, %d' % (opt, module.options[opt].disabled, module.options[opt].default))
 
 	def checkModules(self):
-		deleted_mods = []
-		for mod in univention.admin.modules.modules.keys():
+		# the license is checked against the module names of the manifest only,
+		# the handler modules are adjusted by _checkModule() once they are imported
+		for mod in list(univention.admin.modules.modules.keys()):
 			# remove module if valid license is missing
 			if self.isValidFor(mod):
 				ud.debug(ud.ADMIN, ud.INFO, 'update: License is valid for module %s!!' % (mod,))
-				# check module options according to given license type
-				self.modifyOptions(mod)
 			else:
 				ud.debug(ud.ADMIN, ud.INFO, 'update: License is NOT valid for module %s!!' % (mod,))
 				del univention.admin.modules.modules[mod]
-				deleted_mods.append(mod)
+
+		univention.admin.modules.add_import_hook(self._checkModule)
+
+	def _checkModule(self, name, mod):
+		# check module options according to given license type
+		self._modifyOptions(name, mod)
 
 		# remove child modules that were deleted because of an invalid license
-		for name, mod in univention.admin.modules.modules.items():
-			if hasattr(mod, 'childmodules'):
-				new = []
-				for child in mod.childmodules:
-					if child in deleted_mods:
-						continue
-					new.append(child)
-				mod.childmodules = new
+		if hasattr(mod, 'childmodules'):
+			new = []
+			for child in mod.childmodules:
+				if not self.isValidFor(child):
+					continue
+				new.append(child)
+			mod.childmodules = new
 
 		# remove operations for adding or modifying if license is expired
 		if self._expired:
-			for name, mod in univention.admin.modules.modules.items():
-				if hasattr(mod, 'operations'):
-					try:
-						mod.operations.remove('add')
-					except Exception:
-						pass
-					try:
-						mod.operations.remove('edit')
-					except Exception:
-						pass
+			if hasattr(mod, 'operations'):
+				try:
+					mod.operations.remove('add')
+				except Exception:
+					pass
+				try:
+					mod.operations.remove('edit')
+				except Exception:
+					pass
 
 	def __cmp(self, x, y):
 		"""
@@ -38,8 +38,11 @@ import os
 import sys
 import copy
 import locale
+import json
+import time
 import importlib
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Text, Tuple, Union  # noqa F401
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Text, Tuple, Union  # noqa F401
 
 import six
 import ldap
@@ -55,6 +58,10 @@ import univention.admin.hook
 from univention.admin import localization
 from univention.admin.layout import Tab, Group, ILayoutElement
 from univention.admin._ucr import configRegistry
+try:
+	from collections.abc import MutableMapping  # Python 3.3+
+except ImportError:
+	from collections import MutableMapping
 
 try:
 	from typing_extensions import Protocol
@@ -102,54 +109,323 @@ except ImportError:
 translation = localization.translation('univention/admin')
 _ = translation.translate
 
-modules = {}  # type: Dict[str, UdmModule]
+
+class _HandlerModules(MutableMapping):
+	"""
+	Mapping from module name to Python module.
+
+	The handler modules are described by a manifest and only imported on first access.
+	"""
+
+	def __init__(self, manifest=(), loaded=None):
+		# type: (Iterable[Dict[str, Any]], Optional[Dict[str, UdmModule]]) -> None
+		self.manifest = OrderedDict((entry['module'], entry) for entry in manifest)  # type: OrderedDict[str, Dict[str, Any]]
+		self._loaded = dict(loaded or {})  # type: Dict[str, UdmModule]
+
+	def __getitem__(self, name):
+		# type: (str) -> UdmModule
+		try:
+			return self._loaded[name]
+		except KeyError:
+			package = self.manifest[name]['package']
+		ud.debug(ud.ADMIN, ud.INFO, 'admin.modules: importing "%s"' % (package,))
+		m = self._loaded[name] = _import_handler(package)
+		for hook in _import_hooks:
+			hook(name, m)
+		return m
+
+	def __setitem__(self, name, module):
+		# type: (str, UdmModule) -> None
+		self.manifest[name] = _manifest_entry(module.__name__[len('univention.admin.handlers.'):], module)
+		self._loaded[name] = module
+
+	def __delitem__(self, name):
+		# type: (str) -> None
+		del self.manifest[name]
+		self._loaded.pop(name, None)
+
+	def __iter__(self):
+		# type: () -> Iterator[str]
+		return iter(self.manifest)
+
+	def __len__(self):
+		# type: () -> int
+		return len(self.manifest)
+
+	def __contains__(self, name):
+		# type: (object) -> bool
+		return name in self.manifest
+
+	def loaded(self, name):
+		# type: (str) -> Optional[UdmModule]
+		"""
+		Return the module only if it is already imported.
+
+		:param name: The name of the module.
+		"""
+		return self._loaded.get(name)
+
+	def loaded_items(self):
+		# type: () -> List[Tuple[str, UdmModule]]
+		"""
+		Return the names and modules of all modules already imported.
+		"""
+		return [(name, module) for name, module in self._loaded.items() if name in self.manifest]
+
+
+modules = _HandlerModules()
 """Mapping from module name to Python module."""
 _superordinates = set()  # type: Set[str]
 """List of all module names (strings) that are _superordinates."""
 containers = []  # type: List[UdmModule]
+_identify_index = None  # type: Optional[Tuple[Dict[str, List[Tuple[int, FrozenSet[str], str]]], List[Tuple[int, str]]]]
+"""Mapping from lower case object class to the modules requiring it, and the modules which need to be asked. Built on first use by :py:func:`identify`."""
+_MANIFEST = '/var/cache/univention-directory-manager-modules/handlers-python%d.json' % (sys.version_info[0],)
+"""File describing the handler modules, so they can be imported on demand. Written by :py:func:`write_manifest` when the package or an |UDM| extension is installed."""
+_import_hooks = []  # type: List[Callable[[str, UdmModule], None]]
+"""Functions called with the name and the Python module of each handler module imported on demand."""
+_extension_files = None  # type: Optional[List[Tuple[str, int, int]]]
+"""The files in :file:`syntax.d` and :file:`hooks.d` when they were imported last."""
+
+
+class _ExtensionCache(object):
+	"""
+	Cache of the |LDAP| objects defining extended options, extended attributes and syntaxes.
+
+	Instead of searching for the extensions of each module in every call of
+	:py:func:`init`, all extension objects are fetched at once and shared by
+	all modules. Whether the cache is still valid is checked by a single
+	search returning only the `entryCSN` of the extension objects, at most
+	once every :py:attr:`TTL` seconds.
+	The objects visible to a bind identity depend on the |ACL|\ s, so they
+	are cached separately for each identity and only in memory.
+	"""
+
+	FILTER = '(|(objectClass=univentionUDMOption)(objectClass=univentionUDMProperty)(objectClass=univentionSyntax))'
+	TTL = 10.0
+
+	def __init__(self):
+		# type: () -> None
+		self.token = None  # type: Optional[Tuple[str, str, int, bytes]]
+		self.objects = []  # type: List[Tuple[str, Dict[str, List[bytes]]]]
+		self._identities = {}  # type: Dict[Tuple[str, str], Tuple[float, Tuple[str, str, int, bytes], List[Tuple[str, Dict[str, List[bytes]]]]]]
+
+	def refresh(self, lo, position, force=False):
+		# type: (univention.admin.uldap.access, univention.admin.uldap.position, bool) -> None
+		"""
+		Make sure the cached extension objects of the bind identity are up to date.
+
+		:param lo: |LDAP| connection.
+		:param position: |UDM| position instance.
+		:param force: Check the validity even if the last check was less than :py:attr:`TTL` seconds ago.
+		"""
+		base = position.getDomainConfigBase()
+		key = (lo.binddn or '', base)
+		now = time.time()
+		checked, token, objects = self._identities.get(key, (0.0, None, []))
+		if force or now - checked >= self.TTL:
+			csns = [attrs.get('entryCSN', [b''])[0] for dn, attrs in lo.search(base=base, filter=self.FILTER, attr=['entryCSN'])]
+			current = (key[0], base, len(csns), max(csns or [b'']))
+			if current != token:
+				objects = lo.search(base=base, filter=self.FILTER)
+				token = current
+			self._identities[key] = (now, token, objects)
+		self.token, self.objects = token, objects
+
+	def search(self, object_class, module_attribute, module_names, extra=None):
+		# type: (bytes, str, List[str], Optional[Tuple[str, bytes]]) -> List[Tuple[str, Dict[str, List[bytes]]]]
+		"""
+		Return the cached objects of an object class which apply to one of the modules.
+
+		:param object_class: The object class of the extension objects.
+		:param module_attribute: The attribute holding the module names.
+		:param module_names: The names of the modules.
+		:param extra: An optional pair of attribute name and value which must match, too.
+		"""
+		module_names = {m.lower().encode('UTF-8') for m in module_names}
+		return [
+			(dn, attrs) for dn, attrs in self.objects
+			if object_class.lower() in {oc.lower() for oc in attrs.get('objectClass', [])}
+			and module_names & {m.lower() for m in attrs.get(module_attribute, [])}
+			and (extra is None or extra[1] in attrs.get(extra[0], []))
+		]
+
+	def has_syntax(self, syntax_name):
+		# type: (str) -> bool
+		"""
+		Check if a `settings/syntax` object with the name exists.
+
+		:param syntax_name: The name of the syntax.
+		"""
+		name = syntax_name.lower().encode('UTF-8')
+		return any(
+			b'univentionsyntax' in {oc.lower() for oc in attrs.get('objectClass', [])} and name in {cn.lower() for cn in attrs.get('cn', [])}
+			for dn, attrs in self.objects
+		)
+
+
+_extension_cache = _ExtensionCache()
 
 
 def update():
 	# type: () -> None
 	"""
 	Scan file system and update internal list of |UDM| handler modules.
+
+	The handler modules are only imported when the manifest describing them is missing or outdated.
+	Otherwise they are imported on first access through :py:data:`modules`.
 	"""
-	global modules, _superordinates
-	_modules = {}  # type: Dict[str, UdmModule]
-	superordinates = set()  # type: Set[str]
+	global modules, _superordinates, _identify_index
 
 	# since last update(), syntax.d and hooks.d may have changed (Bug #31154)
+	import_extension_files()
+
+	packages = _handler_files()
+	loaded = {}  # type: Dict[str, UdmModule]
+	manifest = _load_manifest(packages)
+	if manifest is None:
+		manifest, loaded = _build_manifest(packages)
+		for name, m in loaded.items():
+			for hook in _import_hooks:
+				hook(name, m)
+
+	modules = _HandlerModules(manifest, loaded)
+	_superordinates = {superordinate for entry in manifest for superordinate in entry['superordinates']}
+	_identify_index = None
+	containers[:] = [modules[entry['module']] for entry in manifest if entry['container']]
+
+	# since last update(), syntax.d may have new choices
+	# put here as one syntax wants to provide all modules
+	univention.admin.syntax.update_choices()
+
+
+def import_extension_files():
+	# type: () -> None
+	"""
+	Load the files from :file:`syntax.d` and :file:`hooks.d` if they changed since they were loaded last.
+	"""
+	global _extension_files
+	files = []  # type: List[Tuple[str, int, int]]
+	for dir_ in sys.path:
+		for subdir in ('univention/admin/syntax.d/', 'univention/admin/hooks.d/'):
+			path = os.path.join(dir_, subdir)
+			if os.path.isdir(path):
+				for fn in os.listdir(path):
+					if fn.endswith('.py'):
+						st = os.stat(os.path.join(path, fn))
+						files.append((os.path.join(path, fn), int(st.st_mtime), st.st_size))
+	if files == _extension_files:
+		return
 	univention.admin.syntax.import_syntax_files()
 	univention.admin.hook.import_hook_files()
+	_extension_files = files
 
-	def _walk(root, dir, files):
-		# type: (str, str, List[str]) -> None
-		for file in files:
-			if not file.endswith('.py') or file.startswith('__'):
-				continue
-			package = os.path.join(dir, file)[len(root) + 1:-len('.py')]
-			ud.debug(ud.ADMIN, ud.INFO, 'admin.modules.update: importing "%s"' % (package,))
-			modulepackage = '.'.join(package.split(os.path.sep))
-			m = importlib.import_module('univention.admin.handlers.%s' % (modulepackage,))  # type: Any
-			m.initialized = False
-			if not hasattr(m, 'module'):
-				ud.debug(ud.ADMIN, ud.ERROR, 'admin.modules.update: attribute "module" is missing in module %r' % (modulepackage,))
-				continue
-			_modules[m.module] = m
-			if isContainer(m):
-				containers.append(m)
 
-			superordinates.update(superordinate_names(m))
+def add_import_hook(hook):
+	# type: (Callable[[str, UdmModule], None]) -> None
+	"""
+	Register a function to be called for each handler module when it is imported.
+	It is called immediately for the modules already imported.
+
+	:param hook: Function called with the name and the Python module.
+	"""
+	if hook not in _import_hooks:
+		_import_hooks.append(hook)
+	for name, module in modules.loaded_items():
+		hook(name, module)
+
+
+def write_manifest():
+	# type: () -> None
+	"""
+	Import all handler modules and write the manifest describing them.
+	Called when the package or an |UDM| extension is installed.
+	"""
+	import_extension_files()
+	packages = _handler_files()
+	manifest, loaded = _build_manifest(packages)
+	_save_manifest(packages, manifest)
 
+
+def _handler_files():
+	# type: () -> List[Tuple[str, int, int]]
+	packages = []  # type: List[Tuple[str, int, int]]
 	for root in univention.admin.handlers.__path__:  # type: ignore
 		for w_root, w_dirs, w_files in os.walk(root):
-			_walk(root, w_root, w_files)
-	modules = _modules
-	_superordinates = superordinates
-
-	# since last update(), syntax.d may have new choices
-	# put here as one syntax wants to provide all modules
-	univention.admin.syntax.update_choices()
+			for file in w_files:
+				if not file.endswith('.py') or file.startswith('__'):
+					continue
+				filename = os.path.join(w_root, file)
+				package = '.'.join(filename[len(root) + 1:-len('.py')].split(os.path.sep))
+				st = os.stat(filename)
+				packages.append((package, int(st.st_mtime), st.st_size))
+	packages.sort()
+	return packages
+
+
+def _build_manifest(packages):
+	# type: (List[Tuple[str, int, int]]) -> Tuple[List[Dict[str, Any]], Dict[str, UdmModule]]
+	manifest = []  # type: List[Dict[str, Any]]
+	loaded = {}  # type: Dict[str, UdmModule]
+	for package, mtime, size in packages:
+		ud.debug(ud.ADMIN, ud.INFO, 'admin.modules.update: importing "%s"' % (package,))
+		m = _import_handler(package)
+		if not hasattr(m, 'module'):
+			ud.debug(ud.ADMIN, ud.ERROR, 'admin.modules.update: attribute "module" is missing in module %r' % (package,))
+			continue
+		loaded[m.module] = m
+		manifest.append(_manifest_entry(package, m))
+	return manifest, loaded
+
+
+def _import_handler(package):
+	# type: (str) -> Any
+	m = importlib.import_module('univention.admin.handlers.%s' % (package,))  # type: Any
+	m.initialized = False
+	return m
+
+
+def _manifest_entry(package, module):
+	# type: (str, UdmModule) -> Dict[str, Any]
+	object_classes = _identify_object_classes(module)
+	return {
+		'module': module.module,
+		'package': package,
+		'superordinates': superordinate_names(module),
+		'container': isContainer(module),
+		'childs': bool(getattr(module, 'childs', False)),
+		'object_classes': sorted(object_classes) if object_classes is not None else None,
+	}
+
+
+def _load_manifest(packages):
+	# type: (List[Tuple[str, int, int]]) -> Optional[List[Dict[str, Any]]]
+	try:
+		with open(_MANIFEST) as fd:
+			data = json.load(fd)
+	except (EnvironmentError, ValueError):
+		ud.debug(ud.ADMIN, ud.WARN, 'admin.modules.update: %s is missing, importing all modules' % (_MANIFEST,))
+		return None
+	if [tuple(package) for package in data.get('packages', [])] != packages:
+		ud.debug(ud.ADMIN, ud.WARN, 'admin.modules.update: %s is outdated, importing all modules' % (_MANIFEST,))
+		return None
+	return data['modules']
+
+
+def _save_manifest(packages, manifest):
+	# type: (List[Tuple[str, int, int]], List[Dict[str, Any]]) -> None
+	tmp = '%s.%d' % (_MANIFEST, os.getpid())
+	try:
+		with open(tmp, 'w') as fd:
+			json.dump({'packages': packages, 'modules': manifest}, fd)
+		os.rename(tmp, _MANIFEST)
+	except EnvironmentError as exc:
+		ud.debug(ud.ADMIN, ud.ERROR, 'admin.modules.write_manifest: could not store %s: %s' % (_MANIFEST, exc))
+		try:
+			os.unlink(tmp)
+		except EnvironmentError:
+			pass
+		raise
 
 
 def get(module):
@@ -184,6 +460,25 @@ def get_module(module):
 	return get(module)
 
 
+def _load_ldap_search_syntaxes(lo, module):
+	# type: (univention.admin.uldap.access, UdmModule) -> None
+	"""
+	Load the properties with the syntax class `LDAP_Search` through the connection.
+
+	:param lo: |LDAP| connection.
+	:param module: |UDM| handler module.
+	"""
+	for pname, prop in module.property_descriptions.items():
+		if prop.syntax.name == 'LDAP_Search':
+			prop.syntax._load(lo)
+			if prop.syntax.viewonly:
+				module.mapping.unregister(pname, False)
+		elif univention.admin.syntax.is_syntax(prop.syntax, univention.admin.syntax.complex) and hasattr(prop.syntax, 'subsyntaxes'):
+			for text, subsyn in prop.syntax.subsyntaxes:
+				if subsyn.name == 'LDAP_Search':
+					subsyn._load(lo)
+
+
 def init(lo, position, module, template_object=None, force_reload=False):
 	# type: (univention.admin.uldap.access, univention.admin.uldap.position, UdmModule, univention.admin.handlers.simpleLdap, bool) -> None
 	"""
@@ -195,11 +490,22 @@ def init(lo, position, module, template_object=None, force_reload=False):
 	:param template_object: Reference to a instance, from which the default values are used.
 	:param force_reload: With `True` force Python to reload the module from the file system.
 	"""
+	global _identify_index
 	# you better do a reload if init is called a second time
 	# especially because update_extended_attributes
 	# called twice will have side-effects
 	if force_reload:
 		reload_module(module)  # type: ignore
+
+	# nothing to do if neither the extensions nor the UCR overwrites changed since the last call
+	_extension_cache.refresh(lo, position, force=force_reload)
+	ucr_prefix = univention.admin.ucr_property_prefix % (name(module),)
+	init_key = (_extension_cache.token, sorted(item for item in configRegistry.items() if item[0].startswith(ucr_prefix)))
+	if not force_reload and not template_object and getattr(module, 'initialized', False) and getattr(module, '_init_key', None) == init_key:
+		ud.debug(ud.ADMIN, ud.INFO, 'modules_init: %s is up to date' % (name(module),))
+		_load_ldap_search_syntaxes(lo, module)
+		return
+	module._init_key = None if template_object else init_key
 	# reset property descriptions to defaults if possible
 	if hasattr(module, 'default_property_descriptions'):
 		module.property_descriptions = copy.deepcopy(module.default_property_descriptions)
@@ -209,19 +515,14 @@ def init(lo, position, module, template_object=None, force_reload=False):
 	univention.admin.ucr_overwrite_properties(module, lo)
 
 	# check for properties with the syntax class LDAP_Search
-	for pname, prop in module.property_descriptions.items():
-		if prop.syntax.name == 'LDAP_Search':
-			prop.syntax._load(lo)
-			if prop.syntax.viewonly:
-				module.mapping.unregister(pname, False)
-		elif univention.admin.syntax.is_syntax(prop.syntax, univention.admin.syntax.complex) and hasattr(prop.syntax, 'subsyntaxes'):
-			for text, subsyn in prop.syntax.subsyntaxes:
-				if subsyn.name == 'LDAP_Search':
-					subsyn._load(lo)
+	_load_ldap_search_syntaxes(lo, module)
 
 	# add new properties
-	update_extended_options(lo, module, position)
-	update_extended_attributes(lo, module, position)
+	update_extended_options(lo, module, position, _extension_cache)
+	update_extended_attributes(lo, module, position, _extension_cache)
+
+	# the required object classes may have changed
+	_identify_index = None
 
 	# get defaults from template
 	if template_object:
@@ -271,22 +572,30 @@ def init(lo, position, module, template_object=None, force_reload=False):
 	module.initialized = True
 
 
-def update_extended_options(lo, module, position):
-	# type: (univention.admin.uldap.access, UdmModule, univention.admin.uldap.position) -> None
+def update_extended_options(lo, module, position, cache=None):
+	# type: (univention.admin.uldap.access, UdmModule, univention.admin.uldap.position, Optional[_ExtensionCache]) -> None
 	"""
 	Overwrite options defined via |LDAP|.
+
+	:param cache: Use the extension objects from this cache instead of searching |LDAP|.
 	"""
 
 	# get current language
 	lang = locale.getlocale(locale.LC_MESSAGES)[0]
 	ud.debug(ud.ADMIN, ud.INFO, 'modules update_extended_options: LANG=%s' % lang)
 
-	module_filter = filter_format('(univentionUDMOptionModule=%s)', [name(module)])
+	module_names = [name(module)]
 	if name(module) == 'settings/usertemplate':
-		module_filter = '(|(univentionUDMOptionModule=users/user)%s)' % (module_filter,)
+		module_names.append('users/user')
+
+	if cache is not None:
+		objects = cache.search(b'univentionUDMOption', 'univentionUDMOptionModule', module_names)
+	else:
+		module_filter = '(|%s)' % ''.join(filter_format('(univentionUDMOptionModule=%s)', [module_name]) for module_name in module_names)
+		objects = lo.search(base=position.getDomainConfigBase(), filter='(&(objectClass=univentionUDMOption)%s)' % (module_filter,))
 
 	# append UDM extended options
-	for dn, attrs in lo.search(base=position.getDomainConfigBase(), filter='(&(objectClass=univentionUDMOption)%s)' % (module_filter,)):
+	for dn, attrs in objects:
 		oname = attrs['cn'][0].decode('UTF-8', 'replace')
 		shortdesc = _get_translation(lang, attrs, 'univentionUDMOptionTranslationShortDescription;entry-%s', 'univentionUDMOptionShortDescription')
 		longdesc = _get_translation(lang, attrs, 'univentionUDMOptionTranslationLongDescription;entry-%s', 'univentionUDMOptionLongDescription')
@@ -376,10 +685,12 @@ class EA_Layout(dict):
 		return hash((self.groupName, self.position))
 
 
-def update_extended_attributes(lo, module, position):
-	# type: (univention.admin.uldap.access, UdmModule, univention.admin.uldap.position) -> None
+def update_extended_attributes(lo, module, position, cache=None):
+	# type: (univention.admin.uldap.access, UdmModule, univention.admin.uldap.position, Optional[_ExtensionCache]) -> None
 	"""
 	Load extended attribute from |LDAP| and modify |UDM| handler.
+
+	:param cache: Use the extension objects from this cache instead of searching |LDAP|.
 	"""
 	# add list of tabnames created by extended attributes
 	if not hasattr(module, 'extended_attribute_tabnames'):
@@ -390,11 +701,17 @@ def update_extended_attributes(lo, module, position):
 	overwriteTabList = []  # type: List[str]
 	module.extended_udm_attributes = []
 
-	module_filter = filter_format('(univentionUDMPropertyModule=%s)', [name(module)])
+	module_names = [name(module)]
 	if name(module) == 'settings/usertemplate':
-		module_filter = '(|(univentionUDMPropertyModule=users/user)%s)' % (module_filter,)
+		module_names.append('users/user')
+
+	if cache is not None:
+		objects = cache.search(b'univentionUDMProperty', 'univentionUDMPropertyModule', module_names, ('univentionUDMPropertyVersion', b'2'))
+	else:
+		module_filter = '(|%s)' % ''.join(filter_format('(univentionUDMPropertyModule=%s)', [module_name]) for module_name in module_names)
+		objects = lo.search(base=position.getDomainConfigBase(), filter='(&(objectClass=univentionUDMProperty)%s(univentionUDMPropertyVersion=2))' % (module_filter,))
 
-	for dn, attrs in lo.search(base=position.getDomainConfigBase(), filter='(&(objectClass=univentionUDMProperty)%s(univentionUDMPropertyVersion=2))' % (module_filter,)):
+	for dn, attrs in objects:
 		# get CLI name
 		pname = attrs['univentionUDMPropertyCLIName'][0].decode('UTF-8', 'replace')
 		object_class = attrs.get('univentionUDMPropertyObjectClass', [])[0].decode('UTF-8', 'replace')
@@ -406,7 +723,7 @@ def update_extended_attributes(lo, module, position):
 		if propertySyntaxString and hasattr(univention.admin.syntax, propertySyntaxString):
 			propertySyntax = getattr(univention.admin.syntax, propertySyntaxString)
 		else:
-			if lo.search(filter=filter_format(univention.admin.syntax.LDAP_Search.FILTER_PATTERN, [propertySyntaxString])):
+			if (cache is not None and cache.has_syntax(propertySyntaxString)) or lo.search(filter=filter_format(univention.admin.syntax.LDAP_Search.FILTER_PATTERN, [propertySyntaxString])):
 				propertySyntax = univention.admin.syntax.LDAP_Search(propertySyntaxString)
 			else:
 				propertySyntax = univention.admin.syntax.string()
@@ -668,18 +985,30 @@ def identify(dn, attr, module_name='', canonical=0, module_base=None):
 	:param module_base: Optional string the module names must start with.
 	:returns: the list of |UDM| modules.
 	"""
+	global _identify_index
 	res = [m for m in (
 		modules.get(mt.decode('ASCII', 'replace')) for mt in attr.get('univentionObjectType', [])
 	) if m]
 	if not res:
-		for name, module in modules.items():
+		if _identify_index is None:
+			_identify_index = _build_identify_index()
+		index, others = _identify_index
+
+		ocs = {oc.decode('utf-8').lower() for oc in attr.get('objectClass', [])}
+		candidates = [(i, name, False) for i, name in others]
+		for oc in ocs:
+			candidates.extend((i, name, True) for i, required, name in index.get(oc, ()) if required <= ocs)
+
+		for i, name, identified in sorted(candidates, key=lambda candidate: candidate[0]):
 			if module_base is not None and not name.startswith(module_base):
 				continue
-			if not hasattr(module, 'identify'):
+			if module_name and module_name != name:
+				continue
+			module = modules[name]
+			if not identified and not hasattr(module, 'identify'):
 				ud.debug(ud.ADMIN, ud.INFO, 'module %s does not provide identify' % module)
 				continue
-
-			if (not module_name or module_name == module.module) and module.identify(dn, attr):
+			if identified or module.identify(dn, attr):
 				res.append(module)
 	if not res:
 		ud.debug(ud.ADMIN, ud.INFO, 'object could not be identified')
@@ -688,6 +1017,44 @@ def identify(dn, attr, module_name='', canonical=0, module_base=None):
 	return res
 
 
+def _build_identify_index():
+	# type: () -> Tuple[Dict[str, List[Tuple[int, FrozenSet[str], str]]], List[Tuple[int, str]]]
+	"""
+	Index the modules using the generic :py:meth:`univention.admin.handlers.simpleLdap.identify` by their required object classes.
+	All other modules must still be asked by calling their `identify()` function.
+	Modules not imported yet are indexed by their manifest entry.
+	"""
+	index = {}  # type: Dict[str, List[Tuple[int, FrozenSet[str], str]]]
+	others = []  # type: List[Tuple[int, str]]
+	for i, name in enumerate(modules):
+		module = modules.loaded(name)
+		if module is not None:
+			object_classes = _identify_object_classes(module)
+		else:
+			object_classes = modules.manifest[name]['object_classes']
+		if not object_classes:
+			others.append((i, name))
+			continue
+		required = frozenset(object_classes)
+		index.setdefault(min(required), []).append((i, required, name))
+	return index, others
+
+
+def _identify_object_classes(module):
+	# type: (UdmModule) -> Optional[Set[str]]
+	"""
+	Return the lower cased object classes required by the generic :py:meth:`univention.admin.handlers.simpleLdap.identify`.
+
+	:param module: |UDM| handler module.
+	:returns: `None` if the module uses its own `identify()` function or requires no object classes.
+	"""
+	generic_identify = univention.admin.handlers.simpleLdap.identify.__func__  # type: ignore
+	if getattr(getattr(module, 'identify', None), '__func__', None) is not generic_identify:
+		return None
+	required = options(module).get('default', univention.admin.option()).objectClasses - {'top', 'univentionPolicy', 'univentionObjectMetadata', 'person'}
+	return {oc.lower() for oc in required} or None
+
+
 def identifyOne(dn, attr, type=''):
 	# type: (str, Dict[str, List[Any]], str) -> Optional[UdmModule]
 	"""
@@ -728,6 +1095,8 @@ def superordinate_names(module_name):
 	"""
 	Return name of superordinate module.
 	"""
+	if isinstance(module_name, six.string_types) and module_name in modules and not modules.loaded(module_name):
+		return list(modules.manifest[module_name]['superordinates'])
 	module = get(module_name)
 	names = getattr(module, 'superordinate', [])
 	if isinstance(names, six.string_types):
@@ -772,7 +1141,7 @@ def subordinates(module):
 	:param module: ???
 	:returns: list of |UDM| handler modules.
 	"""
-	return [mod for mod in modules.values() if name(module) in superordinate_names(mod) and not isContainer(mod)]
+	return [modules[entry['module']] for entry in modules.manifest.values() if name(module) in entry['superordinates'] and not entry['container']]
 
 
 def find_superordinate(dn, co, lo):
@@ -921,6 +1290,8 @@ def childs(module_name):
 	:param module_name: the name of the |UDM| module, e.g. `users/user`.
 	:returns: `True` if the module has children, `False` otherwise.
 	"""
+	if isinstance(module_name, six.string_types) and module_name in modules and not modules.loaded(module_name):
+		return modules.manifest[module_name]['childs']
 	module = get(module_name)
 	return getattr(module, 'childs', False)
 
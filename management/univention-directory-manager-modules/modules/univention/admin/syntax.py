@@ -4787,7 +4787,7 @@ class univentionAdminModules(select):
 	valueInvalidSyntax:
 	"""
 	# we need a fallback
-	choices = [
+	_choices = [
 		('computers/domaincontroller_backup', 'Computer: Backup Directory Node'),
 		('computers/domaincontroller_master', 'Computer: Primary Directory Node'),
 		('computers/domaincontroller_slave', 'Computer: Replica Directory Node'),
@@ -4891,16 +4891,27 @@ class univentionAdminModules(select):
 				return text
 		raise univention.admin.uexceptions.valueInvalidSyntax(_('"%s" is not a Univention Admin Module.') % text)
 
+	_module_choices = None  # type: Optional[List[Tuple[str, str]]]
+
+	@ClassProperty
+	def choices(cls):
+		# computed on first use as this imports all handler modules
+		if cls._module_choices is None:
+			if not univention.admin.modules.modules:
+				return cls._choices
+			cls._module_choices = sorted((
+				(name, univention.admin.modules.short_description(mod))
+				for name, mod in univention.admin.modules.modules.items()
+				if not univention.admin.modules.virtual(mod)
+			), key=itemgetter(1))
+		return cls._module_choices
+
 	@classmethod
 	def update_choices(cls):
 		"""
 		Update internal list of |UDM| modules in :py:class:`univentionAdminModules`.
 		"""
-		cls.choices = sorted((
-			(name, univention.admin.modules.short_description(mod))
-			for name, mod in univention.admin.modules.modules.items()
-			if not univention.admin.modules.virtual(mod)
-		), key=itemgetter(1))
+		cls._module_choices = None
 
 
 __register_choice_update_function(univentionAdminModules.update_choices)
@@ -4949,13 +4960,22 @@ class optionsUsersUser(select):
 	"""
 	Syntax to select options for |UDM| module :py:class:`univention.admin.handlers.users.user`.
 	"""
-	choices = [('pki', _('Public key infrastructure account'))]
+	_choices = [('pki', _('Public key infrastructure account'))]
+	_module_choices = None  # type: Optional[List[Tuple[str, str]]]
+
+	@ClassProperty
+	def choices(cls):
+		# computed on first use as this imports the users/user handler module
+		if cls._module_choices is None:
+			users = univention.admin.modules.get('users/user')
+			if not users:
+				return cls._choices
+			cls._module_choices = [(key, x.short_description) for key, x in users.options.items() if key != 'default']
+		return cls._module_choices
 
 	@classmethod
 	def update_choices(cls):
-		users = univention.admin.modules.get('users/user')
-		if users:
-			cls.choices = [(key, x.short_description) for key, x in users.options.items() if key != 'default']
+		cls._module_choices = None
 
 
 __register_choice_update_function(optionsUsersUser.update_choices)
@@ -4966,15 +4986,23 @@ class allModuleOptions(combobox):
 	Syntax to select options for |UDM| modules.
 	"""
 
+	_module_choices = None  # type: Optional[List[Tuple[str, str]]]
+
+	@ClassProperty
+	def choices(cls):
+		# computed on first use as this imports all handler modules
+		if cls._module_choices is None:
+			cls._module_choices = [
+				(key, opt.short_description)
+				for module in univention.admin.modules.modules.values()
+				for key, opt in getattr(module, 'options', {}).items()
+				if key != 'default'
+			]
+		return cls._module_choices
+
 	@classmethod
 	def update_choices(cls):
-		modules = univention.admin.modules.modules.values()
-		cls.choices = [
-			(key, opt.short_description)
-			for module in modules
-			for key, opt in getattr(module, 'options', {}).items()
-			if key != 'default'
-		]
+		cls._module_choices = None
 
 
 __register_choice_update_function(allModuleOptions.update_choices)
@@ -35,7 +35,7 @@ from __future__ import absolute_import
 
 import ldap
 import time
-from typing import Any, Callable, Dict, List, Optional, Tuple  # noqa: F401
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple  # noqa: F401
 
 import univention.debug as ud
 import univention.uldap
@@ -452,6 +452,31 @@ class access(object):
 		# type: () -> int
 		return self.lo.start_tls
 
+	@property
+	def policy_resolver(self):
+		# type: () -> Optional[univention.uldap.PolicyResolver]
+		"""
+		Return the cache used for resolving policies in the current thread.
+
+		:returns: the policy cache or `None` if policies are not cached.
+		"""
+		return self.lo.policy_resolver
+
+	@policy_resolver.setter
+	def policy_resolver(self, resolver):
+		# type: (Optional[univention.uldap.PolicyResolver]) -> None
+		self.lo.policy_resolver = resolver
+
+	def cached_policies(self, ttl=60.0):
+		# type: (float) -> ContextManager[univention.uldap.PolicyResolver]
+		"""
+		Cache policies resolved by :py:meth:`getPolicies` in the current thread.
+
+		:param float ttl: Seconds after which cached entries are re-validated.
+		:returns: A context manager yielding the :py:class:`univention.uldap.PolicyResolver`.
+		"""
+		return self.lo.cached_policies(ttl)
+
 	def __init__(self, host='localhost', port=None, base=u'', binddn=u'', bindpw=u'', start_tls=2, lo=None, follow_referral=False):
 		# type: (str, int, str, str, str, int, univention.uldap.access, bool) -> None
 		"""
@@ -724,6 +749,49 @@ class access(object):
 		except ldap.LDAPError as msg:
 			raise univention.admin.uexceptions.ldapError(_err2str(msg), original_exception=msg)
 
+	def search_iter(self, filter=u'(objectClass=*)', base=u'', scope=u'sub', attr=[], timeout=-1, sizelimit=0, serverctrls=None, page_size=1000):
+		# type: (str, str, str, List[str], int, int, Optional[List[ldap.controls.LDAPControl]], int) -> Iterator[Tuple[str, Dict[str, List[bytes]]]]
+		"""
+		Perform paged LDAP search and yield the values as the pages arrive.
+
+		:param str filter: LDAP search filter.
+		:param str base: the starting point for the search.
+		:param str scope: Specify the scope of the search to be one of `base`, `base+one`, `one`, `sub`, or `domain` to specify a base object, base plus one-level, one-level, subtree, or children search.
+		:param attr: The list of attributes to fetch.
+		:type attr: list[str]
+		:param int timeout: wait at most `timeout` seconds for each page to arrive. `-1` for no limit.
+		:param int sizelimit: retrieve at most `sizelimit` entries for a search. `0` for no limit.
+		:param serverctrls: a list of additional :py:class:`ldap.controls.LDAPControl` instances sent to the server along with each LDAP request.
+		:type serverctrls: list[ldap.controls.LDAPControl]
+		:param int page_size: The number of entries to request per page.
+		:returns: An iterator of 2-tuples (dn, values) for each LDAP object, where values is a dictionary mapping attribute names to a list of values.
+		:rtype: iterator[tuple[str, dict[str, list[str]]]]
+		:raises univention.admin.uexceptions.noObject: Indicates the target object cannot be found.
+		:raises univention.admin.uexceptions.insufficientInformation: Indicates that the matching rule specified in the search filter does not match a rule defined for the attribute's syntax.
+		:raises univention.admin.uexceptions.ldapTimeout: Indicates that the time limit of the LDAP client was exceeded while waiting for a result.
+		:raises univention.admin.uexceptions.ldapSizelimitExceeded: Indicates that in a search operation, the size limit specified by the client or the server has been exceeded.
+		:raises univention.admin.uexceptions.ldapError: Indicates that the search method was called with an invalid search filter.
+		:raises univention.admin.uexceptions.ldapError: Indicates that the syntax of the DN is incorrect.
+		:raises univention.admin.uexceptions.ldapError: on any other LDAP error.
+		"""
+		try:
+			for entry in self.lo.search_iter(filter, base, scope, attr, timeout, sizelimit, serverctrls=serverctrls, page_size=page_size):
+				yield entry
+		except ldap.NO_SUCH_OBJECT as msg:
+			raise univention.admin.uexceptions.noObject(_err2str(msg))
+		except ldap.INAPPROPRIATE_MATCHING as msg:
+			raise univention.admin.uexceptions.insufficientInformation(_err2str(msg))
+		except (ldap.TIMEOUT, ldap.TIMELIMIT_EXCEEDED) as msg:
+			raise univention.admin.uexceptions.ldapTimeout(_err2str(msg))
+		except (ldap.SIZELIMIT_EXCEEDED, ldap.ADMINLIMIT_EXCEEDED) as msg:
+			raise univention.admin.uexceptions.ldapSizelimitExceeded(_err2str(msg))
+		except ldap.FILTER_ERROR as msg:
+			raise univention.admin.uexceptions.ldapError('%s: %s' % (_err2str(msg), filter))
+		except ldap.INVALID_DN_SYNTAX as msg:
+			raise univention.admin.uexceptions.ldapError('%s: %s' % (_err2str(msg), base), original_exception=msg)
+		except ldap.LDAPError as msg:
+			raise univention.admin.uexceptions.ldapError(_err2str(msg), original_exception=msg)
+
 	def getPolicies(self, dn, policies=None, attrs=None, result=None, fixedattrs=None):
 		# type: (str, Optional[List[str]], Optional[Dict[str, List[Any]]], Any, Any) -> Dict[str, Dict[str, Any]]
 		"""
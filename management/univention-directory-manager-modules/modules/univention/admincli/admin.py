@@ -36,6 +36,7 @@ from __future__ import print_function
 import getopt
 import base64
 import os
+import shlex
 import subprocess
 import traceback
 from ipaddress import IPv4Address, IPv4Network
@@ -45,6 +46,7 @@ import six
 
 import univention.debug as ud
 
+import univention.admin.allocators
 import univention.admin.uexceptions
 import univention.admin.uldap
 import univention.admin.modules
@@ -89,6 +91,7 @@ def usage():
 	out.append('  --%-30s %s' % ('bindpwdfile', 'file containing bind password'))
 	out.append('  --%-30s %s' % ('logfile', 'path and name of the logfile to be used'))
 	out.append('  --%-30s %s' % ('tls', '0 (no); 1 (try); 2 (must)'))
+	out.append('  --%-30s %s' % ('batch', 'file with the options of one object per line (create and modify)'))
 	out.append('')
 	out.append('create options:')
 	out.append('  --%-30s %s' % ('position', 'Set position in tree'))
@@ -374,10 +377,10 @@ def list_available_modules(o=[]):
 	return o
 
 
-def doit(arglist):
+def doit(arglist, lo=None):
 	out = []
 	try:
-		out = _doit(arglist)
+		out = _doit(arglist, lo)
 	except OperationFailed as exc:
 		return exc.out + ["OPERATION FAILED"]
 	except ldap.SERVER_DOWN:
@@ -410,7 +413,7 @@ def doit(arglist):
 	return out
 
 
-def _doit(arglist):
+def _doit(arglist, lo=None):
 	out = []
 	# parse module and action
 	if len(arglist) < 2:
@@ -429,7 +432,7 @@ def _doit(arglist):
 	remove_referring = 0
 	recursive = 1
 	# parse options
-	longopts = ['position=', 'dn=', 'set=', 'append=', 'remove=', 'superordinate=', 'option=', 'append-option=', 'remove-option=', 'filter=', 'tls=', 'ignore_exists', 'ignore_not_exists', 'logfile=', 'policies=', 'binddn=', 'bindpwd=', 'bindpwdfile=', 'policy-reference=', 'policy-dereference=', 'remove_referring', 'recursive']
+	longopts = ['position=', 'dn=', 'set=', 'append=', 'remove=', 'superordinate=', 'option=', 'append-option=', 'remove-option=', 'filter=', 'tls=', 'ignore_exists', 'ignore_not_exists', 'logfile=', 'policies=', 'binddn=', 'bindpwd=', 'bindpwdfile=', 'policy-reference=', 'policy-dereference=', 'remove_referring', 'recursive', 'batch=']
 	try:
 		opts, args = getopt.getopt(arglist[3:], '', longopts)
 	except getopt.error as msg:
@@ -462,6 +465,7 @@ def _doit(arglist):
 	remove = {}
 	policy_reference = []
 	policy_dereference = []
+	batch = None
 	for opt, val in opts:
 		if opt == '--position':
 			position_dn = val
@@ -506,53 +510,62 @@ def _doit(arglist):
 			policy_reference.append(val)
 		elif opt == '--policy-dereference':
 			policy_dereference.append(val)
-
-	if logfile:
-		ud.init(logfile, ud.FLUSH, ud.NO_FUNCTION)
-	else:
-		out.append("WARNING: no logfile specified")
+		elif opt == '--batch':
+			batch = val
 
 	configRegistry = univention.config_registry.ConfigRegistry()
 	configRegistry.load()
 
 	baseDN = configRegistry['ldap/base']
 
-	debug_level = int(configRegistry.get('directory/manager/cmd/debug/level', 0))
+	# a batch re-uses the connection for each object
+	if batch and lo is not None:
+		raise OperationFailed(out, 'E: --batch can not be used inside of a batch file')
+	if lo is None:
+		if logfile:
+			ud.init(logfile, ud.FLUSH, ud.NO_FUNCTION)
+		else:
+			out.append("WARNING: no logfile specified")
 
-	ud.set_level(ud.LDAP, debug_level)
-	ud.set_level(ud.ADMIN, debug_level)
+		debug_level = int(configRegistry.get('directory/manager/cmd/debug/level', 0))
 
-	if binddn and bindpwd:
-		ud.debug(ud.ADMIN, ud.INFO, "using %s account" % binddn)
-		try:
-			lo = univention.admin.uldap.access(host=configRegistry['ldap/master'], port=int(configRegistry.get('ldap/master/port', '7389')), base=baseDN, binddn=binddn, start_tls=tls, bindpw=bindpwd)
-		except Exception as exc:
-			ud.debug(ud.ADMIN, ud.WARN, 'authentication error: %s' % (exc,))
-			raise OperationFailed(out, 'authentication error: %s' % (exc,))
-		policyOptions.extend(['-D', binddn, '-w', bindpwd])  # FIXME not so nice
-	else:
-		if os.path.exists('/etc/ldap.secret'):
-			ud.debug(ud.ADMIN, ud.INFO, "using cn=admin,%s account" % baseDN)
-			secretFileName = '/etc/ldap.secret'
-			binddn = 'cn=admin,' + baseDN
-			policyOptions.extend(['-D', binddn, '-y', secretFileName])
-		elif os.path.exists('/etc/machine.secret'):
-			ud.debug(ud.ADMIN, ud.INFO, "using %s account" % configRegistry['ldap/hostdn'])
-			secretFileName = '/etc/machine.secret'
-			binddn = configRegistry['ldap/hostdn']
-			policyOptions.extend(['-D', binddn, '-y', secretFileName])
+		ud.set_level(ud.LDAP, debug_level)
+		ud.set_level(ud.ADMIN, debug_level)
 
-		try:
-			with open(secretFileName, 'r') as secretFile:
-				pwd = secretFile.read().strip('\n')
-		except IOError:
-			raise OperationFailed(out, 'E: Permission denied, try --binddn and --bindpwd')
+		if binddn and bindpwd:
+			ud.debug(ud.ADMIN, ud.INFO, "using %s account" % binddn)
+			try:
+				lo = univention.admin.uldap.access(host=configRegistry['ldap/master'], port=int(configRegistry.get('ldap/master/port', '7389')), base=baseDN, binddn=binddn, start_tls=tls, bindpw=bindpwd)
+			except Exception as exc:
+				ud.debug(ud.ADMIN, ud.WARN, 'authentication error: %s' % (exc,))
+				raise OperationFailed(out, 'authentication error: %s' % (exc,))
+			policyOptions.extend(['-D', binddn, '-w', bindpwd])  # FIXME not so nice
+		else:
+			if os.path.exists('/etc/ldap.secret'):
+				ud.debug(ud.ADMIN, ud.INFO, "using cn=admin,%s account" % baseDN)
+				secretFileName = '/etc/ldap.secret'
+				binddn = 'cn=admin,' + baseDN
+				policyOptions.extend(['-D', binddn, '-y', secretFileName])
+			elif os.path.exists('/etc/machine.secret'):
+				ud.debug(ud.ADMIN, ud.INFO, "using %s account" % configRegistry['ldap/hostdn'])
+				secretFileName = '/etc/machine.secret'
+				binddn = configRegistry['ldap/hostdn']
+				policyOptions.extend(['-D', binddn, '-y', secretFileName])
 
-		try:
-			lo = univention.admin.uldap.access(host=configRegistry['ldap/master'], port=int(configRegistry.get('ldap/master/port', '7389')), base=baseDN, binddn=binddn, bindpw=pwd, start_tls=tls)
-		except Exception as exc:
-			ud.debug(ud.ADMIN, ud.WARN, 'authentication error: %s' % (exc,))
-			raise OperationFailed(out, 'authentication error: %s' % (exc,))
+			try:
+				with open(secretFileName, 'r') as secretFile:
+					pwd = secretFile.read().strip('\n')
+			except IOError:
+				raise OperationFailed(out, 'E: Permission denied, try --binddn and --bindpwd')
+
+			try:
+				lo = univention.admin.uldap.access(host=configRegistry['ldap/master'], port=int(configRegistry.get('ldap/master/port', '7389')), base=baseDN, binddn=binddn, bindpw=pwd, start_tls=tls)
+			except Exception as exc:
+				ud.debug(ud.ADMIN, ud.WARN, 'authentication error: %s' % (exc,))
+				raise OperationFailed(out, 'authentication error: %s' % (exc,))
+
+	if batch:
+		return out + _batch(arglist, batch, lo)
 
 	if not position_dn and superordinate_dn:
 		position_dn = superordinate_dn
@@ -663,6 +676,59 @@ def _doit(arglist):
 	return out  # nearly the only successful return
 
 
+def _batch(arglist, filename, lo):
+	"""
+	Run the action for each line of the batch file, which contains the options of one object.
+	Options given on the command line apply to all objects.
+	Errors are reported per line without aborting the batch.
+	"""
+	out = []
+	action = arglist[2] if len(arglist) > 2 else ''
+	if action not in ('create', 'new', 'modify', 'edit'):
+		raise OperationFailed(out, 'E: --batch is only supported for create and modify')
+
+	common = []
+	args = iter(arglist[3:])
+	for arg in args:
+		if arg == '--batch':
+			next(args, None)
+		elif not arg.startswith('--batch='):
+			common.append(arg)
+
+	try:
+		with open(filename) as fd:
+			lines = fd.readlines()
+	except IOError as exc:
+		raise OperationFailed(out, 'E: could not read batch file (%s)' % (exc,))
+
+	# reserve the uidNumber and gidNumber values of the new objects in blocks
+	objects = [line for line in lines if line.strip() and not line.strip().startswith('#')]
+	total = failed = 0
+	with univention.admin.allocators.reservation(len(objects) if action in ('create', 'new') else 0):
+		for lineno, line in enumerate(lines, 1):
+			line = line.strip()
+			if not line or line.startswith('#'):
+				continue
+			total += 1
+			try:
+				line_args = shlex.split(line)
+			except ValueError as exc:
+				result = ['E: %s' % (exc,), 'OPERATION FAILED']
+			else:
+				result = doit(arglist[:3] + common + line_args, lo)
+			if result and result[-1] == 'OPERATION FAILED':
+				failed += 1
+				ud.debug(ud.ADMIN, ud.WARN, 'batch: line %d failed' % (lineno,))
+				out.append('E: line %d failed: %s' % (lineno, line))
+				out.extend('   %s' % (msg,) for msg in result[:-1])
+			else:
+				out.extend(result)
+
+	if failed:
+		raise OperationFailed(out, 'E: %d of %d objects failed' % (failed, total))
+	return out
+
+
 class CLI(object):
 
 	def __init__(self, module_name, module, dn, lo, position, superordinate):
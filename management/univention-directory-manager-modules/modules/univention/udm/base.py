@@ -289,6 +289,31 @@ class BaseModule(with_metaclass(ModuleMeta)):
 		"""
 		raise NotImplementedError()
 
+	def create_many(self, objs):
+		"""
+		Save multiple new, unsaved objects.
+
+		A failure to save one object does not abort the whole batch, the
+		error is returned instead. This includes errors that are not
+		:py:class:`univention.udm.exceptions.UdmError`, e.g. a lost LDAP
+		connection, so check the results of the remaining objects as well.
+
+		:param objs: new, unsaved objects created by :py:meth:`new()`
+		:type objs: Iterable(BaseObject)
+		:return: list with one entry per object, `None` if the object was
+			saved, the exception otherwise
+		:rtype: list(None or Exception)
+		"""
+		results = []
+		for obj in objs:
+			try:
+				obj.save()
+			except Exception as exc:
+				results.append(exc)
+			else:
+				results.append(None)
+		return results
+
 	def get(self, dn):
 		"""
 		Load |UDM| object from |LDAP|.
@@ -324,7 +349,7 @@ class BaseModule(with_metaclass(ModuleMeta)):
 					self.name, self.meta.identifying_property, filter_s, len(res)), module_name=self.name)
 		return res[0]
 
-	def search(self, filter_s='', base='', scope='sub', sizelimit=0):
+	def search(self, filter_s='', base='', scope='sub', sizelimit=0, properties=None):
 		"""
 		Get all |UDM| objects from |LDAP| that match the given filter.
 
@@ -333,6 +358,8 @@ class BaseModule(with_metaclass(ModuleMeta)):
 		:param str base: |LDAP| search base.
 		:param str scope: |LDAP| search scope, e.g. `base` or `sub` or `one`.
 		:param int sizelimit: |LDAP| size limit for searched results.
+		:param properties: Names of the properties needed by the caller, `None` for all.
+		:type properties: list(str)
 		:return: iterator of :py:class:`BaseObject` objects
 		:rtype: Iterator(BaseObject)
 		"""
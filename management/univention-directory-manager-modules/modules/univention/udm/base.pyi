@@ -128,12 +128,15 @@ class BaseModule(with_metaclass(ModuleMeta)):
 	def new(self, superordinate=None):  # type: (Optional[Union[Text, BaseObjectTV]]) -> BaseObjectTV
 		...
 
+	def create_many(self, objs):  # type: (Iterable[BaseObjectTV]) -> List[Optional[Exception]]
+		...
+
 	def get(self, dn):  # type: (Text) -> BaseObjectTV
 		...
 
 	def get_by_id(self, id):  # type: (Text) -> BaseObjectTV
 		...
 
-	def search(self, filter_s='', base='', scope='sub', sizelimit=0):
-		# type: (Text, Optional[Text], Optional[Text], int) -> Iterator[BaseObjectTV]
+	def search(self, filter_s='', base='', scope='sub', sizelimit=0, properties=None):
+		# type: (Text, Optional[Text], Optional[Text], int, Optional[List[Text]]) -> Iterator[BaseObjectTV]
 		...
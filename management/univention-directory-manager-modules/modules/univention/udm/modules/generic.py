@@ -39,6 +39,7 @@ from six import string_types, reraise, with_metaclass
 from ldap.dn import dn2str, str2dn
 import ldap
 
+import univention.admin.allocators
 import univention.admin.objects
 import univention.admin.modules
 import univention.admin.uexceptions
@@ -134,6 +135,7 @@ class GenericObject(BaseObject):
 		self._old_position = ''
 		self._fresh = True
 		self._deleted = False
+		self._projected = False
 
 	def reload(self):
 		"""
@@ -148,6 +150,7 @@ class GenericObject(BaseObject):
 		if not self.dn or not self._orig_udm_object:
 			raise NotYetSavedError(module_name=self._udm_module.name)
 		self._orig_udm_object = self._udm_module._get_orig_udm_object(self.dn)
+		self._projected = False
 		self._copy_from_udm_obj()
 		ud.debug('{!r} object (dn: {!r}) reloaded'.format(self._udm_module.name, self.dn))
 		return self
@@ -159,9 +162,14 @@ class GenericObject(BaseObject):
 		:return: self
 		:rtype: GenericObject
 		:raises univention.udm.exceptions.MoveError: when a move operation fails
+		:raises univention.udm.exceptions.ModifyError: if the object was loaded with only some of its properties
 		"""
 		if self._deleted:
 			raise DeletedError('{} has been deleted.'.format(self), dn=self.dn, module_name=self._udm_module.name)
+		if self._projected:
+			raise ModifyError(
+				'{} was loaded with only some of its properties, reload() it before saving.'.format(self),
+				dn=self.dn, module_name=self._udm_module.name)
 		if not self._fresh:
 			ud.warn('Saving stale UDM object instance')
 		self._copy_to_udm_obj()
@@ -417,6 +425,9 @@ class GenericObject(BaseObject):
 
 
 class GenericModuleMetadata(BaseModuleMetadata):
+	search_page_size = 1000
+	"""Number of LDAP entries fetched at once by :py:meth:`GenericModule.search`."""
+
 	def __init__(self, meta):
 		super(GenericModuleMetadata, self).__init__(meta)
 		self.default_positions_property = None
@@ -522,6 +533,23 @@ class GenericModule(with_metaclass(GenericModuleMeta, BaseModule)):
 		"""
 		return self._load_obj('', superordinate)
 
+	def create_many(self, objs):
+		"""
+		Save multiple new, unsaved objects.
+
+		The uidNumber and gidNumber values of the objects are reserved in
+		blocks, see :py:func:`univention.admin.allocators.reservation`.
+
+		:param objs: new, unsaved objects created by :py:meth:`new()`
+		:type objs: Iterable(GenericObject)
+		:return: list with one entry per object, `None` if the object was
+			saved, the exception otherwise
+		:rtype: list(None or Exception)
+		"""
+		objs = list(objs)
+		with univention.admin.allocators.reservation(len(objs)):
+			return super(GenericModule, self).create_many(objs)
+
 	def get(self, dn):
 		"""
 		Load UDM object from LDAP.
@@ -534,7 +562,7 @@ class GenericModule(with_metaclass(GenericModuleMeta, BaseModule)):
 		"""
 		return self._load_obj(dn)
 
-	def search(self, filter_s='', base='', scope='sub', sizelimit=0):
+	def search(self, filter_s='', base='', scope='sub', sizelimit=0, properties=None):
 		"""
 		Get all UDM objects from LDAP that match the given filter.
 
@@ -543,13 +571,73 @@ class GenericModule(with_metaclass(GenericModuleMeta, BaseModule)):
 		:param str base: subtree to search
 		:param str scope: depth to search
 		:param int sizelimit: LDAP size limit for searched results.
+		:param properties: names of the properties needed by the caller, `None` for all
+		:type properties: list(str)
 		:return: generator to iterate over GenericObject objects
 		:rtype: Iterator(GenericObject)
+
+		If possible, the objects are created from the attributes returned by
+		the search, so that objects are not read from LDAP a second time. The
+		search results are then fetched in pages of
+		:py:attr:`meta.search_page_size` entries. All pages are read before
+		the first object is returned, so the caller may use the connection
+		while iterating.
+
+		If `properties` is given and the module supports it, only the LDAP
+		attributes of these properties are requested and the objects are not
+		opened. Other properties and the superordinate of such objects are not
+		set and the objects must be reloaded before they can be saved. Modules
+		that use their own `lookup` function always return complete objects.
+		"""
+		projected = properties is not None and self._supports_attribute_search()
+		if not projected and not self._supports_single_round_trip_search():
+			if properties is not None:
+				ud.debug('{!r} objects cannot be searched by attributes, loading all properties'.format(self.name))
+			for dn in self._search_dns(filter_s, base, scope, sizelimit):
+				yield self.get(dn)
+			return
+		udm_module_lookup_filter = str(self._orig_udm_module.lookup_filter(filter_s, self.connection))
+		if projected:
+			attr = self._orig_udm_module.object._ldap_attributes_for_properties(properties)
+		else:
+			attr = self._orig_udm_module.object._ldap_attributes()
+		try:
+			# a paged search is bound to the connection, read it completely before other searches can happen
+			results = list(self.connection.search_iter(
+				filter=udm_module_lookup_filter,
+				base=base,
+				scope=scope,
+				attr=attr,
+				sizelimit=sizelimit,
+				page_size=self.meta.search_page_size
+			))
+		except univention.admin.uexceptions.ldapSizelimitExceeded:
+			raise SearchLimitReached(module_name=self.name, search_filter=filter_s, sizelimit=sizelimit)
+		for dn, attrs in results:
+			try:
+				orig_udm_obj = self._orig_udm_object_from_attributes(dn, attrs, auto_open=not projected)
+			except univention.admin.uexceptions.base as exc:
+				ud.warn('Ignoring {!r} object at {!r}: {}'.format(self.name, dn, exc))
+				continue
+			obj = self._load_obj(dn, orig_udm_object=orig_udm_obj)
+			obj._projected = projected
+			yield obj
+
+	def _search_dns(self, filter_s, base, scope, sizelimit):
+		"""
+		Get the DNs of all LDAP objects matching the given filter.
+
+		:param str filter_s: LDAP filter
+		:param str base: subtree to search
+		:param str scope: depth to search
+		:param int sizelimit: LDAP size limit for searched results.
+		:return: DNs of matching objects
+		:rtype: Iterable(str)
 		"""
 		try:
 			try:
 				udm_module_lookup_filter = str(self._orig_udm_module.lookup_filter(filter_s, self.connection))
-				dns = self.connection.searchDn(
+				return self.connection.searchDn(
 					filter=udm_module_lookup_filter,
 					base=base,
 					scope=scope,
@@ -557,18 +645,48 @@ class GenericModule(with_metaclass(GenericModuleMeta, BaseModule)):
 				)
 			except AttributeError:
 				# not all modules have 'lookup_filter'
-				dns = (obj.dn for obj in self._orig_udm_module.lookup(
+				return [obj.dn for obj in self._orig_udm_module.lookup(
 					None,
 					self.connection,
 					filter_s,
 					base=base,
 					scope=scope,
 					sizelimit=sizelimit
-				))
+				)]
 		except univention.admin.uexceptions.ldapSizelimitExceeded:
 			raise SearchLimitReached(module_name=self.name, search_filter=filter_s, sizelimit=sizelimit)
-		for dn in dns:
-			yield self.get(dn)
+
+	def _supports_attribute_search(self):
+		"""
+		Whether objects of this module can be created from the attributes
+		returned by the search itself.
+
+		This is not possible for modules without `lookup_filter`, they use
+		their own `lookup` function.
+
+		:return: whether :py:meth:`search` can request the LDAP attributes itself
+		:rtype: bool
+		"""
+		udm_module = self._orig_udm_module
+		return bool(
+			hasattr(udm_module, 'lookup_filter') and
+			isinstance(getattr(udm_module, 'object', None), type) and
+			issubclass(udm_module.object, univention.admin.handlers.simpleLdap)
+		)
+
+	def _supports_single_round_trip_search(self):
+		"""
+		Whether complete objects of this module can be created from the
+		attributes returned by the search itself, without loading each one
+		again.
+
+		This is additionally not possible for modules whose objects require a
+		superordinate, as that has to be looked up for each object.
+
+		:return: whether :py:meth:`search` needs a single LDAP search only
+		:rtype: bool
+		"""
+		return self._supports_attribute_search() and not univention.admin.modules.superordinate_names(self._orig_udm_module)
 
 	def _dn_exists(self, dn):
 		"""
@@ -696,6 +814,24 @@ class GenericModule(with_metaclass(GenericModuleMeta, BaseModule)):
 			obj.open()
 		return obj
 
+	def _orig_udm_object_from_attributes(self, dn, attrs, auto_open=True):
+		"""
+		Create UDM object from the attributes of an LDAP search result,
+		without reading it from LDAP again.
+
+		:param str dn: the DN of the object
+		:param dict attrs: the LDAP attributes of the object
+		:param bool auto_open: whether to open the object if :py:attr:`meta.auto_open` is set
+		:return: UDM object
+		:rtype: univention.admin.handlers.simpleLdap
+		:raises univention.udm.exceptions.WrongObjectType: if the object is not of type :py:attr:`self.name`
+		"""
+		obj = self._orig_udm_module.object(None, self.connection, None, dn=dn, attributes=attrs)
+		self._verify_univention_object_type(obj)
+		if auto_open and self.meta.auto_open:
+			obj.open()
+		return obj
+
 	def _load_obj(self, dn, superordinate=None, orig_udm_object=None):
 		"""
 		GenericObject factory.
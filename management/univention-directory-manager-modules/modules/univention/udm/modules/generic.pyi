@@ -73,6 +73,7 @@ class GenericObject(BaseObjectTV):
 		self._old_position = ''
 		self._fresh = True
 		self._deleted = False
+		self._projected = False
 
 	def reload(self):  # type: () -> GenericObject
 		...
@@ -98,6 +99,8 @@ class GenericObject(BaseObjectTV):
 
 
 class GenericModuleMetadata(BaseModuleMetadataTV):
+	search_page_size = 1000  # type: int
+
 	def __init__(self, meta):  # type: (GenericModuleTV.Meta) -> None
 		self.default_positions_property = None  # type: Text
 
@@ -125,8 +128,18 @@ class GenericModule(BaseModuleTV):
 	def get(self, dn):  # type: (Text) -> GenericObject
 		...
 
-	def search(self, filter_s='', base='', scope='sub', sizelimit=0):  # type: (Text, Text, Text, int) -> Iterator[GenericObjectTV]
+	def search(self, filter_s='', base='', scope='sub', sizelimit=0, properties=None):  # type: (Text, Text, Text, int, Optional[List[Text]]) -> Iterator[GenericObjectTV]
+		...
+
+	def _search_dns(self, filter_s, base, scope, sizelimit):  # type: (Text, Text, Text, int) -> Iterable[Text]
+		...
+
+	def _supports_attribute_search(self):  # type: () -> bool
 		...
+
+	def _supports_single_round_trip_search(self):  # type: () -> bool
+		...
+
 	def _dn_exists(self, dn):  # type: (Text) -> bool
 		...
 
@@ -145,6 +158,9 @@ class GenericModule(BaseModuleTV):
 		# type: (Text, Optional[Union[Text, GenericObjectTV]]) -> OriUdmHandlerTV
 		...
 
+	def _orig_udm_object_from_attributes(self, dn, attrs, auto_open=True):  # type: (Text, Dict[Text, List[bytes]], bool) -> OriUdmHandlerTV
+		...
+
 	def _load_obj(self, dn, superordinate=None, orig_udm_object=None):
 		# type: (Text, Optional[Union[Text, GenericObjectTV]], Optional[OriUdmHandlerTV]) -> GenericObject
 		...
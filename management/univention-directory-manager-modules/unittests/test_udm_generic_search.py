@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+#
+# Copyright 2021 Univention GmbH
+#
+# https://www.univention.de/
+#
+# All rights reserved.
+#
+# The source code of this program is made available
+# under the terms of the GNU Affero General Public License version 3
+# (GNU AGPL V3) as published by the Free Software Foundation.
+#
+# Binary versions of this program provided by Univention to you as
+# well as other copyrighted, protected or trademarked materials like
+# Logos, graphics, fonts, specific documentations and configurations,
+# cryptographic keys etc. are subject to a license agreement between
+# you and Univention and not subject to the GNU AGPL V3.
+#
+# In the case you use this program under the terms of the GNU AGPL V3,
+# the program is provided in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public
+# License with the Debian GNU/Linux or Univention distribution in file
+# /usr/share/common-licenses/AGPL-3; if not, see
+# <https://www.gnu.org/licenses/>.
+#
+
+
+import types
+
+import pytest
+
+from univentionunittests.udm_database import LDAPObject
+
+BASE = 'cn=things,dc=intranet,dc=example,dc=de'
+DNS = ['cn=one,%s' % (BASE,), 'cn=two,%s' % (BASE,)]
+
+
+@pytest.fixture
+def generic():
+	from univention.udm.modules import generic
+	return generic
+
+
+@pytest.fixture
+def udm_handler():
+	"""A minimal UDM handler module, which creates its objects from the given attributes."""
+	import univention.admin.handlers
+
+	class Thing(univention.admin.handlers.simpleLdap):
+		module = 'tests/thing'
+		opened = False
+
+		def __init__(self, co, lo, position, dn=u'', superordinate=None, attributes=None):
+			self.dn = dn
+			self.lo = lo
+			self.superordinate = superordinate
+			self.oldattr = attributes or {}
+			self.oldinfo = {}
+
+		def open(self):
+			self.opened = True
+
+		@classmethod
+		def _ldap_attributes(cls):
+			return ['cn', 'description', 'objectClass']
+
+		@classmethod
+		def _ldap_attributes_for_properties(cls, properties):
+			return ['cn']
+
+	module = types.ModuleType('tests.thing')
+	module.object = Thing
+	module.lookup_filter = lambda filter_s=None, lo=None: '(&(objectClass=univentionThing)(%s))' % (filter_s,)
+	return module
+
+
+@pytest.fixture
+def things(ldap_database):
+	for dn in DNS:
+		ldap_database.add(LDAPObject(dn, {
+			'cn': [dn.split(',', 1)[0][3:].encode('utf-8')],
+			'description': [b'a thing'],
+			'objectClass': [b'univentionThing'],
+		}))
+	return ldap_database
+
+
+@pytest.fixture
+def module(mocker, generic, udm_handler, lo, things):
+	def load_obj(dn, superordinate=None, orig_udm_object=None):
+		if orig_udm_object is None:
+			orig_udm_object = udm_handler.object(None, lo, None, dn=dn, attributes=things.get(dn))
+			orig_udm_object.open()
+		return mocker.Mock(dn=dn, _orig_udm_object=orig_udm_object, _projected=False)
+
+	mocker.patch.object(generic.GenericModule, '_get_orig_udm_module', return_value=udm_handler)
+	mocker.patch.object(generic.GenericModule, '_load_obj', side_effect=load_obj)
+	lo.search_iter = mocker.Mock(wraps=lo.search_iter)
+	lo.searchDn = mocker.Mock(wraps=lo.searchDn)
+	return generic.GenericModule('tests/thing', lo, 2)
+
+
+def test_search_creates_objects_from_attributes(module, lo):
+	objs = list(module.search('cn=*'))
+	assert [obj.dn for obj in objs] == DNS
+	assert lo.search_iter.call_args[1]['attr'] == ['cn', 'description', 'objectClass']
+	assert not lo.searchDn.called
+	for obj in objs:
+		assert obj._orig_udm_object.opened
+		assert obj._orig_udm_object.oldattr['description'] == [b'a thing']
+		assert not obj._projected
+	for call in module._load_obj.call_args_list:
+		assert call[1]['orig_udm_object'] is not None
+
+
+def test_search_properties(module, lo):
+	objs = list(module.search('cn=*', properties=['name']))
+	assert [obj.dn for obj in objs] == DNS
+	assert lo.search_iter.call_args[1]['attr'] == ['cn']
+	for obj in objs:
+		assert not obj._orig_udm_object.opened
+		assert 'description' not in obj._orig_udm_object.oldattr
+		assert obj._projected
+
+
+def test_search_reads_all_pages_first(module, lo, mocker):
+	fetched = []
+	search_iter = lo.search_iter
+
+	def fetch(*args, **kwargs):
+		for dn, attrs in search_iter(*args, **kwargs):
+			fetched.append(dn)
+			yield dn, attrs
+
+	lo.search_iter = mocker.Mock(side_effect=fetch)
+	objs = module.search('cn=*')
+	next(objs)
+	assert fetched == DNS
+
+
+def test_search_sizelimit(module, lo, mocker):
+	import univention.admin.uexceptions
+	from univention.udm.exceptions import SearchLimitReached
+
+	def fetch(*args, **kwargs):
+		yield DNS[0], {}
+		raise univention.admin.uexceptions.ldapSizelimitExceeded()
+
+	lo.search_iter = mocker.Mock(side_effect=fetch)
+	with pytest.raises(SearchLimitReached):
+		next(module.search('cn=*', sizelimit=1))
+
+
+def test_search_superordinate(module, lo, udm_handler):
+	udm_handler.superordinate = 'tests/parent'
+	objs = list(module.search('cn=*'))
+	assert [obj.dn for obj in objs] == DNS
+	assert lo.searchDn.called
+	assert not lo.search_iter.called
+	for obj in objs:
+		assert obj._orig_udm_object.opened
+		assert not obj._projected
+
+
+def test_search_superordinate_properties(module, lo, udm_handler):
+	udm_handler.superordinate = 'tests/parent'
+	objs = list(module.search('cn=*', properties=['name']))
+	assert [obj.dn for obj in objs] == DNS
+	assert lo.search_iter.call_args[1]['attr'] == ['cn']
+	assert not lo.searchDn.called
+	for obj in objs:
+		assert obj._projected
+
+
+def test_search_own_lookup(module, lo, udm_handler, mocker):
+	del udm_handler.lookup_filter
+	udm_handler.lookup = mocker.Mock(return_value=[mocker.Mock(dn=dn) for dn in DNS])
+	objs = list(module.search('cn=*', properties=['name']))
+	assert [obj.dn for obj in objs] == DNS
+	assert udm_handler.lookup.called
+	assert not lo.search_iter.called
+	for obj in objs:
+		assert obj._orig_udm_object.opened
+		assert not obj._projected
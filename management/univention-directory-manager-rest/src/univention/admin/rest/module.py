@@ -1194,7 +1194,7 @@ class OpenAPI(Resource):
 			},
 		}
 
-		for name, mod in sorted(udm_modules.modules.items()):
+		for name in sorted(udm_modules.modules):
 			if object_type and name != object_type:
 				continue
 			module = UDM_Module(name, ldap_connection=self.ldap_connection, ldap_position=self.ldap_position)
@@ -1877,7 +1877,7 @@ class SubObjectTypes(Resource):
 			allowed_modules.update(udm_modules.subordinates(superordinate))
 		else:
 			# add all types that do not have a superordinate
-			allowed_modules.update(mod for mod in udm_modules.modules.values() if not udm_modules.superordinates(mod))
+			allowed_modules.update(udm_modules.get(name) for name in udm_modules.modules if not udm_modules.superordinate_names(name))
 
 		# make sure that the object type can be created
 		allowed_modules = [mod for mod in allowed_modules if udm_modules.supports(mod, 'add')]
@@ -2364,7 +2364,7 @@ class Objects(FormBase, ReportingBase):
 		objects = []
 		if search:
 			try:
-				objects, last_page = yield self.search(module, container, ldap_filter, superordinate, scope, hidden, items_per_page, page, by, reverse)
+				objects, last_page = yield self.search(module, container, ldap_filter, superordinate, scope, hidden, items_per_page, page, by, reverse, self._search_properties(module, properties))
 			except ObjectDoesNotExist as exc:
 				self.raise_sanitization_error('position', str(exc))
 			except SuperordinateDoesNotExist as exc:
@@ -2438,8 +2438,19 @@ class Objects(FormBase, ReportingBase):
 		self.add_caching(public=False, no_cache=True, no_store=True, max_age=1, must_revalidate=True)
 		self.content_negotiation(result)
 
+	def _search_properties(self, module, properties):
+		"""The properties which need to be loaded to represent the objects, `None` for all."""
+		if '*' in properties:
+			return None
+		# the id of an object is built from its identifying properties or the configured display property
+		search_properties = properties + [name for name, prop in module.module.property_descriptions.items() if prop.identifies]
+		display = ucr.get('directory/manager/web/modules/%s/display' % (module.name,))
+		if display:
+			search_properties.append(display)
+		return search_properties
+
 	@tornado.gen.coroutine
-	def search(self, module, container, ldap_filter, superordinate, scope, hidden, items_per_page, page, by, reverse):
+	def search(self, module, container, ldap_filter, superordinate, scope, hidden, items_per_page, page, by, reverse, properties=None):
 		ctrls = {}
 		serverctrls = []
 		hashed = (self.request.user_dn, module.name, container or None, ldap_filter or None, superordinate or None, scope or None, hidden or None, items_per_page or None, by or None, reverse or None)
@@ -2459,7 +2470,7 @@ class Objects(FormBase, ReportingBase):
 		ucr['directory/manager/web/sizelimit'] = ucr.get('ldap/sizelimit', '400000')
 		last_page = page
 		for i in range(current_page, page or 1):
-			objects = yield self.pool.submit(module.search, container, superordinate=superordinate, filter=ldap_filter, scope=scope, hidden=hidden, serverctrls=serverctrls, response=ctrls)
+			objects = yield self.pool.submit(module.search, container, superordinate=superordinate, filter=ldap_filter, scope=scope, hidden=hidden, serverctrls=serverctrls, response=ctrls, properties=properties)
 			for control in ctrls.get('ctrls', []):
 				if control.controlType == SimplePagedResultsControl.controlType:
 					page_ctrl.cookie = control.cookie
@@ -79,7 +79,14 @@ BACKUP_DIR = '/var/univention-backup/replication'
 LDIF_FILE = os.path.join(STATE_DIR, 'failed.ldif')
 ROOTPW_FILE = '/etc/ldap/rootpw.conf'
 CURRENT_MODRDN = os.path.join(STATE_DIR, 'current_modrdn')
+CATCHUP_FILE = os.path.join(STATE_DIR, 'catchup')
+CATCHUP_SCRIPT = '/usr/sbin/univention-directory-replication-catchup'
+CATCHUP_THRESHOLD = int(listener.configRegistry.get('ldap/replication/catchup/threshold', '0'))
+NOTIFIER_ID_FILE = '/var/lib/univention-directory-listener/notifier_id'
+GET_NOTIFIER_ID = '/usr/share/univention-directory-listener/get_notifier_id.py'
+FILESYSTEM_CHECK_INTERVAL = 10.0
 MAX_LDAP_RETRIES = int(listener.configRegistry.get('replication/ldap/retries', '30'))
+FAST_PATH = listener.configRegistry.is_true('ldap/replication/fastpath', True)
 
 EXCLUDE_ATTRIBUTES = set(attr.lower() for attr in {
 	'subschemaSubentry',
@@ -539,6 +546,9 @@ class LDIFObject(object):
 
 reconnect = False
 connection = None
+catchup_checked = False
+catchup_id = None  # type: Optional[int]
+filesystem_checked = 0.0
 
 
 def connect(ldif=False):
@@ -699,6 +709,41 @@ def getOldValues(ldapconn, dn):
 	return old
 
 
+def getCachedOldValues(ldapconn, dn, listener_old):
+	"""
+	get "old" from the listener cache if it matches the local ldap server
+	"ldapconn": connection to local ldap server
+	"listener_old": old entry from the listener cache
+
+	Only the entryCSN of the local entry is read: if it equals the entryCSN of
+	the cached entry, both are the same version of the object. Otherwise the
+	complete entry is read by :py:func:`getOldValues`.
+	"""
+	csn = listener_old.get('entryCSN')
+	if not FAST_PATH or not csn:
+		return getOldValues(ldapconn, dn)
+
+	try:
+		res = ldapconn.search_s(dn, ldap.SCOPE_BASE, '(objectClass=*)', ['entryCSN'])
+	except ldap.NO_SUCH_OBJECT as ex:
+		ud.debug(ud.LISTENER, ud.ALL, "replication: LOCAL not found: %s %s" % (dn, ex))
+		return {}
+
+	try:
+		((_dn, local),) = res
+		local_csn = local.get('entryCSN')
+	except (TypeError, ValueError) as ex:
+		ud.debug(ud.LISTENER, ud.ALL, "replication: LOCAL empty result: %s: %s" % (dn, ex))
+		return {}
+
+	if local_csn == csn:
+		ud.debug(ud.LISTENER, ud.ALL, "replication: LOCAL matches listener cache: %s %s" % (dn, csn))
+		return listener_old
+
+	ud.debug(ud.LISTENER, ud.INFO, "replication: LOCAL entryCSN %s differs from listener cache %s: %s" % (local_csn, csn, dn))
+	return getOldValues(ldapconn, dn)
+
+
 def _delete_dn_recursive(lo, dn):
 	try:
 		lo.delete_s(dn)
@@ -765,9 +810,15 @@ def _read_dn_from_file(filename):
 
 def check_file_system_space():
 	# type: () -> None
+	global filesystem_checked
 	if not listener.configRegistry.is_true('ldap/replication/filesystem/check'):
 		return
 
+	now = time.time()
+	if now - filesystem_checked < FILESYSTEM_CHECK_INTERVAL:
+		return
+	filesystem_checked = now
+
 	stat = os.statvfs(LDAP_DIR)
 	free_space = stat.f_bavail * stat.f_frsize
 	limit = float(listener.configRegistry.get('ldap/replication/filesystem/limit', '10')) * 1024.0 * 1024.0
@@ -797,12 +848,90 @@ def check_file_system_space():
 	listener.run('/usr/bin/systemctl', ['systemctl', 'stop', 'univention-directory-listener'], uid=0, wait=True)
 
 
+def _read_notifier_id(filename):
+	# type: (str) -> Optional[int]
+	try:
+		with open(filename, 'r') as fd:
+			return int(fd.read())
+	except (EnvironmentError, ValueError):
+		return None
+
+
+def _get_master_notifier_id():
+	# type: () -> Optional[int]
+	try:
+		return int(subprocess.check_output([GET_NOTIFIER_ID]))
+	except (EnvironmentError, ValueError, subprocess.CalledProcessError) as ex:
+		ud.debug(ud.LISTENER, ud.WARN, 'replication: failed to get notifier ID: %s' % (ex,))
+		return None
+
+
+def catch_up():
+	# type: () -> None
+	"""
+	Bulk load the local LDAP from the Primary Directory Node if the listener
+	is more than `ldap/replication/catchup/threshold` transactions behind.
+	"""
+	global reconnect
+	if not CATCHUP_THRESHOLD or os.path.exists(LDIF_FILE):
+		return
+
+	local_id = _read_notifier_id(NOTIFIER_ID_FILE)
+	master_id = _get_master_notifier_id()
+	if local_id is None or master_id is None or master_id - local_id < CATCHUP_THRESHOLD:
+		return
+
+	ud.debug(ud.LISTENER, ud.PROCESS, 'replication: %d transactions behind, bulk loading local LDAP' % (master_id - local_id,))
+	rv = listener.run(CATCHUP_SCRIPT, [os.path.basename(CATCHUP_SCRIPT), str(master_id)], uid=0)
+	if rv:
+		ud.debug(ud.LISTENER, ud.ERROR, 'replication: bulk loading failed with %d, replicating all transactions' % (rv,))
+	reconnect = True
+
+
+def catching_up():
+	# type: () -> bool
+	"""
+	Check if the current transaction is already contained in the bulk loaded LDAP.
+
+	The listener writes the ID of a transaction after running the handlers,
+	so the current transaction is at least one after the stored ID.
+	"""
+	global catchup_id
+	if catchup_id is None:
+		return False
+
+	local_id = _read_notifier_id(NOTIFIER_ID_FILE)
+	if local_id is not None and local_id + 1 < catchup_id:
+		return True
+
+	ud.debug(ud.LISTENER, ud.PROCESS, 'replication: caught up with bulk load at transaction %d' % (catchup_id,))
+	_remove_file(CATCHUP_FILE)
+	catchup_id = None
+	return False
+
+
+def prerun():
+	# type: () -> None
+	global catchup_checked, catchup_id
+	if not slave:
+		return
+
+	if not catchup_checked:
+		catchup_checked = True
+		catch_up()
+	catchup_id = _read_notifier_id(CATCHUP_FILE)
+
+
 def handler(dn, new, listener_old, operation):
 	# type: (str, dict, dict, str) -> int
 	global reconnect
 	if not slave:
 		return 1
 
+	if catching_up():
+		ud.debug(ud.LISTENER, ud.ALL, 'replication: skipping %s for %s, already bulk loaded' % (operation, dn))
+		return
+
 	check_file_system_space()
 
 	ud.debug(ud.LISTENER, ud.INFO, 'replication: Running handler %s for: %s' % (operation, dn))
@@ -835,9 +964,9 @@ def handler(dn, new, listener_old, operation):
 	try:
 		# Read old entry directly from LDAP server
 		if not isinstance(lo, LDIFObject):
-			old = getOldValues(lo, dn)
+			old = getCachedOldValues(lo, dn, listener_old)
 
-			if ud.get_level(ud.LISTENER) >= ud.INFO:
+			if old is not listener_old and ud.get_level(ud.LISTENER) >= ud.INFO:
 				# Check if both entries really match
 				match = True
 				if len(old) != len(listener_old):
@@ -234,9 +234,15 @@ class AdminConnection(object):
 			return escape(value, quote=True)
 		return value
 
+	def prefetch_policies(self, dns):
+		with self._access.cached_policies() as resolver:
+			self._policies.update(resolver.get_policies_for(dns))
+
 	def _get_policies(self, obj):
 		dict = {}
-		policies = self._access.getPolicies(obj.dn)
+		policies = self._policies.pop(obj.dn, None)
+		if policies is None:
+			policies = self._access.getPolicies(obj.dn)
 		for policy_oc, attrs in policies.items():
 			module_name = ua_objects.ocToType(policy_oc)
 			module = ua_modules.get(module_name)
@@ -275,6 +281,13 @@ def clear_cache():
 	_admin.clear_cache()
 
 
+def prefetch_policies(dns):
+	global _admin
+	if not _admin:
+		return
+	_admin.prefetch_policies(dns)
+
+
 def get_object(module, dn):
 	global _admin
 	if not _admin:
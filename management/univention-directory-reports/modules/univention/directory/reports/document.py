@@ -118,6 +118,8 @@ class Document(object):
 		elif self._header:
 			self.__append_file(fd, self._header)
 
+		# resolve the policies of all objects at once
+		admin.prefetch_policies([dn for dn in objects if isinstance(dn, six.string_types)])
 		for dn in objects:
 			if isinstance(dn, six.string_types):
 				obj = admin.get_object(None, dn)
@@ -815,7 +815,7 @@ class Instance(Base, ProgressMixin):
 		else:
 			# add all types that do not have a superordinate
 			MODULE.info('container has no superordinate')
-			allowed_modules.update(mod for mod in udm_modules.modules.values() if not udm_modules.superordinates(mod))
+			allowed_modules.update(udm_modules.get(name) for name in udm_modules.modules if not udm_modules.superordinate_names(name))
 
 		# make sure that the object type can be created
 		allowed_modules = [mod for mod in allowed_modules if udm_modules.supports(mod, 'add')]
@@ -1242,7 +1242,13 @@ class Instance(Base, ProgressMixin):
 				ret.append(infos)
 			return ret
 
-		thread = notifier.threads.Simple('ObjectPolicies', notifier.Callback(_thread, request), notifier.Callback(self.thread_finished_callback, request))
+		def _cached_thread(request):
+			# cache policies and policy references of containers for all requested objects
+			ldap_connection, ldap_position = self.get_ldap_connection()
+			with ldap_connection.cached_policies():
+				return _thread(request)
+
+		thread = notifier.threads.Simple('ObjectPolicies', notifier.Callback(_cached_thread, request), notifier.Callback(self.thread_finished_callback, request))
 		thread.run()
 
 	def object_options(self, request):
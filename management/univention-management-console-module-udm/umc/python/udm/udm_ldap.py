@@ -651,8 +651,8 @@ class UDM_Module(object):
 			MODULE.warn('Failed to modify LDAP object %s: %s: %s' % (obj.dn, e.__class__.__name__, str(e)))
 			UDM_Error(e).reraise()
 
-	def search(self, container=None, attribute=None, value=None, superordinate=None, scope='sub', filter='', simple=False, simple_attrs=None, hidden=True, serverctrls=None, response=None):
-		"""Searches for LDAP objects based on a search pattern"""
+	def search(self, container=None, attribute=None, value=None, superordinate=None, scope='sub', filter='', simple=False, simple_attrs=None, hidden=True, serverctrls=None, response=None, properties=None):
+		"""Searches for LDAP objects based on a search pattern. If properties are given only these need to be loaded."""
 		ldap_connection, ldap_position = self.get_ldap_connection()
 		if container == 'all':
 			container = ldap_position.getBase()
@@ -672,16 +672,21 @@ class UDM_Module(object):
 				if lookup_filter is None:
 					result = []
 				else:
-					if simple_attrs is not None:
+					if simple_attrs is not None and not serverctrls and response is None:
+						result = list(ldap_connection.search_iter(filter=six.text_type(lookup_filter), base=container, scope=scope, sizelimit=sizelimit, attr=simple_attrs))
+					elif simple_attrs is not None:
 						result = ldap_connection.search(filter=six.text_type(lookup_filter), base=container, scope=scope, sizelimit=sizelimit, attr=simple_attrs, serverctrls=serverctrls, response=response)
 					else:
 						result = ldap_connection.searchDn(filter=six.text_type(lookup_filter), base=container, scope=scope, sizelimit=sizelimit, serverctrls=serverctrls, response=response)
 			else:
 				if self.module:
 					kwargs = {}
-					if serverctrls and 'serverctrls' in getfullargspec(self.module.lookup).args:  # not every UDM handler supports serverctrls
+					lookup_args = getfullargspec(self.module.lookup).args
+					if serverctrls and 'serverctrls' in lookup_args:  # not every UDM handler supports serverctrls
 						kwargs['serverctrls'] = serverctrls
 						kwargs['response'] = response
+					if properties is not None and 'properties' in lookup_args:
+						kwargs['properties'] = properties
 					result = self.module.lookup(None, ldap_connection, filter_s, base=container, superordinate=superordinate, scope=scope, sizelimit=sizelimit, **kwargs)
 				else:
 					result = None
@@ -1139,8 +1144,8 @@ class UDM_Module(object):
 
 def container_modules():
 	containers = []
-	for name, mod in udm_modules.modules.items():
-		if getattr(mod, 'childs', None):
+	for name in udm_modules.modules:
+		if udm_modules.childs(name):
 			containers.append(name)
 
 	return containers
@@ -65,6 +65,9 @@ class MockedAccess(MagicMock):
 			res.append(result)
 		return res
 
+	def search_iter(self, filter=u'(objectClass=*)', base=u'', scope=u'sub', attr=[], timeout=-1, sizelimit=0, serverctrls=None, page_size=1000):
+		return iter(self.search(filter, base, scope, attr, timeout=timeout, sizelimit=sizelimit, serverctrls=serverctrls))
+
 	def searchDn(self, filter=u'(objectClass=*)', base=u'', scope=u'sub', unique=False, required=False, timeout=-1, sizelimit=0, serverctrls=None, response=None):
 		res = []
 		for dn, attrs in self.search(filter, base):
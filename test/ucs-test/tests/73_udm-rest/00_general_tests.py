@@ -84,6 +84,25 @@ def test_etag_last_modified(udm):
 	# assert 'If-Unmodified-Since' in str(exc)
 
 
+def test_search(udm):
+	userdn, username = udm.create_user(description='rest search')
+	udm_client = UDMClient.test_connection()
+	module = udm_client.get('users/user')
+
+	print('1. search for the DNs only')
+	objs = list(module.search('uid=%s' % (username,)))
+	assert [obj.dn for obj in objs] == [userdn]
+
+	print('2. search for all properties')
+	objs = list(module.search({'username': username}, opened=True))
+	assert [obj.dn for obj in objs] == [userdn]
+	assert objs[0].properties['username'] == username
+	assert objs[0].properties['description'] == 'rest search'
+
+	print('3. search without results')
+	assert not list(module.search('uid=%s-does-not-exist' % (username,)))
+
+
 @pytest.mark.parametrize('suffix', ['', u'ä'])
 def test_create_modify_move_remove(random_string, suffix, ucr):
 	if suffix: